@@ -19,3 +19,15 @@ def custom_drf_exception_handler(exc, context):
 
     # If DRF doesn't handle the exception, let Django handle it
     return None
+
+
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The request conflicts with the current state of the data."
+    default_code = "conflict"
+
+
+class ServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "A service this request needs is unavailable; try again later."
+    default_code = "service_unavailable"
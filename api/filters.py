@@ -0,0 +1,193 @@
+import operator
+import re
+from functools import reduce
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+
+from api.models.event import BoxEvent, RingEvent
+from api.models.report import ReportModifier
+from api.services.geo import bounding_box, clamp_expression, haversine_expression
+
+
+def _floats(value, count, name):
+    try:
+        numbers = [float(v) for v in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count:
+        raise ValidationError({name: f"Expected {count} comma separated numbers."})
+    return numbers
+
+
+class SpatialFilter(BaseFilterBackend):
+    """
+    Bounding-box and radius queries for ring and box events.
+
+    ``?bbox=min_lon,min_lat,max_lon,max_lat`` returns events touching the box,
+    ``?near=lat,lon&within_km=d`` events within ``d`` km of the point. Both
+    first narrow the candidates with the ``event_rtree`` index and then check
+    the exact geometry of those candidates only.
+    """
+
+    rtree_sql = (
+        "SELECT id FROM event_rtree "
+        "WHERE max_lat >= %s AND min_lat <= %s AND max_lon >= %s AND min_lon <= %s"
+    )
+
+    def _candidates(self, queryset, min_lat, max_lat, min_lon, max_lon):
+        return queryset.filter(
+            pk__in=RawSQL(self.rtree_sql, [min_lat, max_lat, min_lon, max_lon])
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        model = queryset.model
+        if model not in (RingEvent, BoxEvent):
+            return queryset
+        params = request.query_params
+
+        if params.get("bbox"):
+            min_lon, min_lat, max_lon, max_lat = _floats(params["bbox"], 4, "bbox")
+            if min_lat > max_lat or min_lon > max_lon:
+                raise ValidationError({"bbox": "Expected min_lon,min_lat,max_lon,max_lat."})
+            queryset = self._candidates(queryset, min_lat, max_lat, min_lon, max_lon)
+            if model is RingEvent:
+                # Distance from the centre to the closest point of the box.
+                queryset = queryset.alias(
+                    bbox_distance=haversine_expression(
+                        F("latitude"),
+                        F("longitude"),
+                        clamp_expression(F("latitude"), min_lat, max_lat),
+                        clamp_expression(F("longitude"), min_lon, max_lon),
+                    )
+                ).filter(bbox_distance__lte=F("radius"))
+
+        if params.get("near"):
+            lat, lon = _floats(params["near"], 2, "near")
+            try:
+                within_km = float(params.get("within_km", 0))
+            except ValueError:
+                raise ValidationError({"within_km": "Expected a number."})
+            if within_km < 0:
+                raise ValidationError({"within_km": "Must not be negative."})
+            min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, within_km)
+            queryset = self._candidates(queryset, min_lat, max_lat, min_lon, max_lon)
+            if model is RingEvent:
+                queryset = queryset.alias(
+                    near_distance=haversine_expression(lat, lon, F("latitude"), F("longitude"))
+                ).filter(near_distance__lte=F("radius") + within_km)
+            else:
+                queryset = queryset.alias(
+                    near_distance=haversine_expression(
+                        lat,
+                        lon,
+                        clamp_expression(lat, F("min_lat"), F("max_lat")),
+                        clamp_expression(lon, F("min_lon"), F("max_lon")),
+                    )
+                ).filter(near_distance__lte=within_km)
+
+        return queryset
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ``?search=`` through the SQLite FTS5 table named by the view's
+    ``search_fts_table`` (see migration 0007_fulltext), whose columns are
+    the view's ``search_fields``.
+
+    A row matches if every word of the search starts a word of its indexed
+    columns, so ``?search=flo`` finds "Flood", or if ``SearchFilter``'s
+    ``LIKE '%x%'`` lookups over ``search_fields`` match it, so every
+    substring match a plain search finds is still found. Both conditions
+    apply to the view's queryset, after its other filters. When the whole
+    table has at most ``SEARCH_RANK_MAX_MATCHES`` full-text matches, rows
+    carry a ``search_rank`` (bm25, lower is better; NULL for substring-only
+    matches) that ``SearchRankOrderingFilter`` orders by. Views without an
+    FTS table, searches without indexable words, and searches with no
+    full-text match anywhere use ``SearchFilter`` alone.
+    """
+
+    word = re.compile(r"\w+")
+
+    def match_query(self, terms):
+        words = [w for term in terms for w in self.word.findall(term)]
+        return " ".join(f'"{w}"*' for w in words)
+
+    def substring_condition(self, request, queryset, view):
+        """``SearchFilter``'s condition on the rows of ``queryset``, as a Q."""
+        fields = self.get_search_fields(view, request)
+        lookups = [self.construct_search(str(field), queryset) for field in fields]
+        condition = reduce(
+            operator.and_,
+            (
+                reduce(operator.or_, (Q(**{lookup: term}) for lookup in lookups))
+                for term in self.get_search_terms(request)
+            ),
+        )
+        if self.must_call_distinct(queryset, fields):
+            return Q(pk__in=queryset.filter(condition).values("pk"))
+        return condition
+
+    def filter_queryset(self, request, queryset, view):
+        table = getattr(view, "search_fts_table", None)
+        terms = self.get_search_terms(request)
+        query = self.match_query(terms) if table and terms else ""
+        substring = super().filter_queryset(request, queryset, view)
+        if not query:
+            return substring
+
+        connection = connections[router.db_for_read(queryset.model)]
+        qn = connection.ops.quote_name
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT count(*) FROM {qn(table)} WHERE {qn(table)} MATCH %s", [query])
+                matches = cursor.fetchone()[0]
+        except DatabaseError:
+            # No FTS5 table, e.g. before migrating.
+            matches = 0
+        if not matches:
+            return substring
+
+        meta = queryset.model._meta
+        matched = RawSQL(f"SELECT rowid FROM {qn(table)} WHERE {qn(table)} MATCH %s", [query])
+        queryset = queryset.filter(Q(pk__in=matched) | self.substring_condition(request, queryset, view))
+        if matches <= settings.SEARCH_RANK_MAX_MATCHES:
+            queryset = queryset.annotate(
+                search_rank=RawSQL(
+                    f"WITH ranks AS MATERIALIZED (SELECT rowid, rank FROM {qn(table)} WHERE {qn(table)} MATCH %s) "
+                    f"SELECT rank FROM ranks WHERE rowid = {qn(meta.db_table)}.{qn(meta.pk.column)}",
+                    [query],
+                    output_field=FloatField(),
+                )
+            )
+        return queryset
+
+
+class SearchRankOrderingFilter(OrderingFilter):
+    """``OrderingFilter`` that orders full-text matches by rank unless ``?ordering=`` is given."""
+
+    def filter_queryset(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations and not request.query_params.get(
+            self.ordering_param
+        ):
+            # Substring-only matches (no rank) last.
+            return queryset.order_by(F("search_rank").asc(nulls_last=True), "pk")
+        return super().filter_queryset(request, queryset, view)
+
+
+class ReportModifierFilter(filters.FilterSet):
+    """django-filter cannot derive filters for the generated date part columns."""
+
+    year = filters.NumberFilter()
+    quarter = filters.NumberFilter()
+    month = filters.NumberFilter()
+    day = filters.NumberFilter()
+
+    class Meta:
+        model = ReportModifier
+        fields = ["as_at_date", "fx_date", "year", "quarter", "month", "day"]
@@ -0,0 +1,85 @@
+import threading
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, router, transaction
+
+from api.models import ReportModifier
+from api.services.writer import QueueFull, WriteQueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure sustained writes/sec from concurrent threads, each writing on its own "
+        "connection and through the single-writer queue. Creates and then deletes report "
+        "modifiers; run it against a scratch database (DB_PATH_REPORTING)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=16,
+            help='Concurrent writers (default: 16)'
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=10,
+            help='Duration of each run (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        using = router.db_for_write(ReportModifier)
+        writer = WriteQueue(using=using)
+        for mode, submit in (
+            ('direct', lambda fn: fn()),
+            ('queue', writer.submit),
+        ):
+            result = self.run(submit, using, options['threads'], options['seconds'])
+            self.stdout.write(
+                f"{mode:>6}: {result['writes'] / options['seconds']:8.0f} writes/s, "
+                f"{result['errors']} failed, worst latency {result['worst'] * 1000:.0f} ms"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Queue committed {writer.stats['writes']} writes in {writer.stats['batches']} batches"
+        ))
+
+    def run(self, submit, using, threads, seconds):
+        """Write from ``threads`` threads for ``seconds``; each write is a create and an update."""
+
+        def write():
+            with transaction.atomic(using=using):
+                modifier = ReportModifier.objects.create(as_at_date=date.today())
+                ReportModifier.objects.filter(pk=modifier.pk).update(fx_date=date.today())
+            return modifier.pk
+
+        result = {'writes': 0, 'errors': 0, 'worst': 0.0}
+        created = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def loop():
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    pk = submit(write)
+                except (OperationalError, QueueFull):
+                    with lock:
+                        result['errors'] += 1
+                    continue
+                with lock:
+                    created.append(pk)
+                    result['writes'] += 1
+                    result['worst'] = max(result['worst'], time.monotonic() - started)
+            connections.close_all()
+
+        workers = [threading.Thread(target=loop) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        for start in range(0, len(created), 5000):
+            ReportModifier.objects.filter(pk__in=created[start:start + 5000]).delete()
+        return result
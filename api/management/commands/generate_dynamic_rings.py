@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Report
+from api.services.dynamic_rings import (
+    create_ring_event_group,
+    read_location_losses,
+    report_dynamic_rings,
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate dynamic rings for a report from a location loss table (CSV or NPZ)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('report_id', type=int)
+        parser.add_argument('path', help='CSV with a header row, or NPZ, with latitude, longitude and loss columns')
+        parser.add_argument('--threshold', type=float, help='Override dynamic_ring_loss_threshold')
+        parser.add_argument('--blast-radius', type=float, help='Override blast_radius (km)')
+        parser.add_argument('--no-overlap-radius', type=float, help='Override no_overlap_radius (km)')
+        parser.add_argument('--grid-km', type=float, help='Aggregation grid size in km (default: blast radius / 10)')
+        parser.add_argument('--name', help='Name of the new event group')
+        parser.add_argument('--assign', action='store_true', help='Make the report use the new event group')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be created')
+
+    def handle(self, *args, **options):
+        try:
+            report = Report.objects.get(pk=options['report_id'])
+        except Report.DoesNotExist:
+            raise CommandError(f"Report {options['report_id']} does not exist")
+
+        started = time.monotonic()
+        try:
+            with open(options['path'], 'rb') as f:
+                columns = read_location_losses(f, options['path'])
+            rings = report_dynamic_rings(
+                report,
+                *columns,
+                threshold=options['threshold'],
+                blast_radius=options['blast_radius'],
+                no_overlap_radius=options['no_overlap_radius'],
+                grid_km=options['grid_km'],
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{rings.locations} locations in {rings.cells} cells, "
+            f"{rings.candidates} above the threshold, {len(rings.losses)} rings "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+        if options['dry_run']:
+            return
+        group = create_ring_event_group(
+            report, rings, name=options['name'], assign=options['assign']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created event group {group.id} '{group.name}' with {len(rings.losses)} ring events"
+        ))
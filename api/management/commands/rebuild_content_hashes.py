@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.services.hashing import rebuild_content_hashes
+
+
+class Command(BaseCommand):
+    help = 'Recompute event geometry, event group content and report config hashes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Events processed per batch (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        result = rebuild_content_hashes(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {result['events']} events, {result['event_groups']} event groups "
+            f"and {result['reports']} reports"
+        ))
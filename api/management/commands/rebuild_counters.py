@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.services.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the row counters kept by triggers in the counters table'
+
+    def handle(self, *args, **options):
+        result = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {result['counters']} counters, {result['corrected']} were wrong"
+        ))
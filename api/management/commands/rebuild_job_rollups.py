@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.services.analytics import rebuild_job_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the job analytics rollups from live and archived jobs'
+
+    def handle(self, *args, **options):
+        count = rebuild_job_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} job rollups'))
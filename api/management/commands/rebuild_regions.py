@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.services.regions import rebuild_regions
+
+
+class Command(BaseCommand):
+    help = 'Recompute the region of every geo event and delete regions left without events'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Geo events processed per batch (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        result = rebuild_regions(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {result['events_updated']} geo events; "
+            f"{result['regions']} regions, {result['regions_deleted']} deleted"
+        ))
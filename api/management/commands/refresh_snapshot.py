@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.services.snapshot import refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = "Copy the live reporting database to the read-only snapshot database"
+
+    def handle(self, *args, **options):
+        result = refresh_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot written to {result['path']} ({result['bytes']} bytes) in {result['seconds']} s"
+        ))
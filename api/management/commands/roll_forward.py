@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from api.services.rollforward import roll_forward
+
+
+class Command(BaseCommand):
+    help = "Copy a quarter's report modifiers forward and link them to the valid reports"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from-date',
+            type=date.fromisoformat,
+            required=True,
+            help='Any day of the source quarter, YYYY-MM-DD'
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=3,
+            help='Months to move the dates ahead (default: 3)'
+        )
+        parser.add_argument(
+            '--report',
+            type=int,
+            action='append',
+            dest='reports',
+            help='Only this report; repeat for several (default: all valid reports)'
+        )
+        parser.add_argument(
+            '--create-jobs',
+            action='store_true',
+            help='Create a pending job for every new link'
+        )
+
+    def handle(self, *args, **options):
+        result = roll_forward(
+            from_date=options['from_date'],
+            months=options['months'],
+            report_ids=options['reports'],
+            create_jobs=options['create_jobs'],
+        )
+        for modifier in result['modifiers']:
+            self.stdout.write(
+                f"Modifier {modifier['id']} ({modifier['as_at_date']}, fx {modifier['fx_date']})"
+                f"{' created' if modifier['created'] else ''}: {modifier['linked']} reports linked, "
+                f"{modifier['already_linked']} already linked"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Linked {result['linked']} reports to {len(result['modifiers'])} modifiers, "
+            f"created {result['jobs']} jobs"
+        ))
@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.models import Report
+from api.services.schedule import simulate_report_schedules
+
+
+class Command(BaseCommand):
+    help = 'Simulate per-minute core demand of all scheduled reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help='Window start as ISO datetime (default: now, UTC)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=91,
+            help='Window length in days (default: 91, one quarter)'
+        )
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            help='Cluster capacity in cores, used to report over-capacity intervals'
+        )
+        parser.add_argument(
+            '--peril',
+            action='append',
+            help='Only simulate reports of this peril (repeatable)'
+        )
+        parser.add_argument(
+            '--include-invalid',
+            action='store_true',
+            help='Also simulate reports flagged is_valid=False'
+        )
+        parser.add_argument(
+            '--default-duration',
+            type=int,
+            help='Job duration in minutes for reports without finished jobs'
+        )
+        parser.add_argument(
+            '--history-days',
+            type=int,
+            help='Days of job history used to estimate durations'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=5,
+            help='Number of peaks to report (default: 5)'
+        )
+        parser.add_argument(
+            '--bucket',
+            type=int,
+            default=0,
+            help='Also print the timeline aggregated to buckets of this many minutes'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the full result as JSON'
+        )
+
+    def handle(self, *args, **options):
+        if options['start']:
+            try:
+                start = datetime.fromisoformat(options['start'])
+            except ValueError as e:
+                raise CommandError(f'Invalid --start: {e}')
+        else:
+            start = timezone.now()
+        end = start + timedelta(days=options['days'])
+
+        reports = Report.objects.all()
+        if not options['include_invalid']:
+            reports = reports.filter(is_valid=True)
+        if options['peril']:
+            reports = reports.filter(peril__in=options['peril'])
+
+        try:
+            simulation = simulate_report_schedules(
+                reports,
+                start,
+                end,
+                capacity=options['capacity'],
+                default_duration=options['default_duration'],
+                history_days=options['history_days'],
+                top=options['top'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        bucket = options['bucket']
+        result = simulation.to_dict(
+            include_timeline=bucket > 0, bucket_minutes=bucket or 60
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+
+        self.stdout.write(
+            f"Simulated {result['reports_simulated']} reports "
+            f"({result['job_runs']} job runs) from {result['window']['start']} "
+            f"to {result['window']['end']}"
+        )
+        if result['skipped_reports']:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {len(result['skipped_reports'])} reports with an invalid cron "
+                f"or no cores: {result['skipped_reports'][:20]}"
+            ))
+        self.stdout.write(
+            f"Peak demand: {result['peak_cores']} cores "
+            f"(mean {result['mean_cores']:.1f})"
+        )
+        for peak in result['peaks']:
+            self.stdout.write(f"  {peak['start']} -> {peak['end']}: {peak['cores']} cores")
+
+        if result['capacity'] is not None:
+            style = self.style.ERROR if result['over_capacity'] else self.style.SUCCESS
+            self.stdout.write(style(
+                f"{result['minutes_over_capacity']} minutes over capacity "
+                f"({result['capacity']} cores) in {len(result['over_capacity'])} intervals"
+            ))
+            for interval in result['over_capacity'][:options['top']]:
+                self.stdout.write(
+                    f"  {interval['start']} -> {interval['end']}: {interval['cores']} cores"
+                )
+
+        if bucket:
+            for point in result['timeline']['values']:
+                self.stdout.write(f"{point['start']}\t{point['cores']}")
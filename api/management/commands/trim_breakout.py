@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Report
+from api.services.breakout import CHUNK_ROWS, CsvSink, csv_chunks, report_caps, trim_breakout
+
+
+class Command(BaseCommand):
+    help = 'Trim a location breakout CSV (event_id, location_id, loss) to the breakout caps'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Breakout CSV with a header row')
+        parser.add_argument('output', help='Where to write the trimmed CSV')
+        parser.add_argument('--report', type=int, help='Take the caps from this report')
+        parser.add_argument('--max-events', type=int, help='Events to keep (overrides the report)')
+        parser.add_argument('--max-locations', type=int, help='Locations to keep (overrides the report)')
+        parser.add_argument(
+            '--chunk-rows',
+            type=int,
+            default=CHUNK_ROWS,
+            help=f'Rows read at a time (default: {CHUNK_ROWS})'
+        )
+
+    def handle(self, *args, **options):
+        max_events, max_locations = options['max_events'], options['max_locations']
+        if options['report'] is not None:
+            report = Report.objects.filter(pk=options['report']).first()
+            if report is None:
+                raise CommandError(f"Report {options['report']} does not exist")
+            caps = report_caps(report)
+            if caps is None:
+                self.stdout.write(self.style.WARNING(
+                    f"Report {report.id} has no location breakout; using its caps anyway"
+                ))
+            max_events = max_events or report.location_breakout_max_events
+            max_locations = max_locations or report.location_breakout_max_locations
+        if not max_events or not max_locations:
+            raise CommandError('Pass --report or both --max-events and --max-locations')
+
+        started = time.monotonic()
+        try:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as out:
+                stats = trim_breakout(
+                    csv_chunks(options['input'], options['chunk_rows']),
+                    CsvSink(out),
+                    max_events,
+                    max_locations,
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Kept {stats['rows_kept']} of {stats['rows']} rows, "
+            f"{stats['events_kept']} of {stats['events']} events and "
+            f"{stats['locations_kept']} of {stats['locations']} locations "
+            f"({stats['loss_kept'] / stats['loss']:.1%} of the loss) "
+            f"in {time.monotonic() - started:.1f}s"
+            if stats['loss'] else f"Input had no rows ({time.monotonic() - started:.1f}s)"
+        ))
@@ -1,6 +1,11 @@
+from django.conf import settings
+from django.db import DatabaseError
 from django.http import JsonResponse
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import MiddlewareNotUsed, ObjectDoesNotExist
 import logging
+import re
+
+from api.services.writer import QueueFull, WriteQueue
 
 logger = logging.getLogger("api")
 
@@ -42,3 +47,70 @@ class CustomDjangoExceptionMiddleware:
             )
 
         return JsonResponse(error_data, status=error_data["status_code"])
+
+
+class SingleWriterMiddleware:
+    """
+    With WRITE_QUEUE_ENABLED, runs mutating API requests one at a time on
+    the writer thread of a WriteQueue (see api.services.writer), which
+    commits concurrent requests together. A request answered with a 5xx
+    has its writes rolled back on every database of
+    WRITE_QUEUE_DATABASES. When WRITE_QUEUE_MAX_DEPTH requests are already
+    waiting, answers 429 with Retry-After instead.
+
+    The whole request runs on the writer thread, so requests that spend
+    long outside the database would hold up every write behind them. Paths
+    matching WRITE_QUEUE_EXCLUDE (results uploads, dynamic ring generation,
+    bulk links) run on their own thread and commit on their own instead.
+    A queued request may run a second time if its batch fails to commit,
+    so its body is read up front to be parsed again.
+    """
+
+    METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, get_response):
+        if not settings.WRITE_QUEUE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.exclude = [re.compile(pattern) for pattern in settings.WRITE_QUEUE_EXCLUDE]
+        self.writer = WriteQueue(
+            using=settings.WRITE_QUEUE_DATABASES,
+            max_depth=settings.WRITE_QUEUE_MAX_DEPTH,
+            max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+        )
+
+    def __call__(self, request):
+        if (
+            request.method not in self.METHODS
+            or not request.path.startswith("/api/")
+            or any(pattern.match(request.path) for pattern in self.exclude)
+        ):
+            return self.get_response(request)
+        # Read now: a retried request parses it again.
+        request.body
+        try:
+            return self.writer.submit(
+                lambda: self.get_response(request),
+                rollback_if=lambda response: response.status_code >= 500,
+            )
+        except QueueFull as e:
+            response = JsonResponse(
+                {
+                    "error": "Too many concurrent writes",
+                    "detail": str(e),
+                    "status_code": 429,
+                },
+                status=429,
+            )
+            response["Retry-After"] = str(e.retry_after)
+            return response
+        except DatabaseError as e:
+            logger.error(f"Write batch failed: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {
+                    "error": str(e),
+                    "detail": "The write could not be committed; retry it.",
+                    "status_code": 503,
+                },
+                status=503,
+            )
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.2 on 2026-10-19 14:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_report_event_group'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('report', models.IntegerField(db_column='report_id', db_index=True)),
+                ('report_modifier', models.IntegerField(blank=True, db_column='report_modifier_id', null=True)),
+                ('fireant_jobid', models.IntegerField()),
+                ('created', models.DateTimeField(db_index=True)),
+                ('updated', models.DateTimeField()),
+                ('archived', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'jobs_archive',
+            },
+        ),
+    ]
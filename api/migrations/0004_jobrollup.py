@@ -0,0 +1,32 @@
+# Generated by Django 5.2.2 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_archivedjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRollup',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('report', models.IntegerField(db_column='report_id')),
+                ('peril', models.CharField(max_length=100)),
+                ('priority', models.CharField(max_length=50)),
+                ('job_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('duration_sum', models.FloatField(default=0)),
+                ('duration_histogram', models.JSONField(default=list)),
+            ],
+            options={
+                'db_table': 'job_rollups',
+                'indexes': [models.Index(fields=['report', 'day'], name='job_rollups_report_day'), models.Index(fields=['peril', 'day'], name='job_rollups_peril_day'), models.Index(fields=['priority', 'day'], name='job_rollups_priority_day')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'report'), name='job_rollups_day_report')],
+            },
+        ),
+    ]
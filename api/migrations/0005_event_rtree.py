@@ -0,0 +1,90 @@
+# Spatial index for ring and box events.
+#
+# event_rtree is an SQLite R*Tree holding the lat/lon bounding box of every
+# RingEvent and BoxEvent, keyed by event id. Triggers keep it in sync with
+# every insert, update and delete, including bulk inserts and raw SQL.
+# Ring radii are in km; 111.32 km per degree of latitude, and longitude
+# degrees shrink with cos(latitude). Rings crossing the antimeridian get the
+# full longitude range.
+
+from django.db import migrations
+
+RING_BOX = """
+    NEW.event_ptr_id,
+    MAX(NEW.latitude - NEW.radius / 111.32, -90.0),
+    MIN(NEW.latitude + NEW.radius / 111.32, 90.0),
+    CASE WHEN ABS(NEW.longitude) + NEW.radius / (111.32 * MAX(COS(RADIANS(NEW.latitude)), 0.01)) > 180
+         THEN -180.0
+         ELSE NEW.longitude - NEW.radius / (111.32 * MAX(COS(RADIANS(NEW.latitude)), 0.01)) END,
+    CASE WHEN ABS(NEW.longitude) + NEW.radius / (111.32 * MAX(COS(RADIANS(NEW.latitude)), 0.01)) > 180
+         THEN 180.0
+         ELSE NEW.longitude + NEW.radius / (111.32 * MAX(COS(RADIANS(NEW.latitude)), 0.01)) END
+"""
+
+BOX_BOX = "NEW.event_ptr_id, NEW.min_lat, NEW.max_lat, NEW.min_lon, NEW.max_lon"
+
+FORWARD = [
+    "CREATE VIRTUAL TABLE event_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    f"""
+    CREATE TRIGGER event_rtree_ring_insert AFTER INSERT ON api_ringevent
+    BEGIN
+        INSERT OR REPLACE INTO event_rtree VALUES ({RING_BOX});
+    END
+    """,
+    f"""
+    CREATE TRIGGER event_rtree_ring_update
+    AFTER UPDATE OF latitude, longitude, radius ON api_ringevent
+    BEGIN
+        INSERT OR REPLACE INTO event_rtree VALUES ({RING_BOX});
+    END
+    """,
+    """
+    CREATE TRIGGER event_rtree_ring_delete AFTER DELETE ON api_ringevent
+    BEGIN
+        DELETE FROM event_rtree WHERE id = OLD.event_ptr_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER event_rtree_box_insert AFTER INSERT ON api_boxevent
+    BEGIN
+        INSERT OR REPLACE INTO event_rtree VALUES ({BOX_BOX});
+    END
+    """,
+    f"""
+    CREATE TRIGGER event_rtree_box_update
+    AFTER UPDATE OF min_lat, max_lat, min_lon, max_lon ON api_boxevent
+    BEGIN
+        INSERT OR REPLACE INTO event_rtree VALUES ({BOX_BOX});
+    END
+    """,
+    """
+    CREATE TRIGGER event_rtree_box_delete AFTER DELETE ON api_boxevent
+    BEGIN
+        DELETE FROM event_rtree WHERE id = OLD.event_ptr_id;
+    END
+    """,
+    # Backfill existing events.
+    f"INSERT INTO event_rtree SELECT {RING_BOX.replace('NEW.', '')} FROM api_ringevent",
+    f"INSERT INTO event_rtree SELECT {BOX_BOX.replace('NEW.', '')} FROM api_boxevent",
+]
+
+REVERSE = [
+    "DROP TRIGGER IF EXISTS event_rtree_ring_insert",
+    "DROP TRIGGER IF EXISTS event_rtree_ring_update",
+    "DROP TRIGGER IF EXISTS event_rtree_ring_delete",
+    "DROP TRIGGER IF EXISTS event_rtree_box_insert",
+    "DROP TRIGGER IF EXISTS event_rtree_box_update",
+    "DROP TRIGGER IF EXISTS event_rtree_box_delete",
+    "DROP TABLE IF EXISTS event_rtree",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_jobrollup'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD, REVERSE),
+    ]
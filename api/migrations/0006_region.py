@@ -0,0 +1,78 @@
+# Generated by Django 5.2.2 on 2026-10-19 14:55
+
+import re
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_regions(apps, schema_editor):
+    """Build regions for existing geo events (see api.services.regions)."""
+    GeoEvent = apps.get_model("api", "GeoEvent")
+    Region = apps.get_model("api", "Region")
+    db = schema_editor.connection.alias
+    ids = {}
+    members = defaultdict(list)
+    for event in GeoEvent.objects.using(db).only(
+        "event_ptr_id", "country", "area", "subarea", "subarea2"
+    ).iterator(chunk_size=5000):
+        names = []
+        for value in (event.country, event.area, event.subarea, event.subarea2):
+            value = re.sub(r"[\x00-\x1f]", " ", value or "").strip()
+            if not value:
+                break
+            names.append(value)
+        parent = None
+        for level in range(1, len(names) + 1):
+            path = "\x1f".join(names[:level])
+            if path not in ids:
+                ids[path] = Region.objects.using(db).create(
+                    path=path,
+                    name=names[level - 1],
+                    name_key=names[level - 1].lower(),
+                    level=level,
+                    parent_id=parent,
+                ).id
+            parent = ids[path]
+        if parent is not None:
+            members[parent].append(event.pk)
+    for region_id, pks in members.items():
+        for start in range(0, len(pks), 500):
+            GeoEvent.objects.using(db).filter(pk__in=pks[start : start + 500]).update(
+                region_id=region_id
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_event_rtree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('path', models.CharField(max_length=1024, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('name_key', models.CharField(db_index=True, max_length=255)),
+                ('level', models.PositiveSmallIntegerField()),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='api.region')),
+            ],
+            options={
+                'db_table': 'regions',
+            },
+        ),
+        migrations.AddField(
+            model_name='geoevent',
+            name='region',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='geo_events', to='api.region'),
+        ),
+        migrations.AddIndex(
+            model_name='region',
+            index=models.Index(fields=['parent', 'name'], name='regions_parent__3aaf7e_idx'),
+        ),
+        migrations.RunPython(backfill_regions, migrations.RunPython.noop),
+    ]
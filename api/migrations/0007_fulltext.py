@@ -0,0 +1,125 @@
+# Full-text search tables for events and reports (see api.filters.FullTextSearchFilter).
+#
+# events_fts and reports_fts are regular FTS5 tables keyed by the event and
+# report ids. Triggers keep them in sync with every insert, update and
+# delete, including bulk inserts and raw SQL:
+#
+# - events_fts(name, description, zone, place): place holds the
+#   country/area/subarea/subarea2 of geo events, empty for other events.
+# - reports_fts(name, peril, event_group_name): event group renames are
+#   copied to the reports using the group.
+
+from django.db import migrations
+
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+
+GEO_PLACE = (
+    "TRIM(COALESCE({p}country, '') || ' ' || COALESCE({p}area, '') || ' ' "
+    "|| COALESCE({p}subarea, '') || ' ' || COALESCE({p}subarea2, ''))"
+)
+
+REPORT_ROW = (
+    "{p}id, {p}name, {p}peril, "
+    "COALESCE((SELECT name FROM api_eventgroup WHERE id = {p}event_group_id), '')"
+)
+
+FORWARD = [
+    f"CREATE VIRTUAL TABLE events_fts USING fts5(name, description, zone, place, {TOKENIZE})",
+    f"CREATE VIRTUAL TABLE reports_fts USING fts5(name, peril, event_group_name, {TOKENIZE})",
+    # Events
+    """
+    CREATE TRIGGER events_fts_insert AFTER INSERT ON events
+    BEGIN
+        INSERT INTO events_fts (rowid, name, description, zone, place)
+        VALUES (NEW.id, NEW.name, NEW.description, NEW.zone, '');
+    END
+    """,
+    """
+    CREATE TRIGGER events_fts_update AFTER UPDATE OF name, description, zone ON events
+    BEGIN
+        UPDATE events_fts SET name = NEW.name, description = NEW.description, zone = NEW.zone
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER events_fts_delete AFTER DELETE ON events
+    BEGIN
+        DELETE FROM events_fts WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER events_fts_geo_insert AFTER INSERT ON api_geoevent
+    BEGIN
+        UPDATE events_fts SET place = {GEO_PLACE.format(p='NEW.')} WHERE rowid = NEW.event_ptr_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER events_fts_geo_update
+    AFTER UPDATE OF country, area, subarea, subarea2 ON api_geoevent
+    BEGIN
+        UPDATE events_fts SET place = {GEO_PLACE.format(p='NEW.')} WHERE rowid = NEW.event_ptr_id;
+    END
+    """,
+    # Reports
+    f"""
+    CREATE TRIGGER reports_fts_insert AFTER INSERT ON reports
+    BEGIN
+        INSERT INTO reports_fts (rowid, name, peril, event_group_name)
+        VALUES ({REPORT_ROW.format(p='NEW.')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER reports_fts_update AFTER UPDATE OF name, peril, event_group_id ON reports
+    BEGIN
+        DELETE FROM reports_fts WHERE rowid = OLD.id;
+        INSERT INTO reports_fts (rowid, name, peril, event_group_name)
+        VALUES ({REPORT_ROW.format(p='NEW.')});
+    END
+    """,
+    """
+    CREATE TRIGGER reports_fts_delete AFTER DELETE ON reports
+    BEGIN
+        DELETE FROM reports_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER reports_fts_event_group_update AFTER UPDATE OF name ON api_eventgroup
+    BEGIN
+        UPDATE reports_fts SET event_group_name = NEW.name
+        WHERE rowid IN (SELECT id FROM reports WHERE event_group_id = NEW.id);
+    END
+    """,
+    # Backfill existing rows.
+    "INSERT INTO events_fts (rowid, name, description, zone, place) "
+    "SELECT id, name, description, zone, '' FROM events",
+    f"UPDATE events_fts SET place = (SELECT {GEO_PLACE.format(p='')} FROM api_geoevent "
+    "WHERE event_ptr_id = events_fts.rowid) "
+    "WHERE rowid IN (SELECT event_ptr_id FROM api_geoevent)",
+    f"INSERT INTO reports_fts (rowid, name, peril, event_group_name) "
+    f"SELECT {REPORT_ROW.format(p='reports.')} FROM reports",
+]
+
+REVERSE = [
+    "DROP TRIGGER IF EXISTS events_fts_insert",
+    "DROP TRIGGER IF EXISTS events_fts_update",
+    "DROP TRIGGER IF EXISTS events_fts_delete",
+    "DROP TRIGGER IF EXISTS events_fts_geo_insert",
+    "DROP TRIGGER IF EXISTS events_fts_geo_update",
+    "DROP TRIGGER IF EXISTS reports_fts_insert",
+    "DROP TRIGGER IF EXISTS reports_fts_update",
+    "DROP TRIGGER IF EXISTS reports_fts_delete",
+    "DROP TRIGGER IF EXISTS reports_fts_event_group_update",
+    "DROP TABLE IF EXISTS events_fts",
+    "DROP TABLE IF EXISTS reports_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_region'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD, REVERSE),
+    ]
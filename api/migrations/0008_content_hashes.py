@@ -0,0 +1,126 @@
+# Generated by Django 5.2.2 on 2026-10-19 15:07
+#
+# The hash functions are copied here from api.services.hashing as they were
+# when this migration was written, so later changes there (or to the live
+# models it imports) cannot change what this migration does.
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+MODULUS = 1 << 64
+
+# Report fields that do not change what a job computes.
+CONFIG_EXCLUDE = {
+    "id", "name", "event_group_id", "cron", "priority", "ncores",
+    "is_valid", "created", "updated", "config_hash",
+}
+
+GEOMETRY_FIELDS = {
+    "RingEvent": ("latitude", "longitude", "radius"),
+    "BoxEvent": ("min_lat", "min_lon", "max_lat", "max_lon"),
+    "GeoEvent": ("country", "area", "subarea", "subarea2"),
+}
+
+
+def to_signed(value):
+    value %= MODULUS
+    return value - MODULUS if value >= MODULUS // 2 else value
+
+
+def digest(values):
+    data = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return to_signed(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big"))
+
+
+def geometry_hash(kind, values):
+    normalised = [
+        float(value) if isinstance(value, (int, float)) else (value or "")
+        for value in values
+    ]
+    return digest([kind, *normalised])
+
+
+def config_hash(values, group_hash):
+    config = {name: value for name, value in sorted(values.items()) if name not in CONFIG_EXCLUDE}
+    return digest([config, group_hash])
+
+
+def backfill_hashes(apps, schema_editor):
+    """Hash existing events, event groups and reports."""
+    db = schema_editor.connection.alias
+    Event = apps.get_model("api", "Event")
+    EventGroup = apps.get_model("api", "EventGroup")
+    Report = apps.get_model("api", "Report")
+
+    hashes = {}
+    for name, fields in GEOMETRY_FIELDS.items():
+        model = apps.get_model("api", name)
+        for pk, *values in model.objects.using(db).values_list("pk", *fields).iterator(chunk_size=5000):
+            hashes[pk] = geometry_hash(name.lower(), values)
+    untyped = geometry_hash("event", [])
+    events = [
+        Event(id=pk, geometry_hash=hashes.get(pk, untyped))
+        for pk in Event.objects.using(db).values_list("pk", flat=True).iterator(chunk_size=5000)
+    ]
+    Event.objects.using(db).bulk_update(events, ["geometry_hash"], batch_size=5000)
+
+    sums = {}
+    through = EventGroup.events.through
+    for group_id, event_id in through.objects.using(db).values_list("eventgroup_id", "event_id").iterator():
+        sums[group_id] = sums.get(group_id, 0) + hashes.get(event_id, untyped)
+    groups = [EventGroup(id=pk, content_hash=to_signed(value)) for pk, value in sums.items()]
+    EventGroup.objects.using(db).bulk_update(groups, ["content_hash"], batch_size=500)
+
+    reports = list(Report.objects.using(db))
+    for report in reports:
+        values = {f.attname: f.to_python(getattr(report, f.attname)) for f in Report._meta.concrete_fields}
+        group_hash = None
+        if report.event_group_id is not None:
+            group_hash = to_signed(sums.get(report.event_group_id, 0))
+        report.config_hash = config_hash(values, group_hash)
+    Report.objects.using(db).bulk_update(reports, ["config_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_fulltext'),
+    ]
+
+    # ALTER TABLE ADD COLUMN rather than AddField, which rebuilds the tables
+    # on SQLite and so drops the search triggers of migration 0007.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f"ALTER TABLE {table} ADD COLUMN {column} bigint NOT NULL DEFAULT 0",
+                    f"ALTER TABLE {table} DROP COLUMN {column}",
+                )
+                for table, column in (
+                    ("events", "geometry_hash"),
+                    ("api_eventgroup", "content_hash"),
+                    ("reports", "config_hash"),
+                )
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='event',
+                    name='geometry_hash',
+                    field=models.BigIntegerField(default=0, editable=False),
+                ),
+                migrations.AddField(
+                    model_name='eventgroup',
+                    name='content_hash',
+                    field=models.BigIntegerField(default=0, editable=False),
+                ),
+                migrations.AddField(
+                    model_name='report',
+                    name='config_hash',
+                    field=models.BigIntegerField(default=0, editable=False),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
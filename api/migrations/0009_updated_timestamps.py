@@ -0,0 +1,43 @@
+# Generated by Django 5.2.2 on 2026-10-19 15:11
+
+from django.db import migrations, models
+
+# ALTER TABLE ADD COLUMN rather than AddField, which rebuilds the tables on
+# SQLite and so drops the search triggers of migration 0007. Existing rows
+# count as updated when migrated.
+TABLES = ("events", "report_modifiers")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_content_hashes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    [
+                        f"ALTER TABLE {table} ADD COLUMN updated datetime NOT NULL "
+                        f"DEFAULT '1970-01-01 00:00:00'",
+                        f"UPDATE {table} SET updated = CURRENT_TIMESTAMP",
+                    ],
+                    f"ALTER TABLE {table} DROP COLUMN updated",
+                )
+                for table in TABLES
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='event',
+                    name='updated',
+                    field=models.DateTimeField(auto_now=True),
+                ),
+                migrations.AddField(
+                    model_name='reportmodifier',
+                    name='updated',
+                    field=models.DateTimeField(auto_now=True),
+                ),
+            ],
+        ),
+    ]
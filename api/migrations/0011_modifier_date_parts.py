@@ -0,0 +1,70 @@
+# Generated by Django 5.2.2 on 2026-10-19 15:25
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+# ALTER TABLE ADD COLUMN rather than AddField, which would rebuild the table
+# once per column on SQLite. Virtual generated columns may be added that way
+# and indexed; the expressions match the model's.
+PART = "CAST(strftime('{}', \"as_at_date\") AS integer)"
+COLUMNS = {
+    "year": PART.format("%Y"),
+    "quarter": f"(({PART.format('%m')} + 2) / 3)",
+    "month": PART.format("%m"),
+    "day": PART.format("%d"),
+}
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_change_log'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f'ALTER TABLE report_modifiers ADD COLUMN "{name}" integer '
+                    f"GENERATED ALWAYS AS ({expression}) VIRTUAL",
+                    f'ALTER TABLE report_modifiers DROP COLUMN "{name}"',
+                )
+                for name, expression in COLUMNS.items()
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='reportmodifier',
+                    name='day',
+                    field=models.GeneratedField(db_persist=False, expression=django.db.models.functions.comparison.Cast(models.Func(models.Value('%d'), models.F('as_at_date'), function='strftime', output_field=models.CharField()), models.IntegerField()), output_field=models.IntegerField()),
+                ),
+                migrations.AddField(
+                    model_name='reportmodifier',
+                    name='month',
+                    field=models.GeneratedField(db_persist=False, expression=django.db.models.functions.comparison.Cast(models.Func(models.Value('%m'), models.F('as_at_date'), function='strftime', output_field=models.CharField()), models.IntegerField()), output_field=models.IntegerField()),
+                ),
+                migrations.AddField(
+                    model_name='reportmodifier',
+                    name='quarter',
+                    field=models.GeneratedField(db_persist=False, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast(models.Func(models.Value('%m'), models.F('as_at_date'), function='strftime', output_field=models.CharField()), models.IntegerField()), '+', models.Value(2)), '/', models.Value(3)), output_field=models.IntegerField()),
+                ),
+                migrations.AddField(
+                    model_name='reportmodifier',
+                    name='year',
+                    field=models.GeneratedField(db_persist=False, expression=django.db.models.functions.comparison.Cast(models.Func(models.Value('%Y'), models.F('as_at_date'), function='strftime', output_field=models.CharField()), models.IntegerField()), output_field=models.IntegerField()),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reportmodifier',
+            index=models.Index(fields=['as_at_date'], name='report_modifiers_as_at_date'),
+        ),
+        migrations.AddIndex(
+            model_name='reportmodifier',
+            index=models.Index(fields=['year', 'quarter'], name='report_modifiers_year_quarter'),
+        ),
+        migrations.AddIndex(
+            model_name='reportmodifier',
+            index=models.Index(fields=['year', 'month', 'day'], name='report_modifiers_ymd'),
+        ),
+    ]
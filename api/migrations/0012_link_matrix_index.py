@@ -0,0 +1,20 @@
+from django.db import migrations
+
+# Covers the link matrix query (api.services.links): reading the links in
+# report, modifier order straight from the index, without a sort. The
+# through table is auto-created, so the index cannot be declared on a model.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_modifier_date_parts'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS _jt_report_modifiers_reports_report_modifier "
+            "ON _jt_report_modifiers_reports (report_id, reportmodifier_id)",
+            "DROP INDEX IF EXISTS _jt_report_modifiers_reports_report_modifier",
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.2 on 2026-10-19 15:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_link_matrix_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('reports', models.JSONField()),
+                ('modifiers', models.JSONField()),
+                ('total', models.PositiveIntegerField()),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('linked', models.PositiveIntegerField(default=0)),
+                ('already_linked', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'link_tasks',
+            },
+        ),
+    ]
@@ -0,0 +1,168 @@
+# Generated by Django 5.2.2 on 2026-10-19 16:24
+#
+# Counters kept by triggers (see api.services.counters), so every insert,
+# update and delete keeps them current in its own transaction, including
+# bulk inserts, queryset updates and raw deletes. Counters that drop to
+# zero are deleted; a missing counter reads as 0.
+#
+# The SQL is spelled out here rather than imported from the service, so
+# later changes there cannot change what this migration does.
+
+from django.db import migrations, models
+
+LINKS = "_jt_report_modifiers_reports"
+MEMBERS = "_jt_eventgroup_events"
+TABLES = (
+    "reports", "report_modifiers", "jobs", "events",
+    "api_ringevent", "api_boxevent", "api_geoevent", "api_eventgroup",
+)
+
+
+def bump(name, key, delta, when="1"):
+    """Statements adding ``delta`` to counter ``name[key]`` if ``when``."""
+    statements = [
+        f"INSERT INTO counters (name, key, value) SELECT '{name}', CAST({key} AS TEXT), {delta} "
+        f"WHERE {when} ON CONFLICT (name, key) DO UPDATE SET value = value + excluded.value;"
+    ]
+    if delta < 0:
+        statements.append(
+            f"DELETE FROM counters WHERE name = '{name}' AND key = CAST({key} AS TEXT) AND value = 0;"
+        )
+    return statements
+
+
+def value(name, key):
+    return f"(SELECT value FROM counters WHERE name = '{name}' AND key = CAST({key} AS TEXT))"
+
+
+def trigger(name, event, table, statements, when=None):
+    condition = f" WHEN {when}" if when else ""
+    body = "\n        ".join(statements)
+    return f"""
+    CREATE TRIGGER {name} AFTER {event} ON {table}{condition}
+    BEGIN
+        {body}
+    END
+    """
+
+
+def report_counts(row, delta):
+    return [
+        *bump("rows", "'reports'", delta),
+        *bump("valid_reports", "''", delta, f"{row}.is_valid"),
+        *bump("peril_reports", f"{row}.peril", delta),
+        *bump("group_reports", f"{row}.event_group_id", delta, f"{row}.event_group_id IS NOT NULL"),
+    ]
+
+
+def link_counts(row, delta):
+    if delta > 0:
+        return [
+            *bump("report_modifiers", f"{row}.report_id", 1),
+            *bump("modifier_reports", f"{row}.reportmodifier_id", 1),
+            *bump("linked_reports", "''", 1, f"{value('report_modifiers', f'{row}.report_id')} = 1"),
+            *bump("linked_modifiers", "''", 1, f"{value('modifier_reports', f'{row}.reportmodifier_id')} = 1"),
+        ]
+    return [
+        *bump("report_modifiers", f"{row}.report_id", -1),
+        *bump("modifier_reports", f"{row}.reportmodifier_id", -1),
+        *bump("linked_reports", "''", -1, f"{value('report_modifiers', f'{row}.report_id')} IS NULL"),
+        *bump("linked_modifiers", "''", -1, f"{value('modifier_reports', f'{row}.reportmodifier_id')} IS NULL"),
+    ]
+
+
+def job_counts(row, delta):
+    return [*bump("rows", "'jobs'", delta), *bump("report_jobs", f"{row}.report_id", delta)]
+
+
+def member_counts(row, delta):
+    return [
+        *bump("group_events", f"{row}.eventgroup_id", delta),
+        *bump("event_groups", f"{row}.event_id", delta),
+    ]
+
+
+FORWARD = [
+    trigger("reports_count_insert", "INSERT", "reports", report_counts("NEW", 1)),
+    trigger("reports_count_delete", "DELETE", "reports", report_counts("OLD", -1)),
+    trigger(
+        "reports_count_update", "UPDATE OF is_valid, peril, event_group_id", "reports",
+        [*report_counts("OLD", -1), *report_counts("NEW", 1)],
+        when=(
+            "OLD.is_valid IS NOT NEW.is_valid OR OLD.peril IS NOT NEW.peril "
+            "OR OLD.event_group_id IS NOT NEW.event_group_id"
+        ),
+    ),
+    trigger("links_count_insert", "INSERT", LINKS, link_counts("NEW", 1)),
+    trigger("links_count_delete", "DELETE", LINKS, link_counts("OLD", -1)),
+    trigger("jobs_count_insert", "INSERT", "jobs", job_counts("NEW", 1)),
+    trigger("jobs_count_delete", "DELETE", "jobs", job_counts("OLD", -1)),
+    trigger(
+        "jobs_count_update", "UPDATE OF report_id", "jobs",
+        [*bump("report_jobs", "OLD.report_id", -1), *bump("report_jobs", "NEW.report_id", 1)],
+        when="OLD.report_id IS NOT NEW.report_id",
+    ),
+    trigger("members_count_insert", "INSERT", MEMBERS, member_counts("NEW", 1)),
+    trigger("members_count_delete", "DELETE", MEMBERS, member_counts("OLD", -1)),
+    *(
+        trigger(f"{table}_count_{event.lower()}", event, table, bump("rows", f"'{table}'", delta))
+        for table in TABLES
+        if table not in ("reports", "jobs")
+        for event, delta in (("INSERT", 1), ("DELETE", -1))
+    ),
+    # Counts of existing rows.
+    *(f"INSERT INTO counters (name, key, value) SELECT 'rows', '{table}', COUNT(*) FROM {table}" for table in TABLES),
+    "INSERT INTO counters (name, key, value) SELECT 'valid_reports', '', COUNT(*) FROM reports WHERE is_valid",
+    "INSERT INTO counters (name, key, value) SELECT 'peril_reports', peril, COUNT(*) FROM reports GROUP BY peril",
+    "INSERT INTO counters (name, key, value) SELECT 'group_reports', event_group_id, COUNT(*) FROM reports "
+    "WHERE event_group_id IS NOT NULL GROUP BY event_group_id",
+    f"INSERT INTO counters (name, key, value) SELECT 'report_modifiers', report_id, COUNT(*) FROM {LINKS} GROUP BY report_id",
+    f"INSERT INTO counters (name, key, value) SELECT 'modifier_reports', reportmodifier_id, COUNT(*) FROM {LINKS} "
+    "GROUP BY reportmodifier_id",
+    f"INSERT INTO counters (name, key, value) SELECT 'linked_reports', '', COUNT(DISTINCT report_id) FROM {LINKS}",
+    f"INSERT INTO counters (name, key, value) SELECT 'linked_modifiers', '', COUNT(DISTINCT reportmodifier_id) FROM {LINKS}",
+    "INSERT INTO counters (name, key, value) SELECT 'report_jobs', report_id, COUNT(*) FROM jobs GROUP BY report_id",
+    f"INSERT INTO counters (name, key, value) SELECT 'group_events', eventgroup_id, COUNT(*) FROM {MEMBERS} GROUP BY eventgroup_id",
+    f"INSERT INTO counters (name, key, value) SELECT 'event_groups', event_id, COUNT(*) FROM {MEMBERS} GROUP BY event_id",
+    "DELETE FROM counters WHERE value = 0",
+]
+
+REVERSE = [
+    f"DROP TRIGGER IF EXISTS {name}"
+    for name in (
+        "reports_count_insert", "reports_count_delete", "reports_count_update",
+        "links_count_insert", "links_count_delete",
+        "jobs_count_insert", "jobs_count_delete", "jobs_count_update",
+        "members_count_insert", "members_count_delete",
+        *(
+            f"{table}_count_{event}"
+            for table in TABLES
+            if table not in ("reports", "jobs")
+            for event in ("insert", "delete")
+        ),
+    )
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_link_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32)),
+                ('key', models.CharField(blank=True, default='', max_length=64)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'counters',
+                'constraints': [models.UniqueConstraint(fields=('name', 'key'), name='counters_name_key')],
+            },
+        ),
+        migrations.RunSQL(FORWARD, REVERSE),
+    ]
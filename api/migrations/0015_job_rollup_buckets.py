@@ -0,0 +1,67 @@
+# Generated by Django 5.2.2 on 2026-10-19 18:05
+#
+# Job rollup duration histograms move from a JSON list on each rollup to one
+# row per nonempty bucket, so analytics can sum them in SQL and job writes
+# can update them with relative UPDATEs.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def split_histograms(apps, schema_editor):
+    JobRollup = apps.get_model("api", "JobRollup")
+    JobRollupBucket = apps.get_model("api", "JobRollupBucket")
+    db = schema_editor.connection.alias
+    buckets = []
+    for rollup_id, histogram in JobRollup.objects.using(db).values_list("id", "duration_histogram").iterator(
+        chunk_size=5000
+    ):
+        buckets.extend(
+            JobRollupBucket(rollup_id=rollup_id, bucket=index, count=count)
+            for index, count in enumerate(histogram or [])
+            if count
+        )
+        if len(buckets) >= 5000:
+            JobRollupBucket.objects.using(db).bulk_create(buckets)
+            buckets = []
+    JobRollupBucket.objects.using(db).bulk_create(buckets)
+
+
+def join_histograms(apps, schema_editor):
+    JobRollup = apps.get_model("api", "JobRollup")
+    JobRollupBucket = apps.get_model("api", "JobRollupBucket")
+    db = schema_editor.connection.alias
+    histograms = {}
+    for rollup_id, index, count in JobRollupBucket.objects.using(db).values_list("rollup_id", "bucket", "count"):
+        histogram = histograms.setdefault(rollup_id, [0] * 72)
+        histogram[index] += count
+    for rollup_id, histogram in histograms.items():
+        JobRollup.objects.using(db).filter(pk=rollup_id).update(duration_histogram=histogram)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRollupBucket',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('bucket', models.SmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('rollup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='api.jobrollup')),
+            ],
+            options={
+                'db_table': 'job_rollup_buckets',
+                'constraints': [models.UniqueConstraint(fields=('rollup', 'bucket'), name='job_rollup_buckets_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(split_histograms, join_histograms),
+        migrations.RemoveField(
+            model_name='jobrollup',
+            name='duration_histogram',
+        ),
+    ]
@@ -1,3 +1,6 @@
-from .event import Event, EventGroup, RingEvent, GeoEvent, BoxEvent
-from .job import Job
+from .event import Event, EventGroup, RingEvent, GeoEvent, BoxEvent, Region
+from .job import Job, ArchivedJob, JobRollup, JobRollupBucket
 from .report import Report, ReportModifier
+from .change import Change
+from .task import LinkTask
+from .counter import Counter
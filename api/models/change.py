@@ -0,0 +1,29 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Change(models.Model):
+    """
+    One entry of the change feed: a create, update, delete or membership
+    change of an api resource, recorded by ``api.signals`` (and by the bulk
+    writers in ``api.services``) in the same database as the change.
+
+    ``seq`` only grows, so a mirror that remembers the last ``seq`` it
+    applied reads everything since with one range scan. ``resource`` is the
+    URL name of the resource (``report``, ``event-group``, ...); ``data``
+    carries the event type of events and the ids added or removed by
+    membership changes.
+    """
+
+    seq = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=16)
+    data = models.JSONField(null=True, blank=True)
+    created = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Change {self.seq}: {self.action} {self.resource} {self.object_id}"
+
+    class Meta:
+        db_table = "change_log"
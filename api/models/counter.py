@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class Counter(models.Model):
+    """
+    A row count kept current by the triggers of migration 0014, so that
+    summaries and nested views read counts instead of running COUNT(*).
+    See ``api.services.counters`` for the counters kept and their keys.
+    """
+
+    name = models.CharField(max_length=32)
+    key = models.CharField(max_length=64, blank=True, default="")
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Counter {self.name}[{self.key}] = {self.value}"
+
+    class Meta:
+        db_table = "counters"
+        constraints = [
+            models.UniqueConstraint(fields=["name", "key"], name="counters_name_key"),
+        ]
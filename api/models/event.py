@@ -22,6 +22,15 @@ class Event(models.Model):
     description = models.CharField(max_length=255)
     zone = models.CharField(max_length=255)
     is_valid = models.BooleanField(default=True)
+    updated = models.DateTimeField(auto_now=True)
+    # Hash of the event type and geometry (api.services.hashing); set on save.
+    geometry_hash = models.BigIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        if kwargs.get("update_fields"):
+            # Set by a pre_save handler if geometry fields are among them.
+            kwargs["update_fields"] = {*kwargs["update_fields"], "geometry_hash"}
+        super().save(*args, **kwargs)
 
     class Meta:
         db_table = "events"
@@ -37,6 +46,9 @@ class EventGroup(models.Model):
     )
     created = models.DateTimeField(default=timezone.now)
     updated = models.DateTimeField(auto_now=True)
+    # Sum of the members' geometry hashes (api.services.hashing), kept up to
+    # date on membership and geometry changes.
+    content_hash = models.BigIntegerField(default=0, editable=False)
 
 
 class RingEvent(Event):
@@ -68,8 +80,48 @@ class BoxEvent(Event):
             raise ValidationError("max_lon must be greater than min_lon.")
 
 
+class Region(models.Model):
+    r"""
+    A node of the country > area > subarea > subarea2 hierarchy of geo events.
+
+    ``path`` joins the names from the country down with ``\x1f`` (see
+    ``api.services.regions``), so a region's subtree is the contiguous,
+    indexed range ``[path, path + "\x20")``. ``name_key`` is the lowercased
+    name, for prefix autocomplete.
+    """
+
+    id = models.AutoField(primary_key=True)
+    path = models.CharField(max_length=1024, unique=True)
+    name = models.CharField(max_length=255)
+    name_key = models.CharField(max_length=255, db_index=True)
+    level = models.PositiveSmallIntegerField()
+    parent = models.ForeignKey(
+        "self",
+        related_name="children",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        db_table = "regions"
+        indexes = [models.Index(fields=["parent", "name"])]
+
+    def __str__(self):
+        return " > ".join(self.path.split("\x1f"))
+
+
 class GeoEvent(Event):
     country = models.CharField(max_length=255, null=True, blank=True)
     area = models.CharField(max_length=255, null=True, blank=True)
     subarea = models.CharField(max_length=255, null=True, blank=True)
     subarea2 = models.CharField(max_length=255, null=True, blank=True)
+    # Deepest region of country/area/subarea/subarea2; set on save.
+    region = models.ForeignKey(
+        Region,
+        related_name="geo_events",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+    )
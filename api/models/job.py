@@ -23,3 +23,81 @@ class Job(models.Model):
 
     class Meta:
         db_table = "jobs"
+
+
+class ArchivedJob(models.Model):
+    """
+    A job moved out of the live ``jobs`` table by the archival task.
+
+    Archived jobs live in ``archive_db`` (see ``project.routers``), so the
+    report and modifier are plain ids rather than foreign keys. The field
+    names match ``Job`` so the same filters, ordering and serializer apply.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    report = models.IntegerField(db_column="report_id", db_index=True)
+    report_modifier = models.IntegerField(
+        db_column="report_modifier_id", null=True, blank=True
+    )
+    fireant_jobid = models.IntegerField()
+
+    created = models.DateTimeField(db_index=True)
+    updated = models.DateTimeField()
+    archived = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Archived job {self.id} for Report {self.report}"
+
+    class Meta:
+        db_table = "jobs_archive"
+
+
+class JobRollup(models.Model):
+    """
+    Per report and day totals of jobs, maintained on every job write by
+    ``api.signals`` and rebuilt with ``manage.py rebuild_job_rollups``.
+
+    Durations (``updated`` minus ``created``) are kept as a log-scale
+    histogram, one ``JobRollupBucket`` row per nonempty bucket (see
+    ``api.services.analytics``), so percentiles can be merged across days
+    and reports in SQL without reading the jobs table. Rollups record
+    history: deleting or archiving a job does not remove it from its rollup.
+    """
+
+    id = models.AutoField(primary_key=True)
+    day = models.DateField()
+    report = models.IntegerField(db_column="report_id")
+    peril = models.CharField(max_length=100)
+    priority = models.CharField(max_length=50)
+    job_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    duration_sum = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"Job rollup for Report {self.report} on {self.day}"
+
+    class Meta:
+        db_table = "job_rollups"
+        constraints = [
+            models.UniqueConstraint(fields=["day", "report"], name="job_rollups_day_report")
+        ]
+        indexes = [
+            models.Index(fields=["report", "day"], name="job_rollups_report_day"),
+            models.Index(fields=["peril", "day"], name="job_rollups_peril_day"),
+            models.Index(fields=["priority", "day"], name="job_rollups_priority_day"),
+        ]
+
+
+class JobRollupBucket(models.Model):
+    """The completed jobs of a rollup whose duration falls in one histogram bucket."""
+
+    id = models.AutoField(primary_key=True)
+    rollup = models.ForeignKey(JobRollup, on_delete=models.CASCADE, related_name="buckets")
+    bucket = models.SmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "job_rollup_buckets"
+        constraints = [
+            models.UniqueConstraint(fields=["rollup", "bucket"], name="job_rollup_buckets_rollup_bucket")
+        ]
@@ -1,5 +1,7 @@
 # reporting-backend/api/models/report.py
 from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.functions import Cast
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from .event import EventGroup
@@ -54,12 +56,17 @@ class Report(models.Model):
     is_valid = models.BooleanField(default=True, null=False)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    # Hash of the job inputs (api.services.hashing); set on save.
+    config_hash = models.BigIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"Report {self.id}"
 
     def save(self, *args, **kwargs):
         self.updated = timezone.now()
+        if kwargs.get("update_fields"):
+            # Set by a pre_save handler from the other fields.
+            kwargs["update_fields"] = {*kwargs["update_fields"], "config_hash"}
         super().save(*args, **kwargs)
 
     class Meta:
@@ -67,6 +74,14 @@ class Report(models.Model):
         app_label = "api"
 
 
+def _date_part(part, field):
+    """``strftime(part, field)`` as an integer; deterministic, so usable in generated columns."""
+    return Cast(
+        Func(Value(part), F(field), function="strftime", output_field=models.CharField()),
+        models.IntegerField(),
+    )
+
+
 class ReportModifier(models.Model):
     id = models.AutoField(primary_key=True)
     as_at_date = models.DateField(null=True)
@@ -77,26 +92,35 @@ class ReportModifier(models.Model):
         db_table="_jt_report_modifiers_reports",
         blank=True,
     )
-
-    @property
-    def quarter(self) -> int:
-        if not self.as_at_date:
-            return None
-        month = self.as_at_date.month
-        return (month - 3) // 4
-
-    @property
-    def year(self) -> int:
-        return self.as_at_date.year if self.as_at_date else None
-
-    @property
-    def month(self) -> int:
-        return self.as_at_date.month if self.as_at_date else None
-
-    @property
-    def day(self) -> int:
-        return self.as_at_date.day if self.as_at_date else None
+    updated = models.DateTimeField(auto_now=True)
+    # Parts of as_at_date, computed by SQLite (virtual columns) so they can
+    # be filtered and indexed; NULL without an as_at_date.
+    year = models.GeneratedField(
+        expression=_date_part("%Y", "as_at_date"),
+        output_field=models.IntegerField(),
+        db_persist=False,
+    )
+    quarter = models.GeneratedField(
+        expression=(_date_part("%m", "as_at_date") + 2) / 3,
+        output_field=models.IntegerField(),
+        db_persist=False,
+    )
+    month = models.GeneratedField(
+        expression=_date_part("%m", "as_at_date"),
+        output_field=models.IntegerField(),
+        db_persist=False,
+    )
+    day = models.GeneratedField(
+        expression=_date_part("%d", "as_at_date"),
+        output_field=models.IntegerField(),
+        db_persist=False,
+    )
 
     class Meta:
         db_table = "report_modifiers"
         app_label = "api"
+        indexes = [
+            models.Index(fields=["as_at_date"], name="report_modifiers_as_at_date"),
+            models.Index(fields=["year", "quarter"], name="report_modifiers_year_quarter"),
+            models.Index(fields=["year", "month", "day"], name="report_modifiers_ymd"),
+        ]
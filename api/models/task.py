@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+
+
+class LinkTask(models.Model):
+    """
+    A bulk link of reports to modifiers run by ``api.tasks.link_reports``,
+    for combinations too many to link within a request. The task updates
+    ``processed`` and the counts after every chunk, so the row doubles as
+    its progress report.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (SUCCESS, "Success"),
+        (FAILED, "Failed"),
+    ]
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    reports = models.JSONField()
+    modifiers = models.JSONField()
+    total = models.PositiveIntegerField()
+    processed = models.PositiveIntegerField(default=0)
+    linked = models.PositiveIntegerField(default=0)
+    already_linked = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created = models.DateTimeField(default=timezone.now)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"LinkTask {self.id}: {self.status} {self.processed}/{self.total}"
+
+    class Meta:
+        db_table = "link_tasks"
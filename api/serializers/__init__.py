@@ -2,3 +2,4 @@ from .event import *
 from .job import *
 from .report import *
 from .link import *
+from .change import *
@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from api.models.change import Change
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="object_id")
+
+    class Meta:
+        model = Change
+        fields = ["seq", "resource", "id", "action", "data", "created"]
@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from api.models.event import Event, EventGroup, RingEvent, BoxEvent, GeoEvent
+from api.models.event import Event, EventGroup, RingEvent, BoxEvent, GeoEvent, Region
+from api.services.hashing import hex_hash
+from api.serializers.expand import Expansion, ExpandableSerializerMixin
+from api.serializers.rows import RowEncoder
 import re
 
 
@@ -24,6 +27,13 @@ def validate_longitude(value):
         )
 
 
+class ContentHashField(serializers.ReadOnlyField):
+    """A stored 64-bit content hash, as 16 hex digits."""
+
+    def to_representation(self, value):
+        return hex_hash(value)
+
+
 class EventSerializer(serializers.ModelSerializer):
     event_type = serializers.SerializerMethodField()
 
@@ -41,6 +51,23 @@ class EventSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "is_valid", "event_type"]
 
 
+def event_type(ring, box, geo):
+    """``EventSerializer.get_event_type`` from the ids of the event's typed rows."""
+    if ring is not None:
+        return "ring"
+    elif box is not None:
+        return "box"
+    elif geo is not None:
+        return "geo"
+    return "base"
+
+
+EVENT_ROWS = RowEncoder(
+    EventSerializer,
+    computed={"event_type": (("ringevent", "boxevent", "geoevent"), event_type)},
+)
+
+
 class RingEventSerializer(serializers.ModelSerializer):
     event_type = serializers.SerializerMethodField()
 
@@ -117,19 +144,57 @@ class GeoEventSerializer(serializers.ModelSerializer):
             "area",
             "subarea",
             "subarea2",
+            "region",
             "event_type",
         ]
+        read_only_fields = ["region"]
+
+
+class TypedEventSerializer(serializers.BaseSerializer):
+    """An event with the fields of its type (ring, box or geo)."""
+
+    def to_representation(self, event):
+        if hasattr(event, "geoevent") and event.geoevent:
+            return GeoEventSerializer(event.geoevent).data
+        elif hasattr(event, "ringevent") and event.ringevent:
+            return RingEventSerializer(event.ringevent).data
+        elif hasattr(event, "boxevent") and event.boxevent:
+            return BoxEventSerializer(event.boxevent).data
+        return EventSerializer(event).data
+
 
+def typed_events():
+    return Event.objects.select_related("ringevent", "boxevent", "geoevent")
 
-class EventGroupSerializer(serializers.ModelSerializer):
+
+EVENT_GROUP_EXPANDABLE = {
+    "events": Expansion("TypedEventSerializer", many=True, queryset=typed_events),
+    "reports": Expansion("ReportSerializer", many=True, prefetch=("event_group", "modifiers")),
+}
+
+
+class RegionSerializer(serializers.ModelSerializer):
+    path = serializers.SerializerMethodField()
+
+    def get_path(self, obj):
+        return obj.path.split("\x1f")
+
+    class Meta:
+        model = Region
+        fields = ["id", "name", "level", "parent", "path"]
+
+
+class EventGroupSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
     events = EventSerializer(many=True, read_only=True)
     event_ids = serializers.PrimaryKeyRelatedField(
         queryset=Event.objects.all(), many=True, write_only=True, source="events"
     )
+    content_hash = ContentHashField()
+    expandable = EVENT_GROUP_EXPANDABLE
 
     class Meta:
         model = EventGroup
-        fields = ["id", "name", "events", "event_ids", "created", "updated"]
+        fields = ["id", "name", "events", "event_ids", "created", "updated", "content_hash"]
 
     def validate(self, data):
         event_ids = data.get("event_ids", [])
@@ -155,24 +220,22 @@ class EventGroupSerializer(serializers.ModelSerializer):
 
 class EventGroupDetailedSerializer(serializers.ModelSerializer):
     events = serializers.SerializerMethodField()
+    content_hash = ContentHashField()
 
     class Meta:
         model = EventGroup
-        fields = ["id", "name", "created", "updated", "events"]
+        fields = ["id", "name", "created", "updated", "content_hash", "events"]
 
     def get_events(self, obj):
-        events = obj.events.all()
-        serialized_events = []
-        for event in events:
-            if hasattr(event, "geoevent") and event.geoevent:
-                serialized_events.append(
-                    GeoEventSerializer(event.geoevent).data)
-            elif hasattr(event, "ringevent") and event.ringevent:
-                serialized_events.append(
-                    RingEventSerializer(event.ringevent).data)
-            elif hasattr(event, "boxevent") and event.boxevent:
-                serialized_events.append(
-                    BoxEventSerializer(event.boxevent).data)
-            else:
-                serialized_events.append(EventSerializer(event).data)
-        return serialized_events
+        return TypedEventSerializer(obj.events.all(), many=True).data
+
+
+class EventGroupSummarySerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
+    """An event group without its events, for inlining into reports."""
+
+    content_hash = ContentHashField()
+    expandable = EVENT_GROUP_EXPANDABLE
+
+    class Meta:
+        model = EventGroup
+        fields = ["id", "name", "created", "updated", "content_hash"]
@@ -0,0 +1,92 @@
+from importlib import import_module
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class Expansion:
+    """
+    A relation that ``?expand=`` can inline.
+
+    ``serializer`` names a serializer in ``api.serializers`` (by name, as
+    serializers refer to each other both ways). ``many`` relations are
+    prefetched, single ones joined with ``select_related`` unless a ``many``
+    relation comes before them on the path. ``queryset`` replaces the
+    prefetched rows' default queryset; ``prefetch`` lists lookups, relative
+    to the related rows, that their serializer always needs.
+    """
+
+    def __init__(self, serializer, many=False, queryset=None, prefetch=()):
+        self.serializer = serializer
+        self.many = many
+        self.queryset = queryset
+        self.prefetch = prefetch
+
+    @property
+    def serializer_class(self):
+        return getattr(import_module("api.serializers"), self.serializer)
+
+
+def parse_expand(value, serializer_class):
+    """
+    ``"event_group.events,modifiers"`` as ``{"event_group": {"events": {}}, "modifiers": {}}``,
+    checked against the ``expandable`` relations of ``serializer_class`` and of the
+    serializers it expands into.
+    """
+    tree = {}
+    for path in filter(None, (p.strip() for p in value.split(","))):
+        node, current = tree, serializer_class
+        for name in path.split("."):
+            expandable = getattr(current, "expandable", {})
+            if name not in expandable:
+                choices = ", ".join(sorted(expandable)) or "nothing"
+                raise serializers.ValidationError(
+                    {"expand": f"Cannot expand {name!r} in {path!r}; expected {choices}."}
+                )
+            node = node.setdefault(name, {})
+            current = expandable[name].serializer_class
+    return tree
+
+
+def expand_lookups(serializer_class, tree, prefix="", many=False):
+    """``(select_related, prefetch_related)`` lookups that serializing ``tree`` needs."""
+    select, prefetch = [], []
+    for name, children in tree.items():
+        expansion = serializer_class.expandable[name]
+        lookup = prefix + name
+        below = many or expansion.many
+        if expansion.queryset is not None:
+            prefetch.append(Prefetch(lookup, queryset=expansion.queryset()))
+        elif below:
+            prefetch.append(lookup)
+        else:
+            select.append(lookup)
+        prefetch.extend(f"{lookup}__{related}" for related in expansion.prefetch)
+        nested = expand_lookups(expansion.serializer_class, children, f"{lookup}__", below)
+        select.extend(nested[0])
+        prefetch.extend(nested[1])
+    return select, prefetch
+
+
+class ExpandableSerializerMixin:
+    """
+    Inlines the relations in ``context["expand"]`` (see ``parse_expand``)
+    in place of, or next to, the serializer's own fields.
+    """
+
+    expandable = {}
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name, children in self.context.get("expand", {}).items():
+            expansion = self.expandable[name]
+            value = getattr(instance, name)
+            if value is None:
+                data[name] = None
+                continue
+            if expansion.many:
+                value = value.all()
+            data[name] = expansion.serializer_class(
+                value, many=expansion.many, context={**self.context, "expand": children}
+            ).data
+        return data
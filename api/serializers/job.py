@@ -1,6 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
 from api.models.report import Report, ReportModifier
 from api.models.job import Job
+from api.services.overlaps import event_group_overlaps
+from api.serializers.rows import RowEncoder
 
 
 class JobSerializer(serializers.ModelSerializer):
@@ -12,3 +15,32 @@ class JobSerializer(serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = ["id", "report", "report_modifier", "created", "updated"]
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        report = attrs.get("report")
+        if (
+            self.instance is None
+            and settings.JOB_LAUNCH_CHECK_OVERLAPS
+            and report is not None
+            and report.event_group_id is not None
+            and report.no_overlap_radius
+        ):
+            result = event_group_overlaps(
+                report.event_group, report.no_overlap_radius, max_pairs=10
+            )
+            if result["pair_count"]:
+                raise serializers.ValidationError(
+                    {
+                        "report": (
+                            f"Event group {report.event_group_id} has "
+                            f"{result['pair_count']} ring pairs closer than "
+                            f"{report.no_overlap_radius} km, e.g. "
+                            f"{[pair['events'] for pair in result['pairs']]}."
+                        )
+                    }
+                )
+        return attrs
+
+
+JOB_ROWS = RowEncoder(JobSerializer)
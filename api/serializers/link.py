@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.models.task import LinkTask
 
 
 class LinkReportToModifierSerializerOut(serializers.Serializer):
@@ -25,3 +26,27 @@ class LinkMultipleReportsToModifiersOut(serializers.Serializer):
     status = serializers.CharField(max_length=100)
     reports = serializers.ListField(child=serializers.IntegerField())
     modifiers = serializers.ListField(child=serializers.IntegerField())
+
+
+class LinkTaskSerializer(serializers.ModelSerializer):
+    """Progress and statistics of a bulk link run in the background"""
+
+    reports = serializers.SerializerMethodField()
+    modifiers = serializers.SerializerMethodField()
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LinkTask
+        fields = [
+            "id", "status", "reports", "modifiers", "total", "processed", "progress",
+            "linked", "already_linked", "error", "created", "started", "finished",
+        ]
+
+    def get_reports(self, obj) -> int:
+        return len(obj.reports)
+
+    def get_modifiers(self, obj) -> int:
+        return len(obj.modifiers)
+
+    def get_progress(self, obj) -> float:
+        return round(obj.processed / obj.total, 4) if obj.total else 1.0
@@ -1,21 +1,27 @@
 from rest_framework import serializers
 from api.models.report import Report, ReportModifier
 from api.models.event import EventGroup
-from api.serializers.event import EventGroupDetailedSerializer
+from api.serializers.event import ContentHashField, EventGroupDetailedSerializer
+from api.serializers.expand import Expansion, ExpandableSerializerMixin
+from api.serializers.rows import RowEncoder
 
 
-class ReportModifierSerializer(serializers.ModelSerializer):
+class ReportModifierSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
     quarter = serializers.ReadOnlyField()
     year = serializers.ReadOnlyField()
     month = serializers.ReadOnlyField()
     day = serializers.ReadOnlyField()
+    expandable = {
+        "reports": Expansion("ReportSerializer", many=True, prefetch=("event_group", "modifiers")),
+        "jobs": Expansion("JobSerializer", many=True),
+    }
 
     class Meta:
         model = ReportModifier
         fields = ["id", "as_at_date", "fx_date", "quarter", "year", "month", "day"]
 
 
-class ReportSerializer(serializers.HyperlinkedModelSerializer):
+class ReportSerializer(ExpandableSerializerMixin, serializers.HyperlinkedModelSerializer):
     modifiers = serializers.HyperlinkedRelatedField(
         many=True,
         read_only=True,
@@ -35,6 +41,12 @@ class ReportSerializer(serializers.HyperlinkedModelSerializer):
         lookup_field="id",
         lookup_url_kwarg="pk",
     )
+    config_hash = ContentHashField()
+    expandable = {
+        "event_group": Expansion("EventGroupSummarySerializer"),
+        "modifiers": Expansion("ReportModifierSerializer", many=True),
+        "jobs": Expansion("JobSerializer", many=True),
+    }
 
     class Meta:
         model = Report
@@ -52,7 +64,12 @@ class ReportSerializer(serializers.HyperlinkedModelSerializer):
         return data
 
 
+REPORT_ROWS = RowEncoder(ReportSerializer)
+
+
 class _ReportWithoutModifierSerializer(serializers.ModelSerializer):
+    config_hash = ContentHashField()
+
     class Meta:
         model = Report
         fields = "__all__"  # Include all model fields
@@ -76,3 +93,16 @@ class ReportWithAllSerializer(serializers.Serializer):
     report = _ReportWithoutModifierSerializer()
     eventgroup = EventGroupDetailedSerializer()
     modifier = ReportModifierSerializer(required=False)
+
+
+class RollForwardSerializer(serializers.Serializer):
+    from_date = serializers.DateField(
+        help_text="Any day of the source quarter; required so that retrying cannot roll a second quarter"
+    )
+    months = serializers.IntegerField(default=3, min_value=1, max_value=24)
+    reports = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Only these reports (default: all valid reports)",
+    )
+    create_jobs = serializers.BooleanField(default=False)
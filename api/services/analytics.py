@@ -0,0 +1,292 @@
+"""
+Job throughput and duration analytics.
+
+Each job contributes to the ``JobRollup`` row of its report and creation day:
+one to ``job_count`` and, once it has run for at least
+``MIN_DURATION_SECONDS``, its duration to a log-scale histogram kept as
+``JobRollupBucket`` rows of the rollup. Bucket ``i`` (``i >= 1``) holds
+durations in ``[GROWTH ** (i - 1), GROWTH ** i)`` seconds and bucket 0
+anything shorter than a second, so percentiles estimated from merged
+histograms are within one bucket width (25%) of the exact value.
+"""
+
+import math
+from collections import defaultdict
+from datetime import date, timezone as dt_timezone
+
+from django.db import router, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from api.models.job import ArchivedJob, Job, JobRollup, JobRollupBucket
+from api.models.report import Report
+
+GROWTH = 1.25
+BUCKETS = 72  # up to GROWTH ** 71 seconds, about 88 days
+# ``created`` and ``updated`` are stamped microseconds apart on insert, so a
+# job only counts as completed once it has been updated at least this late.
+MIN_DURATION_SECONDS = 1.0
+
+GROUP_FIELDS = ("report", "peril", "priority")
+BUCKET_SIZES = ("day", "week", "month")
+
+
+def bucket_index(seconds: float) -> int:
+    if seconds < 1:
+        return 0
+    return min(int(math.log(seconds, GROWTH)) + 1, BUCKETS - 1)
+
+
+def bucket_bounds(index: int) -> tuple[float, float]:
+    if index == 0:
+        return 0.0, 1.0
+    return GROWTH ** (index - 1), GROWTH**index
+
+
+def percentile(histogram: list[int], q: float) -> float | None:
+    """Estimate the ``q``-th percentile of a duration histogram."""
+    total = sum(histogram)
+    if not total:
+        return None
+    target = q / 100 * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= target:
+            lower, upper = bucket_bounds(index)
+            return lower + (target - seen) / count * (upper - lower)
+        seen += count
+    return bucket_bounds(len(histogram) - 1)[1]
+
+
+def job_contribution(created, updated):
+    """The (day, duration) a job contributes; duration is None while running."""
+    day = created.astimezone(dt_timezone.utc).date()
+    seconds = (updated - created).total_seconds()
+    return day, (seconds if seconds >= MIN_DURATION_SECONDS else None)
+
+
+def _change_rollup(day, report_id, duration, sign, labels=None):
+    """
+    Add (``sign`` 1) or remove (-1) one job of ``duration`` in the rollup of
+    ``report_id`` on ``day``, with UPDATEs relative to the stored counts so
+    concurrent writers cannot lose each other's changes. A missing rollup is
+    created with ``labels`` (its peril and priority), if given.
+    """
+    changes = {"job_count": F("job_count") + sign, **(labels or {})}
+    if duration is not None:
+        changes["completed_count"] = F("completed_count") + sign
+        changes["duration_sum"] = F("duration_sum") + sign * duration
+    rollups = JobRollup.objects.filter(day=day, report=report_id)
+    if not rollups.update(**changes):
+        if labels is None:
+            return
+        JobRollup.objects.create(
+            day=day,
+            report=report_id,
+            job_count=1,
+            completed_count=0 if duration is None else 1,
+            duration_sum=duration or 0,
+            **labels,
+        )
+    if duration is None:
+        return
+    index = bucket_index(duration)
+    buckets = JobRollupBucket.objects.filter(rollup__in=rollups, bucket=index)
+    if not buckets.update(count=F("count") + sign) and sign > 0:
+        JobRollupBucket.objects.create(
+            rollup_id=rollups.values_list("pk", flat=True).get(), bucket=index, count=1
+        )
+
+
+def update_job_rollups(previous, job: Job):
+    """
+    Move a job's contribution from ``previous`` to its current state.
+
+    ``previous`` is a ``(report_id, created, updated)`` tuple of the stored
+    row before the write, or None for a new job.
+    """
+    report = job.report
+    with transaction.atomic(using=router.db_for_write(JobRollup)):
+        if previous is not None:
+            report_id, created, updated = previous
+            day, duration = job_contribution(created, updated)
+            _change_rollup(day, report_id, duration, -1)
+        day, duration = job_contribution(job.created, job.updated)
+        _change_rollup(
+            day, report.id, duration, 1, labels={"peril": report.peril, "priority": report.priority}
+        )
+
+
+def update_rollup_labels(report_ids):
+    """Copy the current peril and priority of ``report_ids`` to their rollups."""
+    labels = defaultdict(list)
+    for report_id, peril, priority in Report.objects.filter(pk__in=report_ids).values_list(
+        "id", "peril", "priority"
+    ):
+        labels[(peril, priority)].append(report_id)
+    with transaction.atomic(using=router.db_for_write(JobRollup)):
+        for (peril, priority), ids in labels.items():
+            JobRollup.objects.filter(report__in=ids).exclude(peril=peril, priority=priority).update(
+                peril=peril, priority=priority
+            )
+
+
+def add_new_job_rollups(jobs):
+    """Count bulk-inserted, not yet run ``jobs`` in their rollups, a few queries in all."""
+    counts = defaultdict(int)
+    for job in jobs:
+        counts[(job_contribution(job.created, job.updated)[0], job.report_id)] += 1
+    if not counts:
+        return
+    report_ids = {report_id for _, report_id in counts}
+    reports = {
+        report_id: (peril, priority)
+        for report_id, peril, priority in Report.objects.filter(pk__in=report_ids).values_list(
+            "id", "peril", "priority"
+        )
+    }
+    with transaction.atomic(using=router.db_for_write(JobRollup)):
+        existing = {
+            (day, report_id): pk
+            for pk, day, report_id in JobRollup.objects.filter(
+                day__in={day for day, _ in counts}, report__in=report_ids
+            ).values_list("pk", "day", "report")
+        }
+        # One relative UPDATE per distinct number of new jobs, usually one.
+        by_count = defaultdict(list)
+        new = []
+        for (day, report_id), count in counts.items():
+            if (day, report_id) in existing:
+                by_count[count].append(existing[(day, report_id)])
+            else:
+                peril, priority = reports.get(report_id, ("", ""))
+                new.append(
+                    JobRollup(day=day, report=report_id, peril=peril, priority=priority, job_count=count)
+                )
+        for count, pks in by_count.items():
+            for start in range(0, len(pks), 5000):
+                JobRollup.objects.filter(pk__in=pks[start : start + 5000]).update(
+                    job_count=F("job_count") + count
+                )
+        JobRollup.objects.bulk_create(new, batch_size=1000)
+
+
+def rebuild_job_rollups() -> int:
+    """Recompute every rollup from the live and archived jobs."""
+    reports = {
+        report_id: (peril, priority)
+        for report_id, peril, priority in Report.objects.values_list(
+            "id", "peril", "priority"
+        )
+    }
+    rollups: dict[tuple[date, int], JobRollup] = {}
+    histograms = defaultdict(lambda: defaultdict(int))
+
+    def add(report_id, created, updated):
+        day, duration = job_contribution(created, updated)
+        rollup = rollups.get((day, report_id))
+        if rollup is None:
+            peril, priority = reports.get(report_id, ("", ""))
+            rollup = rollups[(day, report_id)] = JobRollup(
+                day=day, report=report_id, peril=peril, priority=priority
+            )
+        rollup.job_count += 1
+        if duration is not None:
+            rollup.completed_count += 1
+            rollup.duration_sum += duration
+            histograms[(day, report_id)][bucket_index(duration)] += 1
+
+    for row in Job.objects.values_list("report_id", "created", "updated").iterator(
+        chunk_size=10000
+    ):
+        add(*row)
+    for row in ArchivedJob.objects.values_list("report", "created", "updated").iterator(
+        chunk_size=10000
+    ):
+        add(*row)
+
+    with transaction.atomic(using=router.db_for_write(JobRollup)):
+        JobRollup.objects.all().delete()
+        JobRollup.objects.bulk_create(rollups.values(), batch_size=1000)
+        JobRollupBucket.objects.bulk_create(
+            (
+                JobRollupBucket(rollup_id=rollups[key].pk, bucket=index, count=count)
+                for key, histogram in histograms.items()
+                for index, count in histogram.items()
+            ),
+            batch_size=5000,
+        )
+    return len(rollups)
+
+
+def _bucket_start(field: str, size: str):
+    """The first day of the ``size`` bucket of the date ``field``, in SQL."""
+    if size == "week":
+        return TruncWeek(field)
+    if size == "month":
+        return TruncMonth(field)
+    return F(field)
+
+
+def job_analytics(
+    *,
+    group_by=("report",),
+    bucket="day",
+    start=None,
+    end=None,
+    filters=None,
+    percentiles=(50, 90, 99),
+) -> list[dict]:
+    """
+    Aggregate rollups into per-bucket, per-group counts and durations.
+
+    Two grouped queries do the summing: one over the rollups' counts and
+    one over their histogram buckets, so only one row per group (and per
+    nonempty duration bucket) comes back whatever the range.
+    """
+    rollups = JobRollup.objects.all()
+    if start is not None:
+        rollups = rollups.filter(day__gte=start)
+    if end is not None:
+        rollups = rollups.filter(day__lte=end)
+    for field, values in (filters or {}).items():
+        rollups = rollups.filter(**{f"{field}__in": values})
+
+    totals = (
+        rollups.annotate(bucket_start=_bucket_start("day", bucket))
+        .values("bucket_start", *group_by)
+        .annotate(jobs=Sum("job_count"), completed=Sum("completed_count"), duration=Sum("duration_sum"))
+        .order_by()
+    )
+    histograms = defaultdict(lambda: [0] * BUCKETS)
+    for row in (
+        JobRollupBucket.objects.filter(rollup__in=rollups)
+        .annotate(bucket_start=_bucket_start("rollup__day", bucket))
+        .values("bucket_start", *(f"rollup__{field}" for field in group_by), "bucket")
+        .annotate(jobs=Sum("count"))
+        .order_by()
+    ):
+        key = (row["bucket_start"], *(row[f"rollup__{field}"] for field in group_by))
+        histograms[key][row["bucket"]] += row["jobs"]
+
+    groups = {
+        (row["bucket_start"], *(row[field] for field in group_by)): row for row in totals
+    }
+    results = []
+    for key in sorted(groups, key=lambda k: tuple((v is None, v) for v in k)):
+        group = groups[key]
+        completed = group["completed"]
+        histogram = histograms[key]
+        results.append(
+            {
+                "bucket": key[0].isoformat(),
+                **dict(zip(group_by, key[1:])),
+                "jobs": group["jobs"],
+                "completed": completed,
+                "duration_seconds": {
+                    "mean": group["duration"] / completed if completed else None,
+                    **{f"p{q:g}": percentile(histogram, q) for q in percentiles},
+                },
+            }
+        )
+    return results
@@ -0,0 +1,156 @@
+"""
+Job archival.
+
+Jobs older than ``JOB_ARCHIVE_AFTER_DAYS`` are copied in batches into the
+``jobs_archive`` table of ``archive_db`` and then deleted from the live
+``jobs`` table, so ordering and filtering on ``jobs`` stay fast.
+
+The copy and the delete are separate transactions on separate databases,
+so a run that fails between them leaves the batch in both: still live,
+and listed twice with ``?include_archived``. Rerunning reconciles this:
+the jobs are still old, so the next run copies them again, overwriting
+the earlier copies with the live rows, and deletes them. The daily task
+is that rerun; after a failed manual run, run it again.
+"""
+
+import functools
+import heapq
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models.job import ArchivedJob, Job
+from api.services.changes import changes_suppressed, record_changes
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = ("id", "report_id", "report_modifier_id", "fireant_jobid", "created", "updated")
+
+
+def archive_old_jobs(older_than_days=None, batch_size=None) -> dict:
+    """Move jobs created more than ``older_than_days`` ago to the archive database."""
+    if older_than_days is None:
+        older_than_days = settings.JOB_ARCHIVE_AFTER_DAYS
+    if batch_size is None:
+        batch_size = settings.JOB_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    live_db = router.db_for_write(Job)
+    archive_db = router.db_for_write(ArchivedJob)
+
+    moved = 0
+    batches = 0
+    while True:
+        rows = list(
+            Job.objects.filter(created__lt=cutoff)
+            .order_by("id")
+            .values_list(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        now = timezone.now()
+        with transaction.atomic(using=archive_db):
+            ArchivedJob.objects.bulk_create(
+                [
+                    ArchivedJob(
+                        id=job_id,
+                        report=report_id,
+                        report_modifier=modifier_id,
+                        fireant_jobid=fireant_jobid,
+                        created=created,
+                        updated=updated,
+                        archived=now,
+                    )
+                    for job_id, report_id, modifier_id, fireant_jobid, created, updated in rows
+                ],
+                # Copies left by a run that failed before deleting are
+                # replaced, as the live rows may have changed since.
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=["report", "report_modifier", "fireant_jobid", "created", "updated", "archived"],
+            )
+        job_ids = [row[0] for row in rows]
+        with transaction.atomic(using=live_db):
+            with changes_suppressed():
+                Job.objects.filter(id__in=job_ids).delete()
+            record_changes("job", job_ids, "archive")
+        moved += len(rows)
+        batches += 1
+        logger.info(f"Archived batch of {len(rows)} jobs (total {moved})")
+
+    return {
+        "cutoff": cutoff.isoformat(),
+        "archived": moved,
+        "batches": batches,
+    }
+
+
+class MergedQuerySets:
+    """
+    Read-only sequence over querysets from different databases, merged by a
+    common ordering.
+
+    It supports ``count()`` and slicing, which is all ``Paginator`` needs.
+    Fetching a slice ending at ``stop`` reads at most ``stop`` rows from
+    each queryset, so deep pages get slower with their offset. ``after``
+    reads a page following a given row at the cost of one page per
+    queryset; the ordering must end with a unique field and hold no nulls.
+    """
+
+    def __init__(self, querysets, ordering):
+        self.querysets = [qs.order_by(*ordering) for qs in querysets]
+        self.ordering = [
+            (term.lstrip("-"), term.startswith("-")) for term in ordering
+        ]
+
+    def _compare(self, a, b):
+        for name, descending in self.ordering:
+            left, right = getattr(a, name), getattr(b, name)
+            if left == right:
+                continue
+            if left is None or right is None:
+                result = -1 if left is None else 1
+            else:
+                result = -1 if left < right else 1
+            return -result if descending else result
+        return 0
+
+    @functools.cached_property
+    def _count(self):
+        return sum(qs.count() for qs in self.querysets)
+
+    def count(self):
+        return self._count
+
+    def __len__(self):
+        return self._count
+
+    def _after(self, values):
+        """``Q`` of the rows that come after a row with ``values`` of the ordering fields."""
+        condition = Q()
+        for i in reversed(range(len(self.ordering))):
+            name, descending = self.ordering[i]
+            term = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            equal = Q(**{name: value for (name, _), value in zip(self.ordering[:i], values)})
+            condition |= equal & term
+        return condition
+
+    def after(self, row, limit):
+        """The ``limit`` rows following ``row`` (any row of one of the querysets)."""
+        condition = self._after([getattr(row, name) for name, _ in self.ordering])
+        parts = [list(qs.filter(condition)[:limit]) for qs in self.querysets]
+        merged = heapq.merge(*parts, key=functools.cmp_to_key(self._compare))
+        return list(islice(merged, limit))
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key : key + 1][0]
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self._count
+        parts = [list(qs[:stop]) for qs in self.querysets]
+        merged = heapq.merge(*parts, key=functools.cmp_to_key(self._compare))
+        return list(islice(merged, start, stop))
@@ -0,0 +1,248 @@
+"""
+Location breakout caps.
+
+A location breakout of a report with ``is_location_breakout`` keeps only the
+``location_breakout_max_events`` events and ``location_breakout_max_locations``
+locations with the largest total loss. Breakouts can be far larger than
+memory, so ``trim_breakout`` streams them twice in chunks:
+
+1. sum loss per event and per location, then keep the ids of the top N of
+   each (``np.argpartition`` over the totals);
+2. stream the rows again and pass those of kept events *and* kept locations
+   to a sink.
+
+Memory is bounded by the chunk size plus one total per event and location
+id, however many rows the breakout has.
+"""
+
+import io
+from itertools import islice
+
+import numpy as np
+
+COLUMNS = {
+    "event_id": ("event_id", "event", "eventid"),
+    "location_id": ("location_id", "location", "locid"),
+    "loss": ("loss", "value"),
+}
+CHUNK_ROWS = 1_000_000
+# Ids below this are counted in arrays indexed by id (8 bytes per id).
+DENSE_IDS = 1 << 25
+
+
+class _Totals:
+    """
+    Running loss total per id.
+
+    Ids in ``[0, DENSE_IDS)`` are summed straight into arrays indexed by id,
+    without sorting. Once any id falls outside that range the totals switch
+    to sorted unique ids and sums; chunks are then summed on their own and
+    merged only once they outnumber the totals, so each row is re-sorted a
+    logarithmic number of times rather than once per chunk.
+    """
+
+    def __init__(self):
+        self._dense = np.zeros(0)
+        self._seen = np.zeros(0, dtype=bool)
+        self._ids = None
+        self._sums = None
+        self._pending = []
+        self._pending_rows = 0
+
+    @staticmethod
+    def _sum(ids, losses):
+        ids, inverse = np.unique(ids, return_inverse=True)
+        return ids, np.bincount(inverse.ravel(), weights=losses, minlength=len(ids))
+
+    def add(self, ids, losses):
+        if not len(ids):
+            return
+        if self._ids is None:
+            low, high = ids.min(), ids.max()
+            if low >= 0 and high < DENSE_IDS:
+                if high >= len(self._dense):
+                    size = min(max(int(high) + 1, 2 * len(self._dense)), DENSE_IDS)
+                    self._dense = np.concatenate((self._dense, np.zeros(size - len(self._dense))))
+                    self._seen = np.concatenate(
+                        (self._seen, np.zeros(size - len(self._seen), dtype=bool))
+                    )
+                self._dense += np.bincount(ids, weights=losses, minlength=len(self._dense))
+                self._seen[ids] = True
+                return
+            # Switch to sorted ids for good.
+            self._ids = np.flatnonzero(self._seen)
+            self._sums = self._dense[self._ids]
+            self._dense, self._seen = np.zeros(0), np.zeros(0, dtype=bool)
+
+        self._pending.append(self._sum(ids, losses))
+        self._pending_rows += len(self._pending[-1][0])
+        if self._pending_rows > len(self._ids):
+            self._merge()
+
+    def _merge(self):
+        if self._pending:
+            parts = [(self._ids, self._sums), *self._pending]
+            self._ids, self._sums = self._sum(
+                np.concatenate([ids for ids, _ in parts]),
+                np.concatenate([sums for _, sums in parts]),
+            )
+            self._pending, self._pending_rows = [], 0
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            return np.flatnonzero(self._seen)
+        self._merge()
+        return self._ids
+
+    @property
+    def sums(self):
+        if self._ids is None:
+            return self._dense[self._seen]
+        self._merge()
+        return self._sums
+
+    def top(self, n: int) -> np.ndarray:
+        """Sorted ids of the ``n`` largest totals; ties go to the smaller id."""
+        ids, sums = self.ids, self.sums
+        if n >= len(ids):
+            return ids
+        # Partition out the top n, then settle ties at the boundary by id.
+        cutoff = sums[np.argpartition(-sums, n - 1)[:n]].min()
+        candidates = np.flatnonzero(sums >= cutoff)
+        order = np.lexsort((ids[candidates], -sums[candidates]))[:n]
+        return np.sort(ids[candidates[order]])
+
+
+class _Membership:
+    """Fast ``isin`` against a fixed sorted id array."""
+
+    def __init__(self, sorted_ids):
+        self.sorted_ids = sorted_ids
+        self.lookup = None
+        if len(sorted_ids) and sorted_ids[0] >= 0 and sorted_ids[-1] < DENSE_IDS:
+            self.lookup = np.zeros(int(sorted_ids[-1]) + 1, dtype=bool)
+            self.lookup[sorted_ids] = True
+
+    def __call__(self, values):
+        if self.lookup is not None:
+            inside = (values >= 0) & (values < len(self.lookup))
+            result = np.zeros(len(values), dtype=bool)
+            result[inside] = self.lookup[values[inside]]
+            return result
+        if not len(self.sorted_ids):
+            return np.zeros(len(values), dtype=bool)
+        positions = np.searchsorted(self.sorted_ids, values)
+        positions[positions == len(self.sorted_ids)] = 0
+        return self.sorted_ids[positions] == values
+
+
+def trim_breakout(chunks, sink, max_events: int, max_locations: int) -> dict:
+    """
+    Stream the breakout rows of ``chunks()`` through the caps into ``sink``.
+
+    ``chunks`` is called once per pass and returns an iterable of
+    ``(event_ids, location_ids, losses)`` arrays; ``sink`` is called with
+    the same for every chunk of kept rows.
+    """
+    events, locations = _Totals(), _Totals()
+    rows = 0
+    for event_ids, location_ids, losses in chunks():
+        events.add(event_ids, losses)
+        locations.add(location_ids, losses)
+        rows += len(losses)
+
+    kept_events = events.top(max_events)
+    kept_locations = locations.top(max_locations)
+    is_kept_event, is_kept_location = _Membership(kept_events), _Membership(kept_locations)
+    kept_rows = 0
+    kept_loss = 0.0
+    for event_ids, location_ids, losses in chunks():
+        keep = is_kept_event(event_ids) & is_kept_location(location_ids)
+        if keep.any():
+            sink(event_ids[keep], location_ids[keep], losses[keep])
+            kept_rows += int(keep.sum())
+            kept_loss += float(losses[keep].sum())
+
+    return {
+        "rows": rows,
+        "rows_kept": kept_rows,
+        "events": len(events.ids),
+        "events_kept": len(kept_events),
+        "locations": len(locations.ids),
+        "locations_kept": len(kept_locations),
+        "loss": float(events.sums.sum()),
+        "loss_kept": kept_loss,
+        "max_events": max_events,
+        "max_locations": max_locations,
+    }
+
+
+def report_caps(report):
+    """``(max_events, max_locations)`` of a report, or None without a breakout."""
+    if report is None or not report.is_location_breakout:
+        return None
+    return report.location_breakout_max_events, report.location_breakout_max_locations
+
+
+def array_chunks(event_ids, location_ids, losses, chunk_rows=CHUNK_ROWS):
+    """Chunk factory over in-memory or memory-mapped arrays."""
+
+    def chunks():
+        for start in range(0, len(losses), chunk_rows):
+            stop = start + chunk_rows
+            yield (
+                np.asarray(event_ids[start:stop], dtype=np.int64),
+                np.asarray(location_ids[start:stop], dtype=np.int64),
+                np.asarray(losses[start:stop], dtype=np.float64),
+            )
+
+    return chunks
+
+
+def csv_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Chunk factory reading a breakout CSV with a header row."""
+
+    def chunks():
+        with open(path, encoding="utf-8", newline="") as f:
+            header = [name.strip().lower() for name in f.readline().split(",")]
+            usecols = []
+            for name, aliases in COLUMNS.items():
+                index = next(
+                    (header.index(alias) for alias in aliases if alias in header),
+                    None,
+                )
+                if index is None:
+                    raise ValueError(f"Missing column '{name}' in {path}.")
+                usecols.append(index)
+            while True:
+                lines = list(islice(f, chunk_rows))
+                if not lines:
+                    return
+                try:
+                    table = np.loadtxt(lines, delimiter=",", usecols=usecols, ndmin=2)
+                except ValueError as e:
+                    raise ValueError(f"Invalid breakout CSV: {e}")
+                event_ids = table[:, 0].astype(np.int64)
+                location_ids = table[:, 1].astype(np.int64)
+                if not (np.array_equal(event_ids, table[:, 0]) and np.array_equal(location_ids, table[:, 1])):
+                    raise ValueError("event_id and location_id values must be integers.")
+                yield event_ids, location_ids, table[:, 2]
+
+    return chunks
+
+
+class CsvSink:
+    """Write kept rows to a CSV file as they arrive."""
+
+    def __init__(self, handle: io.TextIOBase):
+        self.handle = handle
+        handle.write(",".join(COLUMNS) + "\n")
+
+    def __call__(self, event_ids, location_ids, losses):
+        np.savetxt(
+            self.handle,
+            np.rec.fromarrays((event_ids, location_ids, losses)),
+            fmt=("%d", "%d", "%.10g"),
+            delimiter=",",
+        )
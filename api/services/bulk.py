@@ -0,0 +1,128 @@
+"""
+Bulk updates and deletes of reports and events.
+
+The matching ids are read once, then the rows are written with one
+``UPDATE``/``DELETE`` per ``CHUNK`` ids instead of one save per row. What
+the signal handlers would have done row by row is done here once for the
+whole set: config hashes of reports whose job inputs changed, the peril
+and priority of their job rollups, content hashes and ``updated`` of the
+event groups of changed or deleted events, and the change feed.
+"""
+
+from itertools import islice
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from api.models.event import Event, EventGroup
+from api.models.job import Job
+from api.models.report import Report
+from api.services.analytics import update_rollup_labels
+from api.services.changes import EVENT_TYPES, RESOURCES, changes_suppressed, record_change, record_changes
+from api.services.hashing import CONFIG_EXCLUDE, adjust_group_hashes, member_hashes, refresh_report_hashes
+
+# Ids per statement, well below SQLite's 32766 parameters.
+CHUNK = 5000
+
+
+def _chunks(ids):
+    ids = iter(ids)
+    while chunk := list(islice(ids, CHUNK)):
+        yield chunk
+
+
+def _memberships(event_ids):
+    through = EventGroup.events.through
+    pairs = []
+    for chunk in _chunks(event_ids):
+        pairs.extend(
+            through.objects.filter(event_id__in=chunk).values_list("eventgroup_id", "event_id")
+        )
+    return pairs
+
+
+def bulk_update(queryset, values: dict) -> dict:
+    """Set ``values`` (field name to value) on every row of ``queryset``."""
+    model = queryset.model
+    with transaction.atomic(using=router.db_for_write(model)):
+        ids = list(queryset.order_by().values_list("pk", flat=True))
+        now = timezone.now()
+        updated = sum(
+            model.objects.filter(pk__in=chunk).update(**values, updated=now)
+            for chunk in _chunks(ids)
+        )
+        if model is Report:
+            attnames = {model._meta.get_field(name).attname for name in values}
+            if attnames - CONFIG_EXCLUDE or "event_group_id" in attnames:
+                refresh_report_hashes(ids)
+            if attnames & {"peril", "priority"}:
+                for chunk in _chunks(ids):
+                    update_rollup_labels(chunk)
+            record_changes("report", ids, "update")
+        else:
+            # Groups list their events, so they change with them.
+            adjust_group_hashes({group_id: 0 for group_id, _ in _memberships(ids)})
+            record_changes("event", ids, "update", {"type": EVENT_TYPES[model]})
+    return {"matched": len(ids), "updated": updated}
+
+
+def bulk_delete(queryset) -> dict:
+    """Delete every row of ``queryset``; returns the number of rows deleted per model."""
+    model = queryset.model
+    with transaction.atomic(using=router.db_for_write(model)):
+        ids = list(queryset.order_by().values_list("pk", flat=True))
+        if model is Report:
+            deleted = _delete_reports(ids)
+        else:
+            deleted = _delete_events(model, ids)
+    return {"matched": len(ids), "deleted": deleted}
+
+
+def _delete_reports(ids):
+    job_ids = []
+    for chunk in _chunks(ids):
+        job_ids.extend(Job.objects.filter(report_id__in=chunk).values_list("pk", flat=True))
+    deleted = {}
+    with changes_suppressed():
+        for chunk in _chunks(ids):
+            # The collector raises RestrictedError/ProtectedError before deleting anything.
+            _, counts = Report.objects.filter(pk__in=chunk).delete()
+            for label, count in counts.items():
+                deleted[label] = deleted.get(label, 0) + count
+    record_changes("report", ids, "delete")
+    record_changes("job", job_ids, "delete")
+    return deleted
+
+
+def _delete_events(model, ids):
+    """
+    Events are referenced only by group memberships, so their tables are
+    deleted from directly rather than through the collector, which would
+    load every event and run the per-event group hash handler.
+    """
+    using = router.db_for_write(model)
+    pairs = _memberships(ids)
+    removed = member_hashes(pairs)
+    through = EventGroup.events.through
+    deleted = {}
+    for label, table_model in (
+        (through._meta.label, through),
+        (model._meta.label, model),
+        (Event._meta.label, Event),
+    ):
+        field = "event_id" if table_model is through else "pk"
+        count = 0
+        for chunk in _chunks(ids):
+            count += table_model.objects.filter(**{f"{field}__in": chunk})._raw_delete(using)
+        deleted[label] = count
+
+    adjust_group_hashes({group_id: -value for group_id, value in removed.items()})
+    members = {}
+    for group_id, event_id in pairs:
+        members.setdefault(group_id, []).append(event_id)
+    for group_id, event_ids in members.items():
+        record_change(
+            RESOURCES[EventGroup], group_id, "remove", {"field": "events", "ids": sorted(event_ids)}
+        )
+    record_changes("event", ids, "delete")
+    return deleted
@@ -0,0 +1,138 @@
+"""
+Change feed.
+
+Every create, update and delete of a report, report modifier, event, event
+group or job, and every change of event group membership or report
+modifier links, appends a ``Change`` row. Model signals record single
+writes (see ``api.signals``); code that writes in bulk without signals calls
+``record_changes`` itself. Mirrors read the feed through ``/api/changes/``.
+
+Actions are ``create``, ``update`` and ``delete``; ``add`` and ``remove``
+on the owning side of memberships (event group ``events``, report modifier
+``reports``), with the field and the other side's ids in ``data``; and
+``archive`` for jobs moved to the archive database. Changes of events carry
+their type (``ring``, ``box``, ``geo`` or ``base``) in ``data``.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from api.models.change import Change
+from api.models.event import BoxEvent, Event, EventGroup, GeoEvent, RingEvent
+from api.models.job import Job
+from api.models.report import Report, ReportModifier
+
+RESOURCES = {
+    Report: "report",
+    ReportModifier: "report-modifier",
+    Event: "event",
+    RingEvent: "event",
+    BoxEvent: "event",
+    GeoEvent: "event",
+    EventGroup: "event-group",
+    Job: "job",
+}
+EVENT_TYPES = {Event: "base", RingEvent: "ring", BoxEvent: "box", GeoEvent: "geo"}
+
+_suppressed = ContextVar("changes_suppressed", default=False)
+
+
+@contextmanager
+def changes_suppressed():
+    """Record nothing inside, e.g. for writers that record a summary of their changes afterwards."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def recording() -> bool:
+    return not _suppressed.get()
+
+
+def record_change(resource: str, object_id: int, action: str, data=None):
+    if recording():
+        Change.objects.create(resource=resource, object_id=object_id, action=action, data=data)
+
+
+def record_changes(resource: str, object_ids, action: str, data=None, batch_size: int = 5000):
+    """Record the same change of many objects of ``resource``."""
+    if not recording():
+        return
+    now = timezone.now()
+    Change.objects.bulk_create(
+        (
+            Change(resource=resource, object_id=object_id, action=action, data=data, created=now)
+            for object_id in object_ids
+        ),
+        batch_size=batch_size,
+    )
+
+
+def changes_since(since: int, limit: int, resources=None):
+    """Up to ``limit`` changes after ``since``, oldest first, and whether more follow."""
+    queryset = Change.objects.filter(seq__gt=since).order_by("seq")
+    if resources:
+        queryset = queryset.filter(resource__in=resources)
+    rows = list(queryset[: limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def feed_bounds():
+    """
+    ``(pruned, latest)``: the last seq pruned from the feed and the last seq
+    recorded.
+
+    Seqs are AUTOINCREMENT keys, issued without gaps (a rolled back insert
+    rolls its seq back too) and never reused, and only pruning deletes
+    changes, oldest first. So everything before the oldest change left was
+    pruned, and when none is left, everything up to the last seq issued.
+    """
+    bounds = Change.objects.aggregate(oldest=Min("seq"), latest=Max("seq"))
+    if bounds["latest"] is not None:
+        return bounds["oldest"] - 1, bounds["latest"]
+    connection = connections[router.db_for_read(Change)]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [Change._meta.db_table])
+        row = cursor.fetchone()
+    last = row[0] if row else 0
+    return last, last
+
+
+def wait_for_changes(since: int, timeout: float, resources=None) -> bool:
+    """
+    Poll for a change after ``since`` for up to ``timeout`` seconds. The
+    calling request holds its worker (a sync worker process) meanwhile.
+    """
+    queryset = Change.objects.filter(seq__gt=since)
+    if resources:
+        queryset = queryset.filter(resource__in=resources)
+    deadline = time.monotonic() + timeout
+    while True:
+        if queryset.exists():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(settings.CHANGE_FEED_POLL_INTERVAL, remaining))
+
+
+def prune_changes(older_than_days=None) -> dict:
+    """Delete changes recorded more than ``older_than_days`` ago."""
+    if older_than_days is None:
+        older_than_days = settings.CHANGE_FEED_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    # Changes are appended in time order, so this is a range of seq.
+    last = (
+        Change.objects.filter(created__lt=cutoff).order_by("-seq").values_list("seq", flat=True).first()
+    )
+    deleted = Change.objects.filter(seq__lte=last).delete()[0] if last else 0
+    return {"cutoff": cutoff.isoformat(), "deleted": deleted}
@@ -0,0 +1,89 @@
+"""
+Row counts kept by triggers (migration 0014) in the ``counters`` table.
+
+Each counter is a ``(name, key)`` pair:
+
+- ``rows[table]``: rows of ``reports``, ``report_modifiers``, ``jobs``,
+  ``events``, ``api_ringevent``, ``api_boxevent``, ``api_geoevent`` and
+  ``api_eventgroup``.
+- ``valid_reports[""]``; ``peril_reports[peril]``; ``group_reports[group_id]``.
+- ``report_modifiers[report_id]``, ``modifier_reports[modifier_id]``, and
+  ``linked_reports[""]`` / ``linked_modifiers[""]``, the reports and
+  modifiers with at least one link.
+- ``report_jobs[report_id]``.
+- ``group_events[group_id]``, ``event_groups[event_id]``.
+
+Triggers update them in the transaction of the change, whether the change
+comes from the ORM, a bulk path or raw SQL. Counters that reach zero are
+deleted, and a missing counter reads as 0. ``rebuild_counters`` recomputes
+all of them, e.g. after restoring a table from a backup without its
+triggers.
+"""
+
+from django.db import connections, router, transaction
+
+from api.models.counter import Counter
+
+LINKS = "_jt_report_modifiers_reports"
+MEMBERS = "_jt_eventgroup_events"
+TABLES = (
+    "reports", "report_modifiers", "jobs", "events",
+    "api_ringevent", "api_boxevent", "api_geoevent", "api_eventgroup",
+)
+
+# (name, key, value) rows of every counter, from the tables themselves.
+COUNTS = [
+    *(f"SELECT 'rows', '{table}', COUNT(*) FROM {table}" for table in TABLES),
+    "SELECT 'valid_reports', '', COUNT(*) FROM reports WHERE is_valid",
+    "SELECT 'peril_reports', peril, COUNT(*) FROM reports GROUP BY peril",
+    "SELECT 'group_reports', event_group_id, COUNT(*) FROM reports "
+    "WHERE event_group_id IS NOT NULL GROUP BY event_group_id",
+    f"SELECT 'report_modifiers', report_id, COUNT(*) FROM {LINKS} GROUP BY report_id",
+    f"SELECT 'modifier_reports', reportmodifier_id, COUNT(*) FROM {LINKS} GROUP BY reportmodifier_id",
+    f"SELECT 'linked_reports', '', COUNT(DISTINCT report_id) FROM {LINKS}",
+    f"SELECT 'linked_modifiers', '', COUNT(DISTINCT reportmodifier_id) FROM {LINKS}",
+    "SELECT 'report_jobs', report_id, COUNT(*) FROM jobs GROUP BY report_id",
+    f"SELECT 'group_events', eventgroup_id, COUNT(*) FROM {MEMBERS} GROUP BY eventgroup_id",
+    f"SELECT 'event_groups', event_id, COUNT(*) FROM {MEMBERS} GROUP BY event_id",
+]
+
+
+def counter(name: str, key="") -> int:
+    """The value of counter ``name[key]``."""
+    value = Counter.objects.filter(name=name, key=str(key)).values_list("value", flat=True).first()
+    return value or 0
+
+
+def counter_values(name: str) -> dict:
+    """Every nonzero counter ``name[key]``, by key."""
+    return dict(Counter.objects.filter(name=name).values_list("key", "value"))
+
+
+def table_rows(model) -> int:
+    """Rows of ``model``'s table, for the tables in ``TABLES``."""
+    return counter("rows", model._meta.db_table)
+
+
+def rebuild_counters() -> dict:
+    """Recompute every counter; returns how many there are and how many were wrong."""
+    using = router.db_for_write(Counter)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        # A write first, so no other writer commits between the counts and
+        # the replacement.
+        cursor.execute("DELETE FROM counters WHERE 0")
+        current = {(name, key): value for name, key, value in Counter.objects.values_list("name", "key", "value")}
+        counts = {}
+        for query in COUNTS:
+            cursor.execute(query)
+            for name, key, value in cursor.fetchall():
+                if value:
+                    counts[(name, str(key))] = value
+        wrong = sum(
+            current.get(key, 0) != counts.get(key, 0) for key in current.keys() | counts.keys()
+        )
+        Counter.objects.all().delete()
+        Counter.objects.bulk_create(
+            (Counter(name=name, key=key, value=value) for (name, key), value in counts.items()),
+            batch_size=5000,
+        )
+    return {"counters": len(counts), "corrected": wrong}
@@ -0,0 +1,189 @@
+"""
+Dynamic ring generation.
+
+Given a location-level loss table, find ring centres whose summed loss within
+the report's ``blast_radius`` exceeds its ``dynamic_ring_loss_threshold``,
+keep the heaviest rings that are at least ``no_overlap_radius`` apart, and
+store them as ``RingEvent``s in a new ``EventGroup``.
+
+Locations are first summed into grid cells of ``grid_km`` (default a tenth
+of the blast radius); each cell's loss-weighted centroid is a candidate
+centre. Loss within the blast radius is then summed over cells, so a cell is
+counted whole when its centroid is in range. That costs at most half a cell
+diagonal of accuracy and keeps a million locations well under a minute.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import router, transaction
+from django.utils import timezone
+
+from api.models.event import EventGroup, RingEvent
+from api.services.events import bulk_create_events
+from api.services.changes import record_change
+from api.services.geo import KM_PER_DEGREE, PointGrid, neighbour_sums, unit_vectors
+from api.services.hashing import refresh_group_hashes
+from api.services.tables import read_columns
+
+COLUMNS = {
+    "latitude": ("latitude", "lat"),
+    "longitude": ("longitude", "lon", "lng"),
+    "loss": ("loss", "value"),
+}
+
+
+def read_location_losses(file, filename: str = ""):
+    """
+    ``(latitudes, longitudes, losses)`` from a CSV or NPZ file with
+    latitude/lat, longitude/lon/lng and loss/value columns.
+    """
+    columns = read_columns(file, filename, COLUMNS)
+    latitudes, longitudes, losses = (columns[name] for name in COLUMNS)
+    if np.any(np.abs(latitudes) > 90) or np.any(np.abs(longitudes) > 180):
+        raise ValueError("Latitudes must be within [-90, 90] and longitudes within [-180, 180].")
+    return latitudes, longitudes, losses
+
+
+@dataclass
+class DynamicRings:
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    losses: np.ndarray
+    locations: int
+    cells: int
+    candidates: int
+    radius: float
+
+    def to_dict(self) -> dict:
+        return {
+            "locations": self.locations,
+            "cells": self.cells,
+            "candidates": self.candidates,
+            "rings": [
+                {"latitude": float(lat), "longitude": float(lon), "radius": self.radius, "loss": float(loss)}
+                for lat, lon, loss in zip(self.latitudes, self.longitudes, self.losses)
+            ],
+        }
+
+
+def aggregate_to_grid(latitudes, longitudes, losses, grid_km: float):
+    """Sum losses per grid cell; returns the loss-weighted cell centroids and totals."""
+    size = grid_km / KM_PER_DEGREE
+    cells = np.column_stack(
+        (np.floor((latitudes + 90) / size), np.floor((longitudes + 180) / size))
+    ).astype(np.int64)
+    _, inverse = np.unique(cells, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    totals = np.bincount(inverse, weights=losses)
+    # Weight by loss where there is any, so centres sit on the exposure.
+    weights = np.where(totals[inverse] > 0, losses, 1.0)
+    weight_sums = np.bincount(inverse, weights=weights)
+    lat = np.bincount(inverse, weights=latitudes * weights) / weight_sums
+    lon = np.bincount(inverse, weights=longitudes * weights) / weight_sums
+    return lat, lon, totals
+
+
+def select_non_overlapping(xyz, scores, radius_km: float) -> np.ndarray:
+    """Greedily pick the highest scores whose points are at least ``radius_km`` apart."""
+    grid = PointGrid(xyz, radius_km)
+    blocked = np.zeros(len(scores), dtype=bool)
+    selected = []
+    for index in np.argsort(-scores, kind="stable"):
+        if blocked[index]:
+            continue
+        selected.append(index)
+        blocked[grid.near(index)] = True
+    return np.array(selected, dtype=np.int64)
+
+
+def generate_dynamic_rings(
+    latitudes,
+    longitudes,
+    losses,
+    *,
+    threshold: float,
+    blast_radius: float,
+    no_overlap_radius: float | None,
+    grid_km: float | None = None,
+) -> DynamicRings:
+    if blast_radius is None or blast_radius <= 0:
+        raise ValueError("blast_radius must be positive.")
+    if threshold is None:
+        raise ValueError("A loss threshold is required.")
+    grid_km = grid_km or blast_radius / 10
+
+    lat, lon, totals = aggregate_to_grid(
+        np.asarray(latitudes, dtype=np.float64),
+        np.asarray(longitudes, dtype=np.float64),
+        np.asarray(losses, dtype=np.float64),
+        grid_km,
+    )
+    xyz = unit_vectors(lat, lon)
+    summed = neighbour_sums(xyz, totals, blast_radius)
+    candidates = np.flatnonzero(summed > threshold)
+
+    if no_overlap_radius:
+        chosen = candidates[
+            select_non_overlapping(xyz[candidates], summed[candidates], no_overlap_radius)
+        ]
+    else:
+        chosen = candidates[np.argsort(-summed[candidates], kind="stable")]
+
+    return DynamicRings(
+        latitudes=lat[chosen],
+        longitudes=lon[chosen],
+        losses=summed[chosen],
+        locations=len(latitudes),
+        cells=len(lat),
+        candidates=len(candidates),
+        radius=blast_radius,
+    )
+
+
+def report_dynamic_rings(report, latitudes, longitudes, losses, **overrides) -> DynamicRings:
+    """Run the engine with the report's settings; ``overrides`` replace any that are not None."""
+    settings = {
+        "threshold": report.dynamic_ring_loss_threshold,
+        "blast_radius": report.blast_radius,
+        "no_overlap_radius": report.no_overlap_radius,
+        "grid_km": None,
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return generate_dynamic_rings(latitudes, longitudes, losses, **settings)
+
+
+def create_ring_event_group(report, rings: DynamicRings, name=None, assign=False) -> EventGroup:
+    """Store ``rings`` as ring events of a new event group, optionally used by ``report``."""
+    db = router.db_for_write(RingEvent)
+    with transaction.atomic(using=db):
+        group = EventGroup.objects.create(
+            name=name or f"{report.name} dynamic rings {timezone.now():%Y-%m-%d %H:%M}"
+        )
+        events = bulk_create_events(
+            RingEvent(
+                name=f"{report.name} ring {rank}",
+                description=f"Loss {loss:.0f} within {rings.radius:g} km",
+                zone=report.peril,
+                latitude=float(lat),
+                longitude=float(lon),
+                radius=rings.radius,
+            )
+            for rank, (lat, lon, loss) in enumerate(
+                zip(rings.latitudes, rings.longitudes, rings.losses), start=1
+            )
+        )
+        through = EventGroup.events.through
+        through.objects.bulk_create(
+            [through(eventgroup_id=group.id, event_id=event.id) for event in events],
+            batch_size=1000,
+        )
+        # The through rows bypass the m2m_changed handlers.
+        record_change(
+            "event-group", group.id, "add", {"field": "events", "ids": [event.id for event in events]}
+        )
+        refresh_group_hashes([group.id])
+    if assign:
+        report.event_group = group
+        report.save(update_fields=["event_group", "updated"])
+    return group
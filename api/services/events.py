@@ -0,0 +1,69 @@
+"""
+Bulk insertion of typed events.
+
+``RingEvent``, ``BoxEvent`` and ``GeoEvent`` use multi-table inheritance,
+which ``QuerySet.bulk_create`` does not support. ``bulk_create_events``
+inserts the ``events`` rows with ``bulk_create`` and the child rows with a
+single ``executemany``, so large event sets are written in one pass. The
+database triggers on the child tables (e.g. the spatial index) still fire,
+but model signals do not, so what the signals derive (regions, geometry
+hashes, change feed entries) is set here instead.
+"""
+
+from django.db import connections, router, transaction
+
+from api.models.event import Event, GeoEvent
+from api.services.changes import EVENT_TYPES, record_changes
+from api.services.hashing import set_geometry_hashes
+from api.services.regions import assign_regions
+
+
+def bulk_create_events(objs, batch_size=1000):
+    """Insert unsaved events of a single subclass; returns them with ids set."""
+    objs = list(objs)
+    if not objs:
+        return objs
+    model = type(objs[0])
+    if any(type(obj) is not model for obj in objs):
+        raise ValueError("bulk_create_events() expects events of a single type.")
+    db = router.db_for_write(model)
+    connection = connections[db]
+    if model is GeoEvent:
+        assign_regions(objs)
+    set_geometry_hashes(objs)
+
+    parent_fields = [
+        f.attname for f in Event._meta.concrete_fields if not f.primary_key
+    ]
+    child_fields = list(model._meta.local_concrete_fields)
+    if model is Event:
+        child_fields = []
+
+    with transaction.atomic(using=db):
+        parents = Event.objects.bulk_create(
+            [Event(**{name: getattr(obj, name) for name in parent_fields}) for obj in objs],
+            batch_size=batch_size,
+        )
+        for obj, parent in zip(objs, parents):
+            obj.id = parent.id
+            obj.updated = parent.updated
+            if child_fields:
+                obj.event_ptr_id = parent.id
+            obj._state.adding = False
+            obj._state.db = db
+
+        if child_fields:
+            sql = "INSERT INTO {} ({}) VALUES ({})".format(
+                connection.ops.quote_name(model._meta.db_table),
+                ", ".join(connection.ops.quote_name(f.column) for f in child_fields),
+                ", ".join(["%s"] * len(child_fields)),
+            )
+            rows = [
+                [f.get_db_prep_save(getattr(obj, f.attname), connection) for f in child_fields]
+                for obj in objs
+            ]
+            with connection.cursor() as cursor:
+                for start in range(0, len(rows), batch_size):
+                    cursor.executemany(sql, rows[start : start + batch_size])
+        record_changes("event", [obj.id for obj in objs], "create", {"type": EVENT_TYPES[model]})
+    return objs
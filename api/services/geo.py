@@ -0,0 +1,202 @@
+"""
+Geographic helpers shared by the spatial filters and event engines.
+
+Distances are great-circle distances in km; ring radii are in km too.
+
+The NumPy helpers find points within a distance of each other without
+comparing every pair: points are mapped to unit vectors and hashed into a 3D
+grid whose cube size is the chord length of the search distance, so only
+points in the same or adjacent cubes are compared. This works the same at
+the poles and across the antimeridian.
+"""
+
+import math
+from itertools import product
+
+import numpy as np
+from django.db.models import FloatField, Value
+from django.db.models.functions import ASin, Cos, Greatest, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def bounding_box(lat: float, lon: float, km: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) of the circle of ``km`` around a point."""
+    dlat = km / KM_PER_DEGREE
+    dlon = km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    if abs(lon) + dlon > 180:
+        min_lon, max_lon = -180.0, 180.0
+    else:
+        min_lon, max_lon = lon - dlon, lon + dlon
+    return max(lat - dlat, -90.0), min(lat + dlat, 90.0), min_lon, max_lon
+
+
+def _expression(value):
+    return Value(value, output_field=FloatField()) if isinstance(value, (int, float)) else value
+
+
+def haversine_expression(lat1, lon1, lat2, lon2):
+    """Database expression for the distance in km between two points."""
+    lat1, lon1, lat2, lon2 = (_expression(v) for v in (lat1, lon1, lat2, lon2))
+    a = Power(Sin(Radians(lat2 - lat1) / 2), 2) + Cos(Radians(lat1)) * Cos(
+        Radians(lat2)
+    ) * Power(Sin(Radians(lon2 - lon1) / 2), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0))))
+
+
+def clamp_expression(value, low, high):
+    """Database expression clamping ``value`` to ``[low, high]``; numbers or expressions."""
+    return Greatest(Least(_expression(value), _expression(high)), _expression(low))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorised great-circle distance in km."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def unit_vectors(lat, lon) -> np.ndarray:
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(
+        np.asarray(lon, dtype=np.float64)
+    )
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_length(km: float) -> float:
+    """Straight-line distance through the unit sphere for a surface distance."""
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+class PointGrid:
+    """
+    Unit vectors hashed into cubes with an edge of the chord length of
+    ``km``, so points closer than ``km`` are in the same or adjacent cubes.
+    """
+
+    # The cube itself plus the 13 "forward" neighbours; each pair of
+    # adjacent cubes is visited once.
+    forward = [offset for offset in product((-1, 0, 1), repeat=3) if offset >= (0, 0, 0)]
+
+    def __init__(self, xyz: np.ndarray, km: float):
+        self.xyz = xyz
+        self.chord = chord_length(km)
+        # Keep the cube index range small enough for int64 keys.
+        cube = max(self.chord, 2e-6)
+        cubes = np.floor((xyz + 1) / cube).astype(np.int64)
+        # One spare slot per axis so a -1/+1 offset never aliases another cube.
+        self.dims = cubes.max(axis=0) + 2 if len(xyz) else np.ones(3, dtype=np.int64)
+        self.keys = (cubes[:, 0] * self.dims[1] + cubes[:, 1]) * self.dims[2] + cubes[:, 2]
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted_keys = self.keys[self.order]
+        self._all_shifts = np.array(
+            [self.shift(offset) for offset in product((-1, 0, 1), repeat=3)]
+        )
+
+    def shift(self, offset) -> int:
+        dx, dy, dz = offset
+        return (dx * self.dims[1] + dy) * self.dims[2] + dz
+
+    def near(self, index: int) -> np.ndarray:
+        """Indices of the points closer than ``km`` to point ``index``, itself included."""
+        targets = self.keys[index] + self._all_shifts
+        lo = np.searchsorted(self.sorted_keys, targets, side="left")
+        hi = np.searchsorted(self.sorted_keys, targets, side="right")
+        candidates = np.concatenate([self.order[a:b] for a, b in zip(lo, hi)])
+        d2 = ((self.xyz[candidates] - self.xyz[index]) ** 2).sum(axis=1)
+        return candidates[d2 < self.chord * self.chord]
+
+
+def _close_pairs(xyz: np.ndarray, km: float, chunk_pairs: int):
+    """
+    Yield ``(i, j, chord)`` chunks of the pairs of points closer than ``km``,
+    comparing at most about ``chunk_pairs`` candidate pairs at a time.
+    """
+    n = len(xyz)
+    if n < 2 or km <= 0:
+        return
+    grid = PointGrid(xyz, km)
+    limit = grid.chord * grid.chord
+
+    for offset in PointGrid.forward:
+        target = grid.keys + grid.shift(offset)
+        lo = np.searchsorted(grid.sorted_keys, target, side="left")
+        counts = np.searchsorted(grid.sorted_keys, target, side="right") - lo
+        ends = np.cumsum(counts)
+        # Split the points so each chunk has about chunk_pairs candidates.
+        bounds = np.searchsorted(ends, np.arange(chunk_pairs, ends[-1], chunk_pairs))
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, n]):
+            chunk_counts = counts[start:stop]
+            total = int(chunk_counts.sum())
+            if not total:
+                continue
+            i = np.repeat(np.arange(start, stop), chunk_counts)
+            first = np.repeat(lo[start:stop] - (np.cumsum(chunk_counts) - chunk_counts), chunk_counts)
+            j = grid.order[first + np.arange(total)]
+            if offset == (0, 0, 0):
+                keep = i < j
+                i, j = i[keep], j[keep]
+            d2 = ((xyz[i] - xyz[j]) ** 2).sum(axis=1)
+            close = d2 < limit
+            yield i[close], j[close], np.sqrt(d2[close])
+
+
+def pairs_within(xyz: np.ndarray, km: float, chunk_pairs: int = 2_000_000):
+    """
+    All pairs ``(i, j)``, ``i < j``, of unit vectors closer than ``km``.
+
+    Returns ``(i, j, distance_km)`` arrays. Working memory besides the
+    result is bounded by ``chunk_pairs`` candidate pairs.
+    """
+    found_i, found_j, found_d = [], [], []
+    for i, j, chord in _close_pairs(xyz, km, chunk_pairs):
+        found_i.append(np.minimum(i, j))
+        found_j.append(np.maximum(i, j))
+        found_d.append(chord_to_km(chord))
+    if not found_i:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty.copy(), np.array([])
+    return np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_d)
+
+
+def neighbour_sums(xyz: np.ndarray, weights: np.ndarray, km: float, chunk_pairs: int = 2_000_000):
+    """
+    For each point, the sum of ``weights`` of all points closer than ``km``,
+    itself included, without materialising the pairs.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    sums = weights.copy()
+    for i, j, _ in _close_pairs(xyz, km, chunk_pairs):
+        sums += np.bincount(i, weights=weights[j], minlength=len(sums))
+        sums += np.bincount(j, weights=weights[i], minlength=len(sums))
+    return sums
+
+
+def connected_components(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Label of the connected component of each of ``n`` nodes given edges."""
+    labels = np.arange(n)
+    if not len(i):
+        return labels
+    while True:
+        li, lj = labels[i], labels[j]
+        low = np.minimum(li, lj)
+        hooked = labels.copy()
+        np.minimum.at(hooked, li, low)
+        np.minimum.at(hooked, lj, low)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
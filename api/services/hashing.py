@@ -0,0 +1,216 @@
+"""
+Content hashes of events, event groups and report configurations.
+
+- ``Event.geometry_hash``: hash of the event type and geometry (ring centre
+  and radius, box bounds, geo place names). Names, descriptions and zones
+  are not geometry.
+- ``EventGroup.content_hash``: sum of the members' geometry hashes modulo
+  2**64. A sum does not depend on member order or ids, so groups with the
+  same geometry hash alike, and adding, removing or reshaping one member
+  only adds or subtracts that member's hash instead of rehashing the group.
+- ``Report.config_hash``: hash of the report fields that go into a job
+  (all but ``CONFIG_EXCLUDE``) and of its event group's content hash.
+
+Hashes are stored as signed 64-bit integers (SQLite's INTEGER) and shown
+as 16 hex digits. Signal handlers keep them current on saves, deletes and
+membership changes; ``bulk_create_events`` sets them on bulk inserts, and
+``rebuild_content_hashes`` repairs them after raw updates.
+"""
+
+import hashlib
+import json
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from api.models.event import BoxEvent, Event, EventGroup, GeoEvent, RingEvent
+from api.models.report import Report
+from api.services.changes import record_changes
+
+MODULUS = 1 << 64
+
+GEOMETRY_FIELDS = {
+    RingEvent: ("latitude", "longitude", "radius"),
+    BoxEvent: ("min_lat", "min_lon", "max_lat", "max_lon"),
+    GeoEvent: ("country", "area", "subarea", "subarea2"),
+    Event: (),
+}
+
+# Report fields that do not change what a job computes.
+CONFIG_EXCLUDE = {
+    "id", "name", "event_group_id", "cron", "priority", "ncores",
+    "is_valid", "created", "updated", "config_hash",
+}
+
+
+def to_signed(value: int) -> int:
+    value %= MODULUS
+    return value - MODULUS if value >= MODULUS // 2 else value
+
+
+def hex_hash(value: int) -> str:
+    return f"{value % MODULUS:016x}"
+
+
+def _digest(values) -> int:
+    data = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return to_signed(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big"))
+
+
+def geometry_hash(kind: str, values) -> int:
+    """Hash of an event of type ``kind`` with the given geometry values."""
+    normalised = [
+        float(value) if isinstance(value, (int, float)) else (value or "")
+        for value in values
+    ]
+    return _digest([kind, *normalised])
+
+
+def event_geometry_hash(event) -> int:
+    model = type(event)
+    fields = GEOMETRY_FIELDS[model]
+    return geometry_hash(model._meta.model_name, [getattr(event, name) for name in fields])
+
+
+def set_geometry_hashes(events):
+    for event in events:
+        event.geometry_hash = event_geometry_hash(event)
+
+
+def config_hash(values: dict, group_hash) -> int:
+    """Hash of a report's field values (keyed by attname) and its group's content hash."""
+    config = {name: value for name, value in sorted(values.items()) if name not in CONFIG_EXCLUDE}
+    return _digest([config, group_hash])
+
+
+def report_config_hash(report, group_hash=None) -> int:
+    if group_hash is None and report.event_group_id is not None:
+        group_hash = (
+            EventGroup.objects.filter(pk=report.event_group_id)
+            .values_list("content_hash", flat=True)
+            .first()
+        )
+    return config_hash(report_values(report), group_hash)
+
+
+def report_values(report) -> dict:
+    # to_python, so that e.g. dr=1 before saving hashes like 1.0 read back.
+    return {f.attname: f.to_python(getattr(report, f.attname)) for f in report._meta.concrete_fields}
+
+
+def member_hashes(pairs) -> dict:
+    """Summed geometry hashes per group of ``(group_id, event_id)`` memberships."""
+    pairs = list(pairs)
+    event_ids = {event_id for _, event_id in pairs}
+    hashes = dict(
+        Event.objects.filter(pk__in=event_ids).values_list("id", "geometry_hash")
+    )
+    sums = {}
+    for group_id, event_id in pairs:
+        sums[group_id] = sums.get(group_id, 0) + hashes.get(event_id, 0)
+    return sums
+
+
+def _refresh_reports(group_hashes: dict):
+    reports = list(Report.objects.filter(event_group_id__in=group_hashes))
+    for report in reports:
+        report.config_hash = report_config_hash(report, group_hashes[report.event_group_id])
+    Report.objects.bulk_update(reports, ["config_hash"], batch_size=500)
+    record_changes("report", [report.id for report in reports], "update")
+
+
+def adjust_group_hashes(deltas: dict):
+    """Add ``deltas[group_id]`` (which may be 0) to each group's content hash and bump ``updated``."""
+    if not deltas:
+        return
+    with transaction.atomic(using=router.db_for_write(EventGroup)):
+        groups = list(EventGroup.objects.filter(pk__in=deltas).only("id", "content_hash"))
+        now = timezone.now()
+        for group in groups:
+            group.content_hash = to_signed(group.content_hash + deltas[group.id])
+            group.updated = now
+        EventGroup.objects.bulk_update(groups, ["content_hash", "updated"], batch_size=500)
+        record_changes("event-group", [group.id for group in groups], "update")
+        _refresh_reports({group.id: group.content_hash for group in groups if deltas[group.id]})
+
+
+def refresh_group_hashes(group_ids=None) -> int:
+    """Recompute the content hashes of ``group_ids`` (default all) from their members."""
+    groups = EventGroup.objects.only("id", "content_hash")
+    memberships = EventGroup.events.through.objects.all()
+    if group_ids is not None:
+        group_ids = list(group_ids)
+        groups = groups.filter(pk__in=group_ids)
+        memberships = memberships.filter(eventgroup_id__in=group_ids)
+    sums = {}
+    for group_id, value in memberships.values_list("eventgroup_id", "event__geometry_hash").iterator():
+        sums[group_id] = sums.get(group_id, 0) + value
+    changed = []
+    for group in groups:
+        content_hash = to_signed(sums.get(group.id, 0))
+        if content_hash != group.content_hash:
+            group.content_hash = content_hash
+            changed.append(group)
+    EventGroup.objects.bulk_update(changed, ["content_hash"], batch_size=500)
+    record_changes("event-group", [group.id for group in changed], "update")
+    _refresh_reports({group.id: group.content_hash for group in changed})
+    return len(changed)
+
+
+def refresh_report_hashes(report_ids) -> int:
+    """Recompute the config hashes of ``report_ids`` after a queryset update."""
+    reports = list(Report.objects.filter(pk__in=report_ids))
+    group_hashes = dict(
+        EventGroup.objects.filter(pk__in={r.event_group_id for r in reports}).values_list(
+            "id", "content_hash"
+        )
+    )
+    changed = []
+    for report in reports:
+        value = report_config_hash(report, group_hashes.get(report.event_group_id))
+        if value != report.config_hash:
+            report.config_hash = value
+            changed.append(report)
+    Report.objects.bulk_update(changed, ["config_hash"], batch_size=500)
+    return len(changed)
+
+
+def rebuild_content_hashes(batch_size: int = 5000) -> dict:
+    """Recompute every stored hash; returns the number of rows changed per model."""
+    counts = {"events": 0, "event_groups": 0, "reports": 0}
+    with transaction.atomic(using=router.db_for_write(Event)):
+        untyped = Event.objects.filter(
+            ringevent__isnull=True, boxevent__isnull=True, geoevent__isnull=True
+        )
+        for queryset in (
+            RingEvent.objects.all(),
+            BoxEvent.objects.all(),
+            GeoEvent.objects.all(),
+            untyped,
+        ):
+            changed = []
+            for event in queryset.iterator(chunk_size=batch_size):
+                value = event_geometry_hash(event)
+                if value != event.geometry_hash:
+                    event.geometry_hash = value
+                    changed.append(event)
+            # geometry_hash lives on the events table, whatever the subclass.
+            Event.objects.bulk_update(
+                [Event(id=event.id, geometry_hash=event.geometry_hash) for event in changed],
+                ["geometry_hash"],
+                batch_size=batch_size,
+            )
+            counts["events"] += len(changed)
+
+        counts["event_groups"] = refresh_group_hashes()
+        group_hashes = dict(EventGroup.objects.values_list("id", "content_hash"))
+        reports = []
+        for report in Report.objects.iterator(chunk_size=batch_size):
+            value = report_config_hash(report, group_hashes.get(report.event_group_id))
+            if value != report.config_hash:
+                report.config_hash = value
+                reports.append(report)
+        Report.objects.bulk_update(reports, ["config_hash"], batch_size=500)
+        record_changes("report", [report.id for report in reports], "update")
+        counts["reports"] = len(reports)
+    return counts
@@ -0,0 +1,114 @@
+"""
+Report and modifier links in bulk.
+
+``link_pairs`` reads the whole ``_jt_report_modifiers_reports`` table, or a
+filtered part of it, as ``(report_id, modifier_id)`` pairs ordered by
+report and modifier. It is one query, streamed in chunks, so memory stays
+flat whatever the size. The index of migration 0012 gives the order
+without a sort; unfiltered, it covers the query too. A peril filter adds a
+primary-key lookup of each link's report, and a date filter one of its
+modifier.
+``encode_runs`` compresses each report's modifier ids into runs of
+consecutive ids. Roll-forwards create a quarter's modifiers together, so a
+report linked every quarter needs a few runs where it would need hundreds
+of pairs.
+
+``link_combinations`` links every report of a list to every modifier of
+another, a chunk of reports per modifier at a time: one query for the
+existing links and one insert per chunk instead of one of each per pair.
+Each chunk is its own transaction, so when nothing encloses it the SQLite
+write lock is released between chunks and readers and other writers get
+in; ``api.tasks.link_reports`` relies on that for combinations too many to
+link within a request.
+"""
+
+from itertools import groupby, islice
+
+from django.db import router, transaction
+
+from api.models.report import Report, ReportModifier
+
+CHUNK = 10000
+
+
+def link_pairs(perils=None, as_at_from=None, as_at_to=None):
+    """Iterate ``(report_id, modifier_id)``, ordered, for reports of ``perils`` and modifiers in the date range."""
+    links = ReportModifier.reports.through.objects.all()
+    if perils:
+        links = links.filter(report__peril__in=perils)
+    if as_at_from is not None:
+        links = links.filter(reportmodifier__as_at_date__gte=as_at_from)
+    if as_at_to is not None:
+        links = links.filter(reportmodifier__as_at_date__lte=as_at_to)
+    return (
+        links.order_by("report_id", "reportmodifier_id")
+        .values_list("report_id", "reportmodifier_id")
+        .iterator(chunk_size=CHUNK)
+    )
+
+
+def runs(ids):
+    """Sorted ``ids`` as ``[start, length]`` runs of consecutive ids."""
+    result = []
+    for value in ids:
+        if result and result[-1][0] + result[-1][1] == value:
+            result[-1][1] += 1
+        else:
+            result.append([value, 1])
+    return result
+
+
+def encode_runs(pairs):
+    """Iterate ``(report_id, runs)`` from ordered pairs."""
+    for report_id, group in groupby(pairs, key=lambda pair: pair[0]):
+        yield report_id, runs(modifier_id for _, modifier_id in group)
+
+
+def missing_ids(report_ids, modifier_ids) -> dict:
+    """The ids of ``report_ids`` and ``modifier_ids`` that do not exist, by kind."""
+    missing = {}
+    for name, model, ids in (("reports", Report, report_ids), ("modifiers", ReportModifier, modifier_ids)):
+        found = set()
+        chunks = iter(set(ids))
+        while chunk := list(islice(chunks, CHUNK)):
+            found.update(model.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+        absent = sorted(set(ids) - found)
+        if absent:
+            missing[name] = absent
+    return missing
+
+
+def link_combinations(report_ids, modifier_ids, chunk_size=5000, progress=None) -> dict:
+    """
+    Link every report of ``report_ids`` to every modifier of ``modifier_ids``.
+    ``progress``, if given, is called with the running statistics after each
+    chunk. Ids that do not exist are skipped; see ``missing_ids``.
+    """
+    report_ids = list(dict.fromkeys(report_ids))
+    modifiers = ReportModifier.objects.in_bulk(list(dict.fromkeys(modifier_ids)))
+    through = ReportModifier.reports.through
+    using = router.db_for_write(through)
+    stats = {"processed": 0, "linked": 0, "already_linked": 0}
+    for modifier in modifiers.values():
+        for start in range(0, len(report_ids), chunk_size):
+            chunk = report_ids[start : start + chunk_size]
+            with transaction.atomic(using=using):
+                linked = set(
+                    through.objects.filter(reportmodifier_id=modifier.pk, report_id__in=chunk)
+                    .values_list("report_id", flat=True)
+                )
+                new = [
+                    report_id
+                    for report_id in Report.objects.filter(pk__in=chunk).values_list("pk", flat=True)
+                    if report_id not in linked
+                ]
+                if new:
+                    # Through the related manager, so the signal handlers bump the
+                    # reports' ``updated`` and record the links in the change feed.
+                    modifier.reports.add(*new)
+            stats["processed"] += len(chunk)
+            stats["linked"] += len(new)
+            stats["already_linked"] += len(linked)
+            if progress is not None:
+                progress(stats)
+    return stats
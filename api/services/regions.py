@@ -0,0 +1,140 @@
+"""
+The country > area > subarea > subarea2 region index of geo events.
+
+Each region's ``path`` is its name and its ancestors' names, country first,
+joined by ``SEPARATOR`` (``\\x1f``). Control characters are stripped from
+names, so every descendant path sorts between ``path`` and
+``path + "\\x20"`` and a subtree is one range scan of the unique path index.
+The levels of an event stop at its first empty field.
+"""
+
+import re
+
+from django.db import router, transaction
+
+from api.models.event import GeoEvent, Region
+from api.services.changes import record_changes
+
+SEPARATOR = "\x1f"
+SUBTREE_END = "\x20"
+LEVEL_FIELDS = ("country", "area", "subarea", "subarea2")
+
+_CONTROL = re.compile(r"[\x00-\x1f]")
+
+
+def region_names(country=None, area=None, subarea=None, subarea2=None) -> list[str]:
+    names = []
+    for value in (country, area, subarea, subarea2):
+        value = _CONTROL.sub(" ", value or "").strip()
+        if not value:
+            break
+        names.append(value)
+    return names
+
+
+def region_path(names) -> str:
+    return SEPARATOR.join(names)
+
+
+def subtree_filter(path: str, prefix: str = "path") -> dict:
+    """Lookups selecting ``path`` and all its descendants."""
+    return {f"{prefix}__gte": path, f"{prefix}__lt": path + SUBTREE_END}
+
+
+def ensure_regions(paths) -> dict[str, int]:
+    """Region ids of ``paths``, creating missing regions and their ancestors."""
+    wanted = set()
+    for path in paths:
+        names = path.split(SEPARATOR)
+        wanted.update(region_path(names[:level]) for level in range(1, len(names) + 1))
+    if not wanted:
+        return {}
+
+    ids = {}
+    wanted_list = sorted(wanted)
+    # Stay under SQLite's variable limit.
+    for start in range(0, len(wanted_list), 500):
+        ids.update(
+            Region.objects.filter(path__in=wanted_list[start : start + 500]).values_list(
+                "path", "id"
+            )
+        )
+    missing = [path for path in wanted_list if path not in ids]
+    if missing:
+        with transaction.atomic(using=router.db_for_write(Region)):
+            # Parents sort before their children, so each level's parent id
+            # is known by the time the level is created.
+            for level in range(1, len(LEVEL_FIELDS) + 1):
+                batch = []
+                for path in missing:
+                    names = path.split(SEPARATOR)
+                    if len(names) != level:
+                        continue
+                    batch.append(
+                        Region(
+                            path=path,
+                            name=names[-1],
+                            name_key=names[-1].lower(),
+                            level=level,
+                            parent_id=ids.get(region_path(names[:-1])),
+                        )
+                    )
+                if batch:
+                    Region.objects.bulk_create(batch, ignore_conflicts=True)
+                    ids.update(
+                        Region.objects.filter(
+                            path__in=[region.path for region in batch]
+                        ).values_list("path", "id")
+                    )
+    return ids
+
+
+def event_region_path(event) -> str:
+    return region_path(region_names(*(getattr(event, field) for field in LEVEL_FIELDS)))
+
+
+def assign_regions(events):
+    """Set ``region_id`` of unsaved or changed geo events in one pass."""
+    events = list(events)
+    paths = [event_region_path(event) for event in events]
+    ids = ensure_regions(path for path in paths if path)
+    for event, path in zip(events, paths):
+        event.region_id = ids.get(path) if path else None
+
+
+def rebuild_regions(batch_size=5000) -> dict:
+    """Recompute the region of every geo event and drop regions left empty."""
+    updated = 0
+    last_id = 0
+    while True:
+        events = list(
+            GeoEvent.objects.filter(event_ptr_id__gt=last_id)
+            .order_by("event_ptr_id")
+            .only("event_ptr_id", "region_id", *LEVEL_FIELDS)[:batch_size]
+        )
+        if not events:
+            break
+        before = {event.pk: event.region_id for event in events}
+        assign_regions(events)
+        changed = [event for event in events if event.region_id != before[event.pk]]
+        GeoEvent.objects.bulk_update(changed, ["region"], batch_size=500)
+        record_changes("event", [event.pk for event in changed], "update", {"type": "geo"})
+        updated += len(changed)
+        last_id = events[-1].pk
+
+    # A region is used when an event points at it or at a descendant.
+    used = set()
+    for path in (
+        Region.objects.filter(geo_events__isnull=False).values_list("path", flat=True).distinct()
+    ):
+        names = path.split(SEPARATOR)
+        used.update(region_path(names[:level]) for level in range(1, len(names) + 1))
+    unused = [
+        region_id
+        for region_id, path in Region.objects.values_list("id", "path")
+        if path not in used
+    ]
+    deleted = 0
+    for start in range(0, len(unused), 500):
+        deleted += Region.objects.filter(id__in=unused[start : start + 500]).delete()[0]
+    return {"events_updated": updated, "regions": Region.objects.count(), "regions_deleted": deleted}
@@ -0,0 +1,228 @@
+"""
+Columnar storage of job loss results.
+
+Each job's results live in ``JOB_RESULTS_DIR/<job_id>/`` as plain ``.npy``
+arrays, opened memory-mapped so queries only read the pages they touch:
+
+- ``event_id``, ``event_loss``: loss per event, sorted by loss descending
+- ``event_by_id``: positions of those rows in event id order, for joins
+- ``location_event_id``, ``location_id``, ``location_loss``: optional
+  per-location losses, sorted by loss descending
+- ``meta.json``: counts and totals
+
+Top-k is a slice, a threshold is a binary search, and comparing two jobs
+joins their event id columns with NumPy; only the rows returned become
+Python objects.
+
+A job's results are removed once its deletion or archival commits (see
+``api.signals``).
+"""
+
+import json
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from api.services.breakout import COLUMNS, array_chunks, trim_breakout
+from api.services.tables import read_columns
+
+LEVELS = ("event", "location")
+
+
+def results_dir(job_id: int) -> Path:
+    return Path(settings.JOB_RESULTS_DIR) / str(job_id)
+
+
+def _ids(values, name):
+    ids = values.astype(np.int64)
+    if not np.array_equal(ids, values):
+        raise ValueError(f"{name} values must be integers.")
+    return ids
+
+
+def _by_loss(loss, *ids):
+    """Order rows by loss descending, then by the id columns."""
+    return np.lexsort((*reversed(ids), -loss))
+
+
+def ingest_job_results(job_id: int, file, filename: str = "", caps=None) -> dict:
+    """
+    Store the results in a CSV or NPZ table with event_id, loss and optional
+    location_id columns, replacing any previous results of the job. Event
+    losses are summed over locations and duplicate rows.
+
+    ``caps`` is an optional ``(max_events, max_locations)`` pair; location
+    rows are then trimmed to the breakout caps, event losses are not.
+    """
+    columns = read_columns(file, filename, COLUMNS, optional=("location_id",))
+    event_ids = _ids(columns["event_id"], "event_id")
+    losses = columns["loss"]
+
+    unique_events, inverse = np.unique(event_ids, return_inverse=True)
+    event_loss = np.bincount(inverse.ravel(), weights=losses, minlength=len(unique_events))
+    order = _by_loss(event_loss, unique_events)
+    arrays = {
+        "event_id": unique_events[order],
+        "event_loss": event_loss[order],
+        "event_by_id": np.argsort(order).astype(np.int64),
+    }
+    breakout = None
+    if "location_id" in columns:
+        location_ids = _ids(columns["location_id"], "location_id")
+        if caps is not None:
+            kept = []
+            breakout = trim_breakout(
+                array_chunks(event_ids, location_ids, losses),
+                lambda *chunk: kept.append(chunk),
+                *caps,
+            )
+            if kept:
+                event_ids, location_ids, losses = (np.concatenate(column) for column in zip(*kept))
+            else:
+                event_ids, location_ids, losses = event_ids[:0], location_ids[:0], losses[:0]
+        order = _by_loss(losses, event_ids, location_ids)
+        arrays.update(
+            location_event_id=event_ids[order],
+            location_id=location_ids[order],
+            location_loss=losses[order],
+        )
+
+    meta = {
+        "job_id": job_id,
+        "events": len(unique_events),
+        "locations": len(losses) if "location_id" in columns else 0,
+        "total_loss": float(event_loss.sum()),
+        "max_event_loss": float(arrays["event_loss"][0]) if len(unique_events) else None,
+        "ingested": timezone.now().isoformat(),
+        "breakout": breakout,
+    }
+
+    target = results_dir(job_id)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.parent / f".{job_id}.{uuid.uuid4().hex}"
+    staging.mkdir()
+    for name, array in arrays.items():
+        np.save(staging / f"{name}.npy", array)
+    (staging / "meta.json").write_text(json.dumps(meta))
+
+    # Swap directories so readers never see half-written results.
+    retired = None
+    if target.exists():
+        retired = target.parent / f".{job_id}.{uuid.uuid4().hex}.old"
+        target.rename(retired)
+    staging.rename(target)
+    if retired is not None:
+        shutil.rmtree(retired, ignore_errors=True)
+    return meta
+
+
+def remove_job_results(job_id: int):
+    """Delete the stored results of a job, if any."""
+    target = results_dir(job_id)
+    if not target.exists():
+        return
+    # Renamed first, so readers see either all of the results or none.
+    retired = target.parent / f".{job_id}.{uuid.uuid4().hex}.old"
+    try:
+        target.rename(retired)
+    except FileNotFoundError:
+        return
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+class JobResults:
+    """Read-only, memory-mapped view of one job's stored results."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.path = results_dir(job_id)
+
+    def exists(self) -> bool:
+        return (self.path / "meta.json").exists()
+
+    @property
+    def meta(self) -> dict:
+        return json.loads((self.path / "meta.json").read_text())
+
+    def _array(self, name):
+        return np.load(self.path / f"{name}.npy", mmap_mode="r")
+
+    def _table(self, level):
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {', '.join(LEVELS)}.")
+        if level == "event":
+            return {"event_id": self._array("event_id")}, self._array("event_loss")
+        if not (self.path / "location_loss.npy").exists():
+            raise ValueError("This job has no location-level results.")
+        ids = {
+            "event_id": self._array("location_event_id"),
+            "location_id": self._array("location_id"),
+        }
+        return ids, self._array("location_loss")
+
+    @staticmethod
+    def _rows(ids, loss, positions) -> list[dict]:
+        columns = {name: array[positions].tolist() for name, array in ids.items()}
+        columns["loss"] = loss[positions].tolist()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    def top(self, k: int, level: str = "event", event_id=None) -> list[dict]:
+        """The ``k`` largest losses, optionally of one event's locations."""
+        ids, loss = self._table(level)
+        if event_id is not None and level == "location":
+            positions = np.flatnonzero(ids["event_id"] == event_id)[:k]
+        else:
+            positions = np.arange(min(k, len(loss)))
+        return self._rows(ids, loss, positions)
+
+    def above(self, threshold: float, level: str = "event", limit: int = 1000):
+        """``(count, rows)`` of losses of at least ``threshold``, largest first."""
+        ids, loss = self._table(level)
+        # loss is descending, so its reverse can be binary searched.
+        count = len(loss) - int(np.searchsorted(loss[::-1], threshold, side="left"))
+        return count, self._rows(ids, loss, np.arange(min(count, limit)))
+
+    def _by_event(self):
+        positions = self._array("event_by_id")
+        return self._array("event_id")[positions], self._array("event_loss")[positions]
+
+    def compare(self, other: "JobResults", k: int = 100) -> dict:
+        """Event loss differences ``other - self``, with the ``k`` largest changes."""
+        ids, loss = self._by_event()
+        other_ids, other_loss = other._by_event()
+        all_ids = np.union1d(ids, other_ids)
+        base = np.zeros(len(all_ids))
+        base[np.searchsorted(all_ids, ids)] = loss
+        new = np.zeros(len(all_ids))
+        new[np.searchsorted(all_ids, other_ids)] = other_loss
+        diff = new - base
+
+        k = min(k, len(all_ids))
+        largest = np.argpartition(-np.abs(diff), k - 1)[:k] if k else np.array([], dtype=np.int64)
+        largest = largest[np.lexsort((all_ids[largest], -np.abs(diff[largest])))]
+        common = len(ids) + len(other_ids) - len(all_ids)
+        return {
+            "events": {
+                "job": len(ids),
+                "other": len(other_ids),
+                "common": common,
+                "only_job": len(ids) - common,
+                "only_other": len(other_ids) - common,
+                "changed": int(np.count_nonzero(diff)),
+            },
+            "total_loss": {
+                "job": float(loss.sum()),
+                "other": float(other_loss.sum()),
+                "difference": float(diff.sum()),
+            },
+            "largest_changes": [
+                {"event_id": event_id, "job": a, "other": b, "difference": b - a}
+                for event_id, a, b in zip(
+                    all_ids[largest].tolist(), base[largest].tolist(), new[largest].tolist()
+                )
+            ],
+        }
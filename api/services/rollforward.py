@@ -0,0 +1,129 @@
+"""
+Quarterly roll-forward of report modifiers.
+
+The modifiers of a source quarter, named by any day in it, are copied with their ``as_at_date`` and
+``fx_date`` moved ``months`` ahead (month ends stay month ends), and each
+copy is linked to the valid reports linked to its original. Copies that
+already exist are reused and existing links kept, so a roll-forward can be
+repeated. The source quarter has no default: "the latest quarter" would
+be the one just created when a roll-forward is retried. Optionally a pending job (``fireant_jobid`` 0 until the scheduler
+submits it) is created for every new link.
+
+Everything runs in one transaction with bulk inserts: a handful of queries
+per new modifier, whatever the number of reports.
+"""
+
+import calendar
+from datetime import date, timedelta
+from itertools import islice
+
+from django.db import router, transaction
+
+from api.models.job import Job
+from api.models.report import Report, ReportModifier
+from api.services.analytics import add_new_job_rollups
+from api.services.changes import record_changes
+
+# Links added per statement, well below SQLite's 32766 parameters.
+CHUNK = 5000
+
+
+def shift_months(value: date | None, months: int) -> date | None:
+    """``value`` moved ``months`` ahead; the last day of a month maps to the last day."""
+    if value is None:
+        return None
+    index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(index, 12)
+    last = calendar.monthrange(year, month + 1)[1]
+    is_month_end = value.day == calendar.monthrange(value.year, value.month)[1]
+    return date(year, month + 1, last if is_month_end else min(value.day, last))
+
+
+def quarter_bounds(day: date) -> tuple[date, date]:
+    start = date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    return start, shift_months(start, 3) - timedelta(days=1)
+
+
+def roll_forward(from_date, months=3, report_ids=None, create_jobs=False) -> dict:
+    """
+    Roll the modifiers of the quarter containing ``from_date`` forward by
+    ``months``, for the valid reports (or those of ``report_ids``) linked to
+    them.
+    """
+    with transaction.atomic(using=router.db_for_write(ReportModifier)):
+        start, end = quarter_bounds(from_date)
+        sources = list(
+            ReportModifier.objects.filter(as_at_date__range=(start, end)).order_by(
+                "as_at_date", "fx_date", "id"
+            )
+        )
+
+        reports = Report.objects.filter(is_valid=True)
+        if report_ids is not None:
+            reports = reports.filter(pk__in=report_ids)
+        through = ReportModifier.reports.through
+        source_reports = {source.id: set() for source in sources}
+        for modifier_id, report_id in through.objects.filter(
+            reportmodifier_id__in=source_reports, report_id__in=reports.values("pk")
+        ).values_list("reportmodifier_id", "report_id"):
+            source_reports[modifier_id].add(report_id)
+
+        # Sources with the same dates share a target.
+        targets = {}
+        for source in sources:
+            key = (shift_months(source.as_at_date, months), shift_months(source.fx_date, months))
+            targets.setdefault(key, {"sources": [], "reports": set()})
+            targets[key]["sources"].append(source.id)
+            targets[key]["reports"] |= source_reports[source.id]
+
+        existing = {}
+        for modifier in ReportModifier.objects.filter(
+            as_at_date__in={as_at for as_at, _ in targets}
+        ).order_by("id"):
+            existing.setdefault((modifier.as_at_date, modifier.fx_date), modifier)
+        new = [
+            ReportModifier(as_at_date=as_at, fx_date=fx)
+            for as_at, fx in targets
+            if (as_at, fx) not in existing
+        ]
+        ReportModifier.objects.bulk_create(new)
+        record_changes("report-modifier", [modifier.id for modifier in new], "create")
+        existing.update({(m.as_at_date, m.fx_date): m for m in new})
+
+        results, jobs = [], []
+        for key, target in targets.items():
+            modifier = existing[key]
+            linked = set(modifier.reports.values_list("pk", flat=True))
+            added = sorted(target["reports"] - linked)
+            # Through the related manager, so the signal handlers bump the
+            # reports' ``updated`` and record the links in the change feed.
+            ids = iter(added)
+            while chunk := list(islice(ids, CHUNK)):
+                modifier.reports.add(*chunk)
+            if create_jobs:
+                jobs.extend(
+                    Job(report_id=report_id, report_modifier=modifier, fireant_jobid=0)
+                    for report_id in added
+                )
+            results.append(
+                {
+                    "id": modifier.id,
+                    "as_at_date": modifier.as_at_date,
+                    "fx_date": modifier.fx_date,
+                    "sources": target["sources"],
+                    "created": modifier in new,
+                    "linked": len(added),
+                    "already_linked": len(target["reports"] & linked),
+                }
+            )
+
+        Job.objects.bulk_create(jobs, batch_size=1000)
+        add_new_job_rollups(jobs)
+        record_changes("job", [job.id for job in jobs], "create")
+
+    return {
+        "source_quarter": [start, end],
+        "modifiers": results,
+        "linked": sum(result["linked"] for result in results),
+        "jobs": len(jobs),
+    }
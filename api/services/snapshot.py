@@ -0,0 +1,122 @@
+"""
+Read-only snapshot of api_db for heavy reads.
+
+``refresh_snapshot`` copies the live database with ``VACUUM INTO`` on a
+connection of its own: one read transaction, so the copy is a consistent
+state and, unlike a stepwise backup, does not restart when writers commit
+meanwhile. The copy is written to a temporary file and renamed over
+``SNAPSHOT_PATH``; a copy taking longer than ``SNAPSHOT_REFRESH_TIMEOUT``
+seconds is abandoned. The ``api_snapshot`` database alias opens that file
+read-only.
+
+Views opt in with ``api.views.core.SnapshotReadMixin``. For the length of
+the request, ``project.routers.ApiDatabaseRouter`` then sends the api app's
+reads to ``api_snapshot`` instead of ``api_db``. A snapshot that is missing
+or older than ``SNAPSHOT_MAX_AGE`` seconds is not used; such reads stay on
+the live database. A connection still open on a replaced file is closed
+before it is used, so what ``snapshot_meta`` reports is what was read.
+"""
+
+import contextvars
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+ALIAS = "api_snapshot"
+LIVE_ALIAS = "api_db"
+
+_read_alias = contextvars.ContextVar("api_read_alias", default=None)
+
+
+def read_alias():
+    """The alias the api app reads from in the current context, or None for the live one."""
+    return _read_alias.get()
+
+
+@contextmanager
+def reading_snapshot():
+    """Read the api app from the snapshot inside the block, if it is fresh enough."""
+    taken_at = fresh_snapshot_taken_at()
+    if taken_at is not None:
+        connection = connections[ALIAS]
+        if getattr(connection, "snapshot_taken_at", None) != taken_at:
+            # Opened on a file since replaced; reopen it on the current one.
+            connection.close()
+            connection.snapshot_taken_at = taken_at
+    token = _read_alias.set(ALIAS if taken_at is not None else None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def snapshot_taken_at():
+    """When the current snapshot file was completed, or None if there is none."""
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(settings.SNAPSHOT_PATH), timezone.utc)
+    except OSError:
+        return None
+
+
+def fresh_snapshot_taken_at():
+    """``snapshot_taken_at``, or None if the snapshot is older than ``SNAPSHOT_MAX_AGE``."""
+    taken_at = snapshot_taken_at()
+    if taken_at is None or time.time() - taken_at.timestamp() > settings.SNAPSHOT_MAX_AGE:
+        return None
+    return taken_at
+
+
+def snapshot_meta():
+    """What ``meta["snapshot"]`` reports about where a response was read from."""
+    if read_alias() != ALIAS:
+        return {"source": "live"}
+    # A refresh between the check and the connection opening only makes
+    # the data read newer than reported.
+    taken_at = connections[ALIAS].snapshot_taken_at
+    return {
+        "source": "snapshot",
+        "taken_at": taken_at.isoformat(),
+        "age_seconds": round(time.time() - taken_at.timestamp(), 1),
+    }
+
+
+def refresh_snapshot() -> dict:
+    """Copy the live database to ``SNAPSHOT_PATH``."""
+    path = str(settings.SNAPSHOT_PATH)
+    partial = f"{path}.partial"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(partial):
+        os.remove(partial)
+    started = time.monotonic()
+    deadline = started + settings.SNAPSHOT_REFRESH_TIMEOUT
+
+    # A connection of its own: the copy holds only committed data, and
+    # whatever transaction the caller is in cannot block it.
+    source = sqlite3.connect(**connections[LIVE_ALIAS].get_connection_params())
+    # Returning true interrupts the statement.
+    source.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+    try:
+        source.execute("VACUUM INTO ?", (partial,))
+    except sqlite3.OperationalError:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        source.close()
+    os.replace(partial, path)
+
+    result = {
+        "path": path,
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    logger.info(f"Snapshot refreshed: {result}")
+    return result
@@ -0,0 +1,63 @@
+"""
+Numeric tables uploaded as CSV or NPZ.
+
+CSV files need a header row naming the columns; NPZ files hold one array per
+column. Each wanted column may go by several names (aliases).
+"""
+
+import io
+import zipfile
+
+import numpy as np
+
+
+def _find(header, name, aliases):
+    for alias in aliases:
+        if alias in header:
+            return header.index(alias)
+    return None
+
+
+def read_columns(file, filename: str, columns: dict, optional=()) -> dict:
+    """
+    ``{name: float64 array}`` for each of ``columns`` (``name -> aliases``).
+
+    Columns named in ``optional`` are left out when missing; any other
+    missing column, unparsable value or ragged table raises ``ValueError``.
+    """
+    found = {}
+    if filename.lower().endswith(".npz"):
+        try:
+            with np.load(file) as arrays:
+                header = [name.lower() for name in arrays.files]
+                for name, aliases in columns.items():
+                    index = _find(header, name, aliases)
+                    if index is not None:
+                        found[name] = np.asarray(arrays[arrays.files[index]], dtype=np.float64).ravel()
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Invalid NPZ file: {e}")
+        if len({len(column) for column in found.values()}) > 1:
+            raise ValueError("NPZ arrays must all have the same length.")
+    else:
+        text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+        header = [name.strip().lower() for name in text.readline().split(",")]
+        indices = {
+            name: index
+            for name, aliases in columns.items()
+            if (index := _find(header, name, aliases)) is not None
+        }
+        if indices:
+            try:
+                table = np.loadtxt(
+                    text, delimiter=",", usecols=list(indices.values()), ndmin=2
+                )
+            except ValueError as e:
+                raise ValueError(f"Invalid CSV file: {e}")
+            found = {name: table[:, k] for k, name in enumerate(indices)}
+
+    for name, aliases in columns.items():
+        if name not in found and name not in optional:
+            raise ValueError(f"Missing column '{name}' (one of {', '.join(aliases)}).")
+    if not all(np.all(np.isfinite(column)) for column in found.values()):
+        raise ValueError("All values must be finite numbers.")
+    return found
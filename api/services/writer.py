@@ -0,0 +1,181 @@
+"""
+Single-writer queue for api_db.
+
+SQLite lets one connection write at a time. Under bursts every request
+waits for the file lock on its own, and those that wait longer than the
+busy timeout fail with "database is locked". A ``WriteQueue`` runs writes
+on one thread instead: it takes up to ``max_batch`` waiting writes at a
+time and runs them in a single transaction, each in its own savepoint, so
+a burst costs one commit rather than one per write and no two writes
+contend for the lock (group commit). Callers block until the batch has
+committed.
+
+The transaction and savepoints span every database of ``using``, so a
+write rolled back is rolled back on all of them; writes to other
+databases are not grouped. The first of ``using`` commits first. If that
+commit fails, nothing of the batch is kept and each write is run again
+alone, so one bad write costs its own caller an error rather than the
+whole batch; writes must therefore be safe to run twice. Each write runs
+in a copy of its caller's context (active time zone, language and other
+context variables), and the writer thread's connections are closed after
+each batch, when unusable or older than ``CONN_MAX_AGE``, as they would be
+at the end of a request.
+
+The queue holds at most ``max_depth`` writes; beyond that ``submit``
+raises ``QueueFull`` with an estimate of when to retry.
+``api.middleware.SingleWriterMiddleware`` puts mutating API requests
+through one.
+"""
+
+import contextvars
+import logging
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import ExitStack, contextmanager
+
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Write queue is full; retry after {retry_after} s.")
+        self.retry_after = retry_after
+
+
+class _Rollback(Exception):
+    """Rolls back the savepoint of a write whose result asks for it."""
+
+
+class _PartialCommit(Exception):
+    """The first database committed, but another of the batch did not."""
+
+
+class WriteQueue:
+    def __init__(self, using="api_db", max_depth=256, max_batch=64):
+        self.using = [using] if isinstance(using, str) else list(using)
+        self.max_batch = max_batch
+        self.stats = {"writes": 0, "batches": 0, "rejected": 0, "retried": 0}
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._thread = None
+        # Guards the thread, the stats and the moving average.
+        self._lock = threading.Lock()
+        # Moving average, used to tell rejected callers when to retry.
+        self._seconds_per_write = 0.01
+
+    def submit(self, fn, rollback_if=None):
+        """
+        Run ``fn()`` on the writer thread and return its result once its
+        batch has committed. Its writes are rolled back (and the result
+        still returned) when ``rollback_if(result)`` is true.
+        """
+        if threading.current_thread() is self._thread:
+            return fn()
+        future = Future()
+        try:
+            self._queue.put_nowait((contextvars.copy_context(), fn, rollback_if, future))
+        except queue.Full:
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise QueueFull(self.retry_after()) from None
+        self._start()
+        return future.result()
+
+    def retry_after(self) -> int:
+        """Seconds until the writes waiting now should be done."""
+        with self._lock:
+            seconds_per_write = self._seconds_per_write
+        return max(1, math.ceil(self._queue.qsize() * seconds_per_write))
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="api-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        started = time.monotonic()
+        retried = 0
+        try:
+            outcomes = self._commit(batch)
+        except _PartialCommit as e:
+            logger.error(f"Write batch of {len(batch)} partly committed: {e.__cause__}")
+            outcomes = [(None, e.__cause__)] * len(batch)
+        except Exception as e:
+            logger.warning(f"Write batch of {len(batch)} failed to commit ({e}); retrying one by one")
+            outcomes = []
+            for write in batch:
+                try:
+                    outcomes.extend(self._commit([write]))
+                except _PartialCommit as error:
+                    outcomes.append((None, error.__cause__))
+                except Exception as error:
+                    outcomes.append((None, error))
+            retried = len(batch)
+        finally:
+            close_old_connections()
+
+        for (_, _, _, future), (result, error) in zip(batch, outcomes):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        elapsed = (time.monotonic() - started) / len(batch)
+        with self._lock:
+            self.stats["writes"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["retried"] += retried
+            self._seconds_per_write += 0.2 * (elapsed - self._seconds_per_write)
+
+    def _commit(self, batch):
+        """Run ``batch`` in one transaction on every database; ``(result, error)`` per write."""
+        committed = []
+        try:
+            with self._atomic(on_first_commit=lambda: committed.append(True)):
+                outcomes = [self._call(*write[:3]) for write in batch]
+        except Exception as e:
+            if committed:
+                raise _PartialCommit from e
+            raise
+        return outcomes
+
+    @contextmanager
+    def _atomic(self, on_first_commit=None):
+        """
+        Atomic on every database of ``using``. The first is innermost, so it
+        commits first, and then ``on_first_commit()`` is called.
+        """
+        with ExitStack() as stack:
+            for alias in reversed(self.using[1:]):
+                stack.enter_context(transaction.atomic(using=alias))
+            with transaction.atomic(using=self.using[0]):
+                yield
+            if on_first_commit is not None:
+                on_first_commit()
+
+    def _call(self, context, fn, rollback_if):
+        result = None
+        try:
+            with self._atomic():
+                result = context.run(fn)
+                if rollback_if is not None and rollback_if(result):
+                    raise _Rollback
+        except _Rollback:
+            pass
+        except Exception as e:
+            return None, e
+        return result, None
@@ -0,0 +1,228 @@
+# Signal handlers keeping derived data of the api app in sync with writes.
+
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.models.event import BoxEvent, Event, EventGroup, GeoEvent, RingEvent
+from api.models.job import Job, JobRollup
+from api.models.report import Report, ReportModifier
+from api.services.analytics import update_job_rollups
+from api.services.changes import EVENT_TYPES, RESOURCES, record_change, record_changes
+from api.services.hashing import (
+    GEOMETRY_FIELDS,
+    adjust_group_hashes,
+    event_geometry_hash,
+    member_hashes,
+    report_config_hash,
+)
+from api.services.regions import assign_regions
+from api.services.results import remove_job_results
+
+EVENT_MODELS = (Event, RingEvent, BoxEvent, GeoEvent)
+
+
+@receiver(pre_save, sender=Job)
+def remember_job_state(sender, instance, raw=False, **kwargs):
+    """Keep the stored row of an updated job so its old rollup can be corrected."""
+    instance._rollup_previous = None
+    if raw or instance._state.adding:
+        return
+    instance._rollup_previous = (
+        Job.objects.filter(pk=instance.pk)
+        .values_list("report_id", "created", "updated")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Job)
+def update_job_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_job_rollups(getattr(instance, "_rollup_previous", None), instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_deleted_job_results(sender, instance, **kwargs):
+    """Stored results go with their job, whether it is deleted or archived."""
+    job_id = instance.pk
+    transaction.on_commit(
+        lambda: remove_job_results(job_id), using=router.db_for_write(Job)
+    )
+
+
+@receiver(pre_save, sender=GeoEvent)
+def set_geo_event_region(sender, instance, raw=False, **kwargs):
+    """Point the event at the region of its country/area/subarea/subarea2."""
+    if raw:
+        return
+    assign_regions([instance])
+
+
+def set_event_geometry_hash(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Hash the geometry of saved events, remembering the change for their groups."""
+    instance._geometry_hash_delta = 0
+    if raw or (update_fields is not None and not set(update_fields) & set(GEOMETRY_FIELDS[sender])):
+        return
+    if sender is Event and not instance._state.adding:
+        # A plain Event carries none of its subclass's geometry.
+        return
+    previous = None
+    if not instance._state.adding:
+        previous = (
+            Event.objects.filter(pk=instance.pk).values_list("geometry_hash", flat=True).first()
+        )
+    instance.geometry_hash = event_geometry_hash(instance)
+    if previous is not None:
+        instance._geometry_hash_delta = instance.geometry_hash - previous
+
+
+def update_groups_of_event(sender, instance, raw=False, created=False, **kwargs):
+    """Apply a geometry change to the event's groups, whose listing of it changed either way."""
+    if raw or created:
+        return
+    delta = getattr(instance, "_geometry_hash_delta", 0)
+    group_ids = EventGroup.events.through.objects.filter(event_id=instance.pk).values_list(
+        "eventgroup_id", flat=True
+    )
+    adjust_group_hashes({group_id: delta for group_id in group_ids})
+
+
+for model in EVENT_MODELS:
+    pre_save.connect(set_event_geometry_hash, sender=model, dispatch_uid=f"geometry_hash_{model.__name__}")
+    post_save.connect(update_groups_of_event, sender=model, dispatch_uid=f"group_hash_{model.__name__}")
+
+
+@receiver(pre_delete, sender=Event)
+def remove_deleted_event_from_groups(sender, instance, **kwargs):
+    """
+    Subtract a deleted event from its groups. Deleting a subclass also
+    deletes its ``Event`` row, so this runs once per event either way.
+    """
+    memberships = EventGroup.events.through.objects.filter(event_id=instance.pk)
+    adjust_group_hashes(
+        {
+            group_id: -geometry_hash
+            for group_id, geometry_hash in memberships.values_list(
+                "eventgroup_id", "event__geometry_hash"
+            )
+        }
+    )
+
+
+@receiver(m2m_changed, sender=EventGroup.events.through)
+def update_group_membership_hash(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Add or subtract changed members. ``pk_set`` of add holds only new
+    members, but remove lists whatever was asked for, so removals and
+    clears are looked up before they happen.
+    """
+    through = EventGroup.events.through
+    column = "event_id" if reverse else "eventgroup_id"
+    if action in ("pre_remove", "pre_clear"):
+        memberships = through.objects.filter(**{column: instance.pk})
+        if action == "pre_remove":
+            other = "eventgroup_id__in" if reverse else "event_id__in"
+            memberships = memberships.filter(**{other: pk_set})
+        instance._removed_memberships = list(memberships.values_list("eventgroup_id", "event_id"))
+    elif action in ("post_remove", "post_clear"):
+        removed = member_hashes(getattr(instance, "_removed_memberships", []))
+        adjust_group_hashes({group_id: -value for group_id, value in removed.items()})
+    elif action == "post_add" and pk_set:
+        if reverse:
+            pairs = [(group_id, instance.pk) for group_id in pk_set]
+        else:
+            pairs = [(instance.pk, event_id) for event_id in pk_set]
+        adjust_group_hashes(member_hashes(pairs))
+
+
+@receiver(pre_save, sender=Report)
+def set_report_config_hash(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance.config_hash = report_config_hash(instance)
+
+
+@receiver(post_save, sender=Report)
+def relabel_report_rollups(sender, instance, created=False, raw=False, **kwargs):
+    """Job rollups are grouped by their report's peril and priority, so they follow changes."""
+    if raw or created:
+        return
+    JobRollup.objects.filter(report=instance.pk).exclude(
+        peril=instance.peril, priority=instance.priority
+    ).update(peril=instance.peril, priority=instance.priority)
+
+
+@receiver(m2m_changed, sender=ReportModifier.reports.through)
+def touch_reports_of_modifier(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reports list their modifiers, so linking or unlinking one updates the report."""
+    if action == "pre_clear" and not reverse:
+        instance._cleared_reports = list(instance.reports.values_list("pk", flat=True))
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        report_ids = [instance.pk]
+    elif action == "post_clear":
+        report_ids = getattr(instance, "_cleared_reports", [])
+    else:
+        report_ids = pk_set or []
+    Report.objects.filter(pk__in=report_ids).update(updated=timezone.now())
+    record_changes("report", report_ids, "update")
+
+
+def record_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    data = {"type": EVENT_TYPES[sender]} if sender in EVENT_TYPES else None
+    record_change(RESOURCES[sender], instance.pk, "create" if created else "update", data)
+
+
+def record_delete(sender, instance, **kwargs):
+    if sender in EVENT_TYPES and sender is not Event:
+        # Recorded once, for the Event row deleted with it.
+        return
+    record_change(RESOURCES[sender], instance.pk, "delete")
+
+
+for model in RESOURCES:
+    post_save.connect(record_save, sender=model, dispatch_uid=f"change_save_{model.__name__}")
+    post_delete.connect(record_delete, sender=model, dispatch_uid=f"change_delete_{model.__name__}")
+
+
+MEMBERSHIP_FIELDS = {
+    EventGroup.events.through: EventGroup._meta.get_field("events"),
+    ReportModifier.reports.through: ReportModifier._meta.get_field("reports"),
+}
+
+
+@receiver(m2m_changed, sender=EventGroup.events.through)
+@receiver(m2m_changed, sender=ReportModifier.reports.through)
+def record_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Record membership changes against the owning side, e.g. the event group."""
+    field = MEMBERSHIP_FIELDS[sender]
+    owner_column, member_column = field.m2m_column_name(), field.m2m_reverse_name()
+    if action in ("pre_remove", "pre_clear"):
+        rows = sender.objects.filter(**{member_column if reverse else owner_column: instance.pk})
+        if action == "pre_remove":
+            rows = rows.filter(**{f"{owner_column if reverse else member_column}__in": pk_set})
+        instance._membership_changes = list(rows.values_list(owner_column, member_column))
+        return
+    if action == "post_add":
+        verb = "add"
+        if reverse:
+            pairs = [(owner_id, instance.pk) for owner_id in pk_set]
+        else:
+            pairs = [(instance.pk, member_id) for member_id in pk_set]
+    elif action in ("post_remove", "post_clear"):
+        verb = "remove"
+        pairs = getattr(instance, "_membership_changes", [])
+    else:
+        return
+    members = {}
+    for owner_id, member_id in pairs:
+        members.setdefault(owner_id, []).append(member_id)
+    for owner_id, member_ids in members.items():
+        record_change(
+            RESOURCES[field.model], owner_id, verb, {"field": field.name, "ids": sorted(member_ids)}
+        )
@@ -0,0 +1,100 @@
+# Celery tasks for the api app
+
+from celery import shared_task
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from api.models.task import LinkTask
+from api.services.archive import archive_old_jobs
+from api.services.changes import prune_changes
+from api.services.links import link_combinations
+from api.services.snapshot import refresh_snapshot as refresh_snapshot_file
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, name='api.tasks.archive_jobs')
+def archive_jobs(self, older_than_days=None, batch_size=None):
+    """
+    Move old jobs from the live jobs table into the archive database.
+
+    Defaults come from JOB_ARCHIVE_AFTER_DAYS and JOB_ARCHIVE_BATCH_SIZE.
+    """
+    try:
+        result = archive_old_jobs(older_than_days, batch_size)
+    except Exception as e:
+        logger.error(f"Job archival failed: {e}")
+        raise self.retry(exc=e, countdown=600, max_retries=2)
+
+    logger.info(f"Job archival completed: {result}")
+    return {
+        'status': 'success',
+        'task_id': self.request.id,
+        **result,
+    }
+
+
+@shared_task(bind=True, name='api.tasks.prune_change_feed')
+def prune_change_feed(self, older_than_days=None):
+    """Delete change feed entries older than CHANGE_FEED_RETENTION_DAYS."""
+    result = prune_changes(older_than_days)
+    logger.info(f"Change feed pruned: {result}")
+    return {
+        'status': 'success',
+        'task_id': self.request.id,
+        **result,
+    }
+
+
+@shared_task(bind=True, name='api.tasks.refresh_snapshot')
+def refresh_snapshot(self):
+    """Copy api_db to the read-only snapshot database."""
+    try:
+        result = refresh_snapshot_file()
+    except Exception as e:
+        logger.error(f"Snapshot refresh failed: {e}")
+        raise self.retry(exc=e, countdown=60, max_retries=2)
+    return {
+        'status': 'success',
+        'task_id': self.request.id,
+        **result,
+    }
+
+
+@shared_task(bind=True, name='api.tasks.link_reports')
+def link_reports(self, link_task_id):
+    """
+    Link the reports of a LinkTask to its modifiers, LINK_CHUNK_SIZE
+    reports per transaction, recording progress on the LinkTask.
+    """
+    link_task = LinkTask.objects.get(pk=link_task_id)
+    if link_task.status != LinkTask.PENDING:
+        return {'status': 'skipped', 'task_id': self.request.id, 'link_task': link_task_id}
+    LinkTask.objects.filter(pk=link_task_id).update(status=LinkTask.RUNNING, started=timezone.now())
+
+    def progress(stats):
+        LinkTask.objects.filter(pk=link_task_id).update(**stats)
+
+    try:
+        stats = link_combinations(
+            link_task.reports, link_task.modifiers, settings.LINK_CHUNK_SIZE, progress
+        )
+    except Exception as e:
+        logger.error(f"Link task {link_task_id} failed: {e}")
+        LinkTask.objects.filter(pk=link_task_id).update(
+            status=LinkTask.FAILED, error=str(e), finished=timezone.now()
+        )
+        raise
+
+    LinkTask.objects.filter(pk=link_task_id).update(
+        status=LinkTask.SUCCESS, finished=timezone.now(), **stats
+    )
+    logger.info(f"Link task {link_task_id} completed: {stats}")
+    return {
+        'status': 'success',
+        'task_id': self.request.id,
+        'link_task': link_task_id,
+        **stats,
+    }
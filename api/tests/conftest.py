@@ -0,0 +1,10 @@
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="tester"))
+    return client
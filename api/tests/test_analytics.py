@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import Job, JobRollup, JobRollupBucket, Report
+from api.services.analytics import bucket_index, percentile, rebuild_job_rollups
+from api.services.bulk import bulk_update
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def finish(job, minutes):
+    """Save a job as finished about ``minutes`` after it was created."""
+    if job.pk is None:
+        job.save()
+    job.created -= timedelta(minutes=minutes)
+    job.save()
+
+
+@pytest.fixture
+def reports():
+    return [
+        Report.objects.create(name="a", peril="Flood", loss_perspective="Gross"),
+        Report.objects.create(name="b", peril="Wind", loss_perspective="Gross", priority="Low"),
+    ]
+
+
+def test_percentile_from_histogram():
+    histogram = [0] * 72
+    histogram[10] = 50
+    histogram[20] = 50
+    assert percentile(histogram, 25) < percentile(histogram, 75)
+    assert percentile([0] * 72, 50) is None
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rollups_follow_job_writes(reports):
+    flood, wind = reports
+    job = Job.objects.create(report=flood, fireant_jobid=1)
+    Job.objects.create(report=wind, fireant_jobid=2)
+
+    rollup = JobRollup.objects.get(report=flood.id)
+    assert (rollup.job_count, rollup.completed_count) == (1, 0)
+
+    job.save()  # no duration change yet, counts stay stable
+    rollup.refresh_from_db()
+    assert rollup.job_count == 1
+
+    finish(job, 30)
+    rollup = JobRollup.objects.get(day=job.created.date(), report=flood.id)
+    assert rollup.job_count == 1
+    assert rollup.completed_count == 1
+    assert rollup.duration_sum == pytest.approx(1800, abs=1)
+    assert sum(JobRollup.objects.values_list("job_count", flat=True)) == 2
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rebuild_matches_incremental(reports):
+    for i in range(3):
+        finish(Job(report=reports[i % 2], fireant_jobid=i), 10 * (i + 1))
+    before = sorted(JobRollup.objects.values_list("report", "job_count", "completed_count"))
+
+    rebuild_job_rollups()
+
+    assert sorted(JobRollup.objects.values_list("report", "job_count", "completed_count")) == before
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_analytics_endpoint(reports):
+    for i in range(4):
+        finish(Job(report=reports[0], fireant_jobid=i), 60)
+    Job.objects.create(report=reports[1], fireant_jobid=9)
+
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="tester"))
+    response = client.get(
+        reverse("api:job-analytics-list"), {"group_by": "peril", "bucket": "month"}
+    )
+
+    assert response.status_code == 200
+    rows = {row["peril"]: row for row in response.json()["data"]}
+    assert rows["Flood"]["jobs"] == 4
+    assert rows["Flood"]["completed"] == 4
+    assert rows["Flood"]["duration_seconds"]["p50"] == pytest.approx(3600, rel=0.25)
+    assert rows["Wind"]["completed"] == 0
+
+    assert client.get(reverse("api:job-analytics-list"), {"group_by": "x"}).status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rollups_follow_report_labels(reports):
+    flood, wind = reports
+    Job.objects.create(report=flood, fireant_jobid=1)
+    Job.objects.create(report=wind, fireant_jobid=2)
+
+    flood.priority = "High"
+    flood.save()
+    assert JobRollup.objects.get(report=flood.id).priority == "High"
+
+    bulk_update(Report.objects.filter(pk=wind.pk), {"peril": "Surge"})
+    assert JobRollup.objects.get(report=wind.id).peril == "Surge"
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rollup_histograms_are_bucket_rows(reports):
+    jobs = [Job(report=reports[0], fireant_jobid=i) for i in range(3)]
+    for job in jobs:
+        finish(job, 10)
+    finish(jobs[0], 120)  # moves from the 10 minute bucket to the 130 minute one
+
+    def counts():
+        buckets = JobRollupBucket.objects.filter(rollup__report=reports[0].id, count__gt=0)
+        return dict(buckets.values_list("bucket").annotate(Sum("count")))
+
+    assert counts() == {bucket_index(130 * 60): 1, bucket_index(10 * 60): 2}
+    before = counts()
+    rebuild_job_rollups()
+    assert counts() == before
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_analytics_window(reports):
+    job = Job.objects.create(report=reports[0], fireant_jobid=1)
+    Job.objects.filter(pk=job.pk).update(created=job.created - timedelta(days=200))
+    rebuild_job_rollups()
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="tester"))
+    url = reverse("api:job-analytics-list")
+
+    # The default window ends today and does not reach back 200 days.
+    response = client.get(url).json()
+    assert response["data"] == []
+    assert response["meta"]["end"] == timezone.now().date().isoformat()
+
+    start = (timezone.now() - timedelta(days=210)).date().isoformat()
+    assert len(client.get(url, {"start": start}).json()["data"]) == 1
+
+    with override_settings(JOB_ANALYTICS_MAX_DAYS=100):
+        assert client.get(url, {"start": start}).status_code == 400
+    assert client.get(url, {"start": "2026-02-01", "end": "2026-01-01"}).status_code == 400
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import ArchivedJob, Job, Report
+from api.services.archive import archive_old_jobs
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+@pytest.fixture
+def jobs():
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+    now = timezone.now()
+    created = []
+    for age_days in (400, 300, 200, 10, 1):
+        job = Job.objects.create(report=report, fireant_jobid=age_days)
+        Job.objects.filter(pk=job.pk).update(created=now - timedelta(days=age_days))
+        created.append(job.pk)
+    return created
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_archive_moves_old_jobs_in_batches(jobs):
+    result = archive_old_jobs(older_than_days=180, batch_size=2)
+
+    assert result["archived"] == 3
+    assert result["batches"] == 2
+    assert sorted(Job.objects.values_list("fireant_jobid", flat=True)) == [1, 10]
+    assert sorted(ArchivedJob.objects.values_list("fireant_jobid", flat=True)) == [
+        200,
+        300,
+        400,
+    ]
+    # Re-running is a no-op.
+    assert archive_old_jobs(older_than_days=180)["archived"] == 0
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_job_list_merges_archive(api_client, jobs):
+    archive_old_jobs(older_than_days=180)
+    url = reverse("api:job-list")
+
+    live = api_client.get(url).json()
+    assert live["meta"]["pagination"]["total"] == 2
+
+    merged = api_client.get(url, {"include_archived": 1, "page_size": 3}).json()
+    assert merged["meta"]["pagination"]["total"] == 5
+    assert [job["id"] for job in merged["data"]] == jobs[::-1][:3]
+
+    second = api_client.get(
+        url, {"include_archived": 1, "page_size": 3, "page": 2, "ordering": "created"}
+    ).json()
+    assert [job["id"] for job in second["data"]] == jobs[3:]
+
+    detail = api_client.get(
+        reverse("api:job-detail", args=[jobs[0]]), {"include_archived": 1}
+    )
+    assert detail.status_code == 200
+    assert detail.json()["report"] == merged["data"][0]["report"]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_job_list_pages_after_a_job(api_client, jobs):
+    archive_old_jobs(older_than_days=180)
+    url = reverse("api:job-list")
+
+    # Newest first: jobs[4], jobs[3] live, then the archived ones.
+    first = api_client.get(url, {"include_archived": 1, "after": jobs[4], "page_size": 2}).json()
+    assert [job["id"] for job in first["data"]] == [jobs[3], jobs[2]]
+    assert first["meta"]["pagination"]["has_next"]
+    second = api_client.get(first["links"]["next"]).json()
+    assert [job["id"] for job in second["data"]] == [jobs[1], jobs[0]]
+    assert not second["meta"]["pagination"]["has_next"] and second["links"]["next"] is None
+
+    ascending = api_client.get(
+        url, {"include_archived": 1, "after": jobs[1], "ordering": "created"}
+    ).json()
+    assert [job["id"] for job in ascending["data"]] == jobs[2:]
+
+    assert api_client.get(url, {"include_archived": 1, "after": 999}).status_code == 404
+    assert api_client.get(url, {"include_archived": 1, "after": "x"}).status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rerun_reconciles_a_batch_left_in_both_databases(jobs):
+    archive_old_jobs(older_than_days=180)
+    # As if the delete of the last batch had failed after its copy.
+    ArchivedJob.objects.filter(pk=jobs[0]).update(fireant_jobid=-1)
+    report = Report.objects.get()
+    job = Job.objects.create(id=jobs[0], report=report, fireant_jobid=400)
+    Job.objects.filter(pk=job.pk).update(created=timezone.now() - timedelta(days=400))
+
+    assert archive_old_jobs(older_than_days=180)["archived"] == 1
+    assert not Job.objects.filter(pk=jobs[0]).exists()
+    assert ArchivedJob.objects.get(pk=jobs[0]).fireant_jobid == 400
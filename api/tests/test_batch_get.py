@@ -0,0 +1,71 @@
+import pytest
+from django.db import connections
+from django.urls import reverse
+
+from api.models import ArchivedJob, Job, Report, ReportModifier, RingEvent
+from api.services.archive import archive_old_jobs
+from api.services.events import bulk_create_events
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def ids(response):
+    return [row["id"] for row in response.json()["data"]]
+
+
+def names(response):
+    return [row["name"] for row in response.json()["data"]]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_ids_keep_request_order_and_report_missing(api_client, django_assert_num_queries):
+    a, b, c = (
+        Report.objects.create(name=name, peril="Flood", loss_perspective="Gross") for name in "abc"
+    )
+    url = reverse("api:report-list")
+
+    # One count/max query for the ETag, one IN query, one per prefetch.
+    with django_assert_num_queries(4, connection=connections["api_db"]):
+        response = api_client.get(url, {"ids": f"{c.pk},{a.pk},999,{c.pk}"})
+    assert names(response) == ["c", "a"]
+    assert response.json()["meta"] == {"requested": 3, "count": 2, "missing": [999]}
+    assert api_client.get(url, {"ids": f"{c.pk},{a.pk},999,{c.pk}"},
+                          HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+    batch = api_client.post(url + "batch-get/", {"ids": [b.pk, a.pk]}, format="json")
+    assert names(batch) == ["b", "a"] and batch.json()["meta"]["missing"] == []
+
+    assert api_client.get(url, {"ids": "1,x"}).status_code == 400
+    assert api_client.post(url + "batch-get/", {"ids": "1"}, format="json").status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_every_resource_supports_batch_get(api_client, settings):
+    modifier = ReportModifier.objects.create()
+    (ring,) = bulk_create_events(
+        [RingEvent(name="r", description="", zone="z", latitude=0, longitude=0, radius=1)]
+    )
+    for name, pk in (("report-modifier", modifier.pk), ("event", ring.pk), ("ring-event", ring.pk)):
+        url = reverse(f"api:{name}-list")
+        assert ids(api_client.get(url, {"ids": str(pk)})) == [pk]
+        assert ids(api_client.post(url + "batch-get/", {"ids": [pk]}, format="json")) == [pk]
+    # Events are still read-only.
+    assert api_client.post(reverse("api:event-list"), {}, format="json").status_code == 405
+
+    settings.BATCH_GET_MAX_IDS = 2
+    assert api_client.get(reverse("api:event-list"), {"ids": "1,2,3"}).status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_jobs_include_archived(api_client):
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+    old = Job.objects.create(report=report, fireant_jobid=1)
+    archive_old_jobs(older_than_days=-1)
+    live = Job.objects.create(report=report, fireant_jobid=2)
+    assert ArchivedJob.objects.filter(pk=old.pk).exists()
+    url = reverse("api:job-list")
+
+    response = api_client.get(url, {"ids": f"{old.pk},{live.pk}"})
+    assert ids(response) == [live.pk] and response.json()["meta"]["missing"] == [old.pk]
+    response = api_client.get(url, {"ids": f"{old.pk},{live.pk}", "include_archived": "true"})
+    assert ids(response) == [old.pk, live.pk]
@@ -0,0 +1,74 @@
+import io
+
+import numpy as np
+import pytest
+
+from api.services.breakout import CsvSink, array_chunks, csv_chunks, trim_breakout
+from api.services.results import JobResults, ingest_job_results
+
+
+def breakout(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(0, 300, rows),
+        rng.integers(0, 800, rows),
+        rng.lognormal(3, 1.5, rows),
+    )
+
+
+def expected_mask(event_ids, location_ids, losses, max_events, max_locations):
+    def top(ids, n):
+        totals = {}
+        for key, loss in zip(ids.tolist(), losses.tolist()):
+            totals[key] = totals.get(key, 0.0) + loss
+        return set(sorted(totals, key=lambda key: (-totals[key], key))[:n])
+
+    events, locations = top(event_ids, max_events), top(location_ids, max_locations)
+    return np.array([e in events and l in locations for e, l in zip(event_ids.tolist(), location_ids.tolist())])
+
+
+# Large ids take the sorted path instead of the arrays indexed by id.
+@pytest.mark.parametrize("offset", [0, 10**12])
+def test_trim_breakout_matches_full_sort_in_small_chunks(offset):
+    event_ids, location_ids, losses = breakout()
+    location_ids[2500::2] += offset  # switches part way through
+    columns = event_ids, location_ids, losses
+    kept = []
+    stats = trim_breakout(
+        array_chunks(*columns, chunk_rows=317), lambda *chunk: kept.append(chunk), 50, 200
+    )
+    mask = expected_mask(*columns, 50, 200)
+    kept = [np.concatenate(column) for column in zip(*kept)]
+
+    assert stats["rows"] == 5000 and stats["rows_kept"] == mask.sum()
+    assert stats["events_kept"] == 50 and stats["locations_kept"] == 200
+    for got, column in zip(kept, columns):
+        assert np.array_equal(got, column[mask])
+
+
+def test_csv_round_trip(tmp_path):
+    columns = breakout(1000)
+    source = tmp_path / "breakout.csv"
+    with open(source, "w") as f:
+        CsvSink(f)(*columns)
+    output = io.StringIO()
+    stats = trim_breakout(csv_chunks(source, chunk_rows=100), CsvSink(output), 10, 1000)
+
+    lines = output.getvalue().splitlines()
+    assert lines[0] == "event_id,location_id,loss"
+    assert len(lines) - 1 == stats["rows_kept"] == expected_mask(*columns, 10, 1000).sum()
+
+
+def test_ingest_applies_caps(settings, tmp_path):
+    settings.JOB_RESULTS_DIR = tmp_path
+    event_ids, location_ids, losses = breakout()
+    buffer = io.BytesIO()
+    np.savez(buffer, event_id=event_ids, location_id=location_ids, loss=losses)
+    buffer.seek(0)
+
+    meta = ingest_job_results(1, buffer, "results.npz", caps=(20, 100))
+    assert meta["events"] == 300
+    assert meta["breakout"]["events_kept"] == 20
+    assert meta["locations"] == expected_mask(event_ids, location_ids, losses, 20, 100).sum()
+    top = JobResults(1).top(meta["locations"] + 1, "location")
+    assert len({row["event_id"] for row in top}) <= 20
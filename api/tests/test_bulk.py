@@ -0,0 +1,109 @@
+import pytest
+from django.db import connections
+from django.urls import reverse
+
+from api.models import Change, EventGroup, Job, Report, RingEvent
+from api.services.events import bulk_create_events
+from api.services.hashing import rebuild_content_hashes
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def post(client, name, action, body):
+    return client.post(reverse(f"api:{name}-list") + f"{action}/", body, format="json")
+
+
+def rings(count, zone="EU"):
+    return bulk_create_events(
+        RingEvent(name=f"ring {i}", description="", zone=zone, latitude=i, longitude=0, radius=1)
+        for i in range(count)
+    )
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_bulk_update_reports(api_client, django_assert_max_num_queries):
+    group = EventGroup.objects.create(name="g")
+    for i in range(30):
+        Report.objects.create(name=f"r{i}", peril="Flood" if i % 2 else "Wind",
+                              loss_perspective="Gross")
+    before = dict(Report.objects.values_list("id", "config_hash"))
+    seq = Change.objects.order_by("-seq").values_list("seq", flat=True).first()
+
+    with django_assert_max_num_queries(8, connection=connections["api_db"]):
+        response = post(api_client, "report", "bulk-update",
+                        {"filter": {"peril": "Flood"}, "patch": {"is_valid": False}})
+    assert response.json()["data"] == {"matched": 15, "updated": 15}
+    assert Report.objects.filter(is_valid=False).count() == 15
+    # is_valid is not a job input.
+    assert dict(Report.objects.values_list("id", "config_hash")) == before
+    assert Change.objects.filter(seq__gt=seq, resource="report", action="update").count() == 15
+
+    ids = list(Report.objects.filter(peril="Wind").values_list("id", flat=True)[:3])
+    response = post(api_client, "report", "bulk-update",
+                    {"ids": ids, "patch": {"event_group": group.pk, "ncores": 8}})
+    assert response.json()["data"]["updated"] == 3
+    assert rebuild_content_hashes() == {"events": 0, "event_groups": 0, "reports": 0}
+
+    assert post(api_client, "report", "bulk-update",
+                {"ids": ids, "patch": {"dr": 99}}).status_code == 400
+    assert post(api_client, "report", "bulk-update",
+                {"ids": ids, "patch": {"name": "x"}}).status_code == 400
+    assert post(api_client, "report", "bulk-update",
+                {"filter": {"perl": "Flood"}, "patch": {"ncores": 2}}).status_code == 400
+    assert post(api_client, "report", "bulk-update", {"patch": {"ncores": 2}}).status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_bulk_delete_reports_and_jobs(api_client):
+    reports = [Report.objects.create(name=f"r{i}", peril="Flood", loss_perspective="Gross")
+               for i in range(3)]
+    job = Job.objects.create(report=reports[0], fireant_jobid=1)
+    response = post(api_client, "report", "bulk-delete", {"ids": [r.pk for r in reports[:2]]})
+    assert response.json()["data"] == {"matched": 2, "deleted": {"api.Job": 1, "api.Report": 2}}
+    assert list(Report.objects.values_list("pk", flat=True)) == [reports[2].pk]
+    assert Change.objects.filter(resource="job", object_id=job.pk, action="delete").count() == 1
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_bulk_delete_events_keeps_groups_consistent(api_client):
+    eu, us = rings(4, "EU"), rings(2, "US")
+    group = EventGroup.objects.create(name="g")
+    group.events.add(eu[0], us[0])
+
+    assert post(api_client, "ring-event", "bulk-update",
+                {"filter": {"zone": "US"}, "patch": {"is_valid": False}}).json()["data"]["updated"] == 2
+    assert post(api_client, "ring-event", "bulk-update",
+                {"filter": {"zone": "US"}, "patch": {"radius": 3}}).status_code == 400
+
+    response = post(api_client, "ring-event", "bulk-delete", {"filter": {"zone": "EU"}})
+    assert response.json()["data"]["deleted"] == {
+        "api.EventGroup_events": 1, "api.RingEvent": 4, "api.Event": 4,
+    }
+    assert RingEvent.objects.count() == 2
+    assert list(group.events.values_list("pk", flat=True)) == [us[0].pk]
+    assert rebuild_content_hashes() == {"events": 0, "event_groups": 0, "reports": 0}
+    # The FTS and R*Tree triggers followed the deletes.
+    search = api_client.get(reverse("api:event-list"), {"search": "ring"}).json()
+    assert len(search["data"]) == 2
+    with connections["api_db"].cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM event_rtree")
+        assert cursor.fetchone()[0] == 2
+    assert Change.objects.filter(resource="event-group", object_id=group.pk, action="remove").get().data == {
+        "field": "events", "ids": [eu[0].pk]
+    }
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_restricted_delete_is_a_conflict(api_client, monkeypatch):
+    from django.db.models import RestrictedError
+
+    from api.services import bulk
+
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+
+    def restricted(queryset):
+        raise RestrictedError("Cannot delete.", {report})
+
+    monkeypatch.setattr(bulk, "bulk_delete", restricted)
+    response = post(api_client, "report", "bulk-delete", {"ids": [report.pk]})
+    assert response.status_code == 409
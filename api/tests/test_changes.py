@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from api.models import Change, EventGroup, Job, Report, ReportModifier, RingEvent
+from api.services.archive import archive_old_jobs
+from api.services.changes import changes_suppressed, prune_changes
+from api.services.events import bulk_create_events
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def feed(since=0):
+    return [
+        (c.resource, c.object_id, c.action, c.data)
+        for c in Change.objects.filter(seq__gt=since).order_by("seq")
+    ]
+
+
+def latest():
+    return Change.objects.order_by("-seq").values_list("seq", flat=True).first() or 0
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_writes_are_recorded():
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+    modifier = ReportModifier.objects.create()
+    mark = latest()
+    modifier.reports.add(report)
+    report.modifiers.remove(modifier)
+    assert feed(mark) == [
+        ("report", report.pk, "update", None),
+        ("report-modifier", modifier.pk, "add", {"field": "reports", "ids": [report.pk]}),
+        ("report", report.pk, "update", None),
+        ("report-modifier", modifier.pk, "remove", {"field": "reports", "ids": [report.pk]}),
+    ]
+
+    a, b = bulk_create_events(
+        RingEvent(name=n, description="", zone="z", latitude=0, longitude=0, radius=1) for n in "ab"
+    )
+    assert feed(mark)[-2:] == [
+        ("event", a.pk, "create", {"type": "ring"}),
+        ("event", b.pk, "create", {"type": "ring"}),
+    ]
+    group = EventGroup.objects.create(name="g")
+    mark = latest()
+    group.events.add(a, b)
+    b.event_groups.clear()
+    a_id = a.pk
+    a.delete()
+    changes = feed(mark)
+    assert ("event-group", group.pk, "add", {"field": "events", "ids": [a_id, b.pk]}) in changes
+    assert ("event-group", group.pk, "remove", {"field": "events", "ids": [b.pk]}) in changes
+    assert [c for c in changes if c[2] == "delete"] == [("event", a_id, "delete", None)]
+
+    mark = latest()
+    with changes_suppressed():
+        RingEvent.objects.filter(pk=b.pk).update(name="quiet")
+        EventGroup.objects.create(name="quiet")
+    assert feed(mark) == []
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_archived_jobs_are_recorded_once():
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+    job = Job.objects.create(report=report, fireant_jobid=1)
+    mark = latest()
+    archive_old_jobs(older_than_days=-1)
+    assert feed(mark) == [("job", job.pk, "archive", None)]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_feed_endpoint(api_client):
+    url = reverse("api:change-list")
+    for name in "abc":
+        Report.objects.create(name=name, peril="Flood", loss_perspective="Gross")
+
+    first = api_client.get(url, {"limit": 2}).json()
+    assert first["meta"]["has_more"] and first["meta"]["count"] == 2
+    rest = api_client.get(url, {"since": first["meta"]["next"]}).json()
+    assert not rest["meta"]["has_more"]
+    assert [c["seq"] for c in first["data"] + rest["data"]] == list(
+        Change.objects.order_by("seq").values_list("seq", flat=True)
+    )
+    assert rest["data"][-1]["resource"] == "report"
+    assert api_client.get(url, {"resources": "job"}).json()["data"] == []
+    assert api_client.get(url, {"resources": "nope"}).status_code == 400
+
+    Change.objects.update(created="2000-01-01T00:00:00Z")
+    assert prune_changes(older_than_days=1)["deleted"] == 3
+    # The pruned changes are missed from 0, but not from the last one.
+    assert api_client.get(url).json()["meta"]["resync"] is True
+    assert api_client.get(url, {"since": rest["meta"]["next"]}).json()["meta"]["resync"] is False
+    Report.objects.create(name="d", peril="Flood", loss_perspective="Gross")
+    Change.objects.update(created="2000-01-01T00:00:00Z")
+    prune_changes(older_than_days=1)
+    Report.objects.create(name="e", peril="Flood", loss_perspective="Gross")
+    assert api_client.get(url, {"since": rest["meta"]["next"]}).json()["meta"]["resync"] is True
+
+    # Everything pruned: seqs are not reused, so a mirror behind still resyncs.
+    latest_seq = latest()
+    Change.objects.update(created="2000-01-01T00:00:00Z")
+    prune_changes(older_than_days=1)
+    assert not Change.objects.exists()
+    meta = api_client.get(url, {"since": rest["meta"]["next"]}).json()["meta"]
+    assert meta["resync"] is True and meta["latest"] == latest_seq
+    meta = api_client.get(url, {"since": latest_seq}).json()["meta"]
+    assert meta["resync"] is False and meta["next"] == latest_seq
+
+
+@pytest.mark.django_db(transaction=True, databases=DATABASES)
+def test_long_poll_returns_on_change(api_client, settings):
+    settings.CHANGE_FEED_MAX_WAIT = 5
+    url = reverse("api:change-list")
+    since = latest()
+    timer = threading.Timer(
+        0.3, lambda: Report.objects.create(name="late", peril="Flood", loss_perspective="Gross")
+    )
+    timer.start()
+    response = api_client.get(url, {"since": since, "wait": 5}).json()
+    timer.join()
+    assert [c["resource"] for c in response["data"]] == ["report"]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_wait_is_ignored_unless_enabled(api_client, settings):
+    settings.CHANGE_FEED_MAX_WAIT = 0
+    started = time.monotonic()
+    response = api_client.get(reverse("api:change-list"), {"since": latest(), "wait": 5})
+    assert response.json()["data"] == []
+    assert time.monotonic() - started < 1
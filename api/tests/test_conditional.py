@@ -0,0 +1,74 @@
+import pytest
+from django.db import connections
+from django.urls import reverse
+from django.utils.http import http_date
+
+from api.models import EventGroup, Job, Report, ReportModifier, RingEvent
+from api.services.events import bulk_create_events
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def revalidate(client, url, response, **params):
+    return client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"]).status_code
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_report_detail_and_list(api_client, django_assert_num_queries):
+    report = Report.objects.create(name="a", peril="Flood", loss_perspective="Gross")
+    Report.objects.create(name="b", peril="Wind", loss_perspective="Gross")
+    detail = reverse("api:report-detail", args=[report.pk])
+    listing = reverse("api:report-list")
+
+    response = api_client.get(detail)
+    assert response["Last-Modified"] == http_date(report.updated.timestamp())
+    with django_assert_num_queries(1, connection=connections["api_db"]):
+        assert revalidate(api_client, detail, response) == 304
+    since = api_client.get(detail, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert since.status_code == 304
+
+    page = api_client.get(listing, {"peril": "Flood"})
+    with django_assert_num_queries(1, connection=connections["api_db"]):
+        assert revalidate(api_client, listing, page, peril="Flood") == 304
+    assert revalidate(api_client, listing, page, peril="Wind") == 200
+
+    # Linking a modifier changes the report's representation.
+    ReportModifier.objects.create().reports.add(report)
+    assert revalidate(api_client, detail, response) == 200
+    assert revalidate(api_client, listing, page, peril="Flood") == 200
+
+    page = api_client.get(listing, {"peril": "Flood"})
+    Report.objects.filter(pk=report.pk).delete()
+    assert revalidate(api_client, listing, page, peril="Flood") == 200
+    assert api_client.get(detail, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 404
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_event_group_follows_member_edits(api_client):
+    (event,) = bulk_create_events(
+        [RingEvent(name="r", description="", zone="z", latitude=0, longitude=0, radius=1)]
+    )
+    group = EventGroup.objects.create(name="g")
+    group.events.add(event)
+    detail = reverse("api:event-group-detail", args=[group.pk])
+    event_detail = reverse("api:ring-event-detail", args=[event.pk])
+    response = api_client.get(detail)
+    event_response = api_client.get(event_detail)
+    assert revalidate(api_client, detail, response) == 304
+
+    event.name = "renamed"
+    event.save()
+    assert revalidate(api_client, detail, response) == 200
+    assert revalidate(api_client, event_detail, event_response) == 200
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_jobs_with_archive(api_client):
+    report = Report.objects.create(name="a", peril="Flood", loss_perspective="Gross")
+    Job.objects.create(report=report, fireant_jobid=1)
+    url = reverse("api:job-list")
+    response = api_client.get(url, {"include_archived": 1})
+    assert response.status_code == 200
+    assert revalidate(api_client, url, response, include_archived=1) == 304
+    Job.objects.create(report=report, fireant_jobid=2)
+    assert revalidate(api_client, url, response, include_archived=1) == 200
@@ -0,0 +1,122 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Counter, EventGroup, Job, Report, ReportModifier, RingEvent
+from api.services import bulk
+from api.services.counters import counter, counter_values, rebuild_counters, table_rows
+
+DATABASES = ["default", "api_db"]
+
+
+def stored():
+    return {(c.name, c.key): c.value for c in Counter.objects.all()}
+
+
+def assert_consistent():
+    """The trigger-kept counters equal freshly computed ones."""
+    before = stored()
+    assert rebuild_counters()["corrected"] == 0
+    assert stored() == before
+
+
+def ring(name):
+    return RingEvent.objects.create(name=name, description="", zone="", latitude=1, longitude=1, radius=1)
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_triggers_keep_counters_current():
+    group = EventGroup.objects.create(name="g")
+    a = Report.objects.create(name="a", peril="Flood", loss_perspective="Gross", event_group=group)
+    b = Report.objects.create(name="b", peril="Wind", loss_perspective="Gross", is_valid=False)
+    modifiers = ReportModifier.objects.bulk_create(ReportModifier() for _ in range(3))
+    modifiers[0].reports.add(a, b)
+    a.modifiers.add(modifiers[1])
+    Job.objects.create(report=a, report_modifier=modifiers[0], fireant_jobid=1)
+    events = [ring("e1"), ring("e2")]
+    group.events.add(*events)
+
+    assert table_rows(Report) == 2
+    assert counter("valid_reports") == 1
+    assert counter_values("peril_reports") == {"Flood": 1, "Wind": 1}
+    assert counter("group_reports", group.id) == 1
+    assert counter("report_modifiers", a.id) == 2
+    assert counter("modifier_reports", modifiers[0].id) == 2
+    assert counter("linked_reports") == 2
+    assert counter("linked_modifiers") == 2
+    assert counter("report_jobs", a.id) == 1
+    assert counter("group_events", group.id) == 2
+    assert counter("event_groups", events[0].id) == 1
+    assert table_rows(RingEvent) == 2
+    assert_consistent()
+
+    b.is_valid = True
+    b.peril = "Flood"
+    b.save()
+    assert counter("valid_reports") == 2
+    assert counter_values("peril_reports") == {"Flood": 2}
+
+    modifiers[0].reports.remove(b)
+    assert counter("linked_reports") == 1
+    a.delete()
+    assert counter("linked_reports") == 0
+    assert counter("linked_modifiers") == 0
+    assert counter("report_jobs", a.id) == 0
+    assert not Counter.objects.filter(value=0).exists()
+    assert_consistent()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_bulk_paths_are_counted():
+    reports = Report.objects.bulk_create(
+        Report(name=f"r{i}", peril="Flood", loss_perspective="Gross") for i in range(10)
+    )
+    bulk.bulk_update(Report.objects.filter(pk__in=[r.pk for r in reports[:4]]), {"is_valid": False})
+    assert counter("valid_reports") == 6
+    events = [ring(f"e{i}") for i in range(3)]
+    bulk.bulk_delete(RingEvent.objects.filter(pk=events[0].pk))
+    assert table_rows(RingEvent) == 2
+    bulk.bulk_delete(Report.objects.filter(pk__in=[r.pk for r in reports[:5]]))
+    assert table_rows(Report) == 5
+    assert_consistent()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rebuild_repairs_drift():
+    Report.objects.create(name="a", peril="Flood", loss_perspective="Gross")
+    Counter.objects.filter(name="rows", key="reports").update(value=7)
+    Counter.objects.create(name="report_jobs", key="999", value=3)
+
+    assert rebuild_counters()["corrected"] == 2
+    assert table_rows(Report) == 1
+    assert counter("report_jobs", 999) == 0
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_summaries_read_counters(api_client):
+    reports = Report.objects.bulk_create(
+        Report(name=f"r{i}", peril=peril, loss_perspective="Gross", is_valid=i % 2 == 0)
+        for i, peril in enumerate(["Flood", "Wind", "Flood"])
+    )
+    modifier = ReportModifier.objects.create()
+    modifier.reports.add(reports[0])
+
+    with CaptureQueriesContext(connections["api_db"]) as queries:
+        data = api_client.get(reverse("api:report-summary")).data["data"]
+    assert data["total_reports"] == 3
+    assert data["valid_reports"] == 2
+    assert data["unique_perils"] == ["Flood", "Wind"]
+    assert not any("COUNT(" in q["sql"].upper() for q in queries.captured_queries)
+
+    # Filtered summaries still count.
+    data = api_client.get(reverse("api:report-summary"), {"peril": "Wind"}).data["data"]
+    assert data["total_reports"] == 1
+
+    data = api_client.get(reverse("api:link-modifier-summary")).data["data"]
+    assert data["reports_with_modifiers"] == 1
+    assert data["reports_without_modifiers"] == 2
+    assert data["modifiers_with_reports"] == 1
+
+    response = api_client.get(reverse("api:report-modifier-reports", args=[modifier.id]))
+    assert response.data["meta"]["reports_count"] == 1
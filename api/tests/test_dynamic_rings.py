@@ -0,0 +1,88 @@
+import io
+
+import numpy as np
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from api.models import EventGroup, Report, RingEvent
+from api.services.dynamic_rings import generate_dynamic_rings, read_location_losses
+
+DATABASES = ["default", "api_db"]
+
+
+def hotspots():
+    """Two heavy hotspots 30 km apart, one lighter one far away, and noise."""
+    rng = np.random.default_rng(3)
+    lat = np.concatenate([np.full(100, 51.5), np.full(100, 51.77), np.full(50, 40.0), rng.uniform(30, 60, 500)])
+    lon = np.concatenate([np.full(100, -0.1), np.full(100, -0.1), np.full(50, -3.7), rng.uniform(-20, 30, 500)])
+    loss = np.concatenate([np.full(100, 2e5), np.full(100, 1e5), np.full(50, 1.2e5), np.full(500, 10.0)])
+    return lat, lon, loss
+
+
+def test_generate_dynamic_rings_thresholds_and_avoids_overlaps():
+    rings = generate_dynamic_rings(
+        *hotspots(), threshold=5e6, blast_radius=50, no_overlap_radius=50, grid_km=5
+    )
+    # Both London hotspots are within 50 km of each other; only the heavier
+    # combined ring survives, then Madrid.
+    assert len(rings.losses) == 2
+    assert rings.losses[0] == pytest.approx(3e7, rel=1e-3)
+    # Any centre within the blast radius of Madrid holds all of its loss.
+    assert rings.latitudes[1] == pytest.approx(40.0, abs=0.45)
+    assert rings.losses[1] == pytest.approx(6e6, rel=1e-3)
+
+    spaced = generate_dynamic_rings(
+        *hotspots(), threshold=5e6, blast_radius=20, no_overlap_radius=20, grid_km=5
+    )
+    assert len(spaced.losses) == 3
+    assert sorted(spaced.losses) == pytest.approx([6e6, 1e7, 2e7], rel=1e-3)
+
+
+def test_read_location_losses_csv_and_npz():
+    lat, lon, loss = hotspots()
+    csv = "lon,lat,loss\n" + "\n".join(f"{b},{a},{c}" for a, b, c in zip(lat, lon, loss))
+    columns = read_location_losses(io.BytesIO(csv.encode()), "losses.csv")
+    assert np.allclose(columns[0], lat) and np.allclose(columns[2], loss)
+
+    buffer = io.BytesIO()
+    np.savez(buffer, latitude=lat, longitude=lon, loss=loss)
+    buffer.seek(0)
+    assert np.allclose(read_location_losses(buffer, "losses.npz")[1], lon)
+
+    with pytest.raises(ValueError):
+        read_location_losses(io.BytesIO(b"lat,lon\n1,2\n"), "losses.csv")
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_dynamic_rings_endpoint(api_client):
+    report = Report.objects.create(
+        name="r",
+        peril="Flood",
+        loss_perspective="Gross",
+        dynamic_ring_loss_threshold=5_000_000,
+        blast_radius=50,
+        no_overlap_radius=50,
+    )
+    lat, lon, loss = hotspots()
+    csv = "latitude,longitude,loss\n" + "\n".join(f"{a},{b},{c}" for a, b, c in zip(lat, lon, loss))
+    url = reverse("api:report-dynamic-rings", args=[report.pk])
+
+    def post(**data):
+        upload = SimpleUploadedFile("losses.csv", csv.encode(), content_type="text/csv")
+        return api_client.post(url, {"file": upload, **data}, format="multipart")
+
+    response = post(dry_run="true")
+    assert response.status_code == 200
+    assert response.json()["meta"]["rings"] == 2
+    assert not EventGroup.objects.exists()
+
+    response = post(assign="true", name="dynamic")
+    assert response.status_code == 201
+    group = EventGroup.objects.get(name="dynamic")
+    assert RingEvent.objects.filter(event_groups=group).count() == 2
+    report.refresh_from_db()
+    assert report.event_group_id == group.id
+
+    assert post(blast_radius="x").status_code == 400
+    assert api_client.post(url, {}, format="multipart").status_code == 400
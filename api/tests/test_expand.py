@@ -0,0 +1,87 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import BoxEvent, EventGroup, Job, Report, ReportModifier, RingEvent
+from api.services.events import bulk_create_events
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def make_reports(count):
+    events = bulk_create_events(
+        RingEvent(name=f"r{i}", description="", zone="z", latitude=i, longitude=0, radius=1)
+        for i in range(3)
+    )
+    modifier = ReportModifier.objects.create()
+    reports = []
+    for i in range(count):
+        group = EventGroup.objects.create(name=f"g{i}")
+        group.events.add(*events)
+        report = Report.objects.create(
+            name=f"report {i}", peril="Flood", loss_perspective="Gross", event_group=group
+        )
+        modifier.reports.add(report)
+        Job.objects.create(report=report, report_modifier=modifier, fireant_jobid=i)
+        reports.append(report)
+    return reports, modifier
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_report_detail_expands_related_resources(api_client):
+    (report,), modifier = make_reports(1)
+    response = api_client.get(
+        reverse("api:report-detail", args=[report.pk]),
+        {"expand": "event_group.events,modifiers,jobs"},
+    )
+    data = response.json()
+    assert "ETag" not in response
+    assert data["event_group"]["name"] == "g0"
+    assert [e["name"] for e in data["event_group"]["events"]] == ["r0", "r1", "r2"]
+    assert data["event_group"]["events"][0]["radius"] == 1.0
+    assert [m["id"] for m in data["modifiers"]] == [modifier.pk]
+    assert [j["id"] for j in data["jobs"]] == list(report.jobs.values_list("id", flat=True))
+
+    plain = api_client.get(reverse("api:report-detail", args=[report.pk])).json()
+    assert plain["event_group"] == report.event_group_id and "jobs" not in plain
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_expanded_list_queries_do_not_grow_with_rows(api_client):
+    url = reverse("api:report-list")
+    params = {"expand": "event_group.events,modifiers.jobs,jobs"}
+    make_reports(2)
+    with CaptureQueriesContext(connections["api_db"]) as few:
+        assert len(api_client.get(url, params).json()["data"]) == 2
+    make_reports(5)
+    with CaptureQueriesContext(connections["api_db"]) as many:
+        assert len(api_client.get(url, params).json()["data"]) == 7
+    # Count, page with the event group joined, and one query per prefetched relation.
+    assert len(many) == len(few) == 6
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_event_group_and_modifier_expansions(api_client):
+    (report,), modifier = make_reports(1)
+    box = BoxEvent.objects.create(name="b", description="", zone="z",
+                                  min_lat=0, max_lat=1, min_lon=0, max_lon=1)
+    group = EventGroup.objects.create(name="boxes")
+    group.events.add(box)
+
+    data = api_client.get(
+        reverse("api:event-group-detail", args=[group.pk]), {"expand": "events,reports"}
+    ).json()
+    assert data["events"][0]["max_lat"] == 1.0 and data["reports"] == []
+
+    data = api_client.get(
+        reverse("api:report-modifier-detail", args=[modifier.pk]),
+        {"expand": "reports.event_group,jobs"},
+    ).json()
+    assert [r["name"] for r in data["reports"]] == ["report 0"]
+    assert data["reports"][0]["event_group"]["name"] == "g0"
+    assert len(data["jobs"]) == 1
+
+    url = reverse("api:report-list")
+    assert api_client.get(url, {"expand": "event_group.nope"}).status_code == 400
+    assert api_client.get(reverse("api:job-list"), {"expand": "report"}).status_code == 400
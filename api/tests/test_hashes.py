@@ -0,0 +1,115 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import BoxEvent, Event, EventGroup, Report, RingEvent
+from api.services.events import bulk_create_events
+from api.services.hashing import hex_hash, rebuild_content_hashes
+
+DATABASES = ["default", "api_db"]
+
+
+def ring(name, lat, lon, radius=10):
+    return RingEvent(name=name, description="", zone="z", latitude=lat, longitude=lon, radius=radius)
+
+
+def group_hash(group):
+    return EventGroup.objects.get(pk=group.pk).content_hash
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_group_hash_follows_membership_and_geometry():
+    a, b, c = bulk_create_events([ring("a", 1, 1), ring("b", 2, 2), ring("c", 3, 3)])
+    first = EventGroup.objects.create(name="first")
+    second = EventGroup.objects.create(name="second")
+    empty = group_hash(first)
+
+    first.events.add(a, b)
+    assert EventGroup.objects.get(pk=first.pk).updated > first.updated
+    # Same geometry, other events and order.
+    twin_a, twin_b = bulk_create_events([ring("b2", 2, 2), ring("a2", 1, 1)])
+    second.events.add(twin_a)
+    twin_b.event_groups.add(second)
+    assert group_hash(first) == group_hash(second) != empty
+
+    before = group_hash(first)
+    first.events.add(c)
+    first.events.remove(c, twin_a)  # twin_a is not a member
+    assert group_hash(first) == before
+
+    # Names are not geometry; the centre is.
+    a.name = "renamed"
+    a.save()
+    assert group_hash(first) == before
+    a.latitude = 1.5
+    a.save()
+    moved = group_hash(first)
+    assert moved != before
+
+    RingEvent.objects.get(pk=b.pk).delete()
+    Event.objects.get(pk=twin_b.pk).delete()
+    second.events.clear()
+    second.events.add(Event.objects.get(pk=a.pk))
+    assert group_hash(first) == group_hash(second) != empty
+
+    first.events.clear()
+    assert group_hash(first) == empty
+    assert rebuild_content_hashes() == {"events": 0, "event_groups": 0, "reports": 0}
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_report_config_hash_and_etag():
+    events = bulk_create_events([ring("a", 1, 1)])
+    group = EventGroup.objects.create(name="g")
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross", event_group=group)
+    initial = report.config_hash
+
+    report.name, report.priority = "renamed", "Low"
+    report.save()
+    assert report.config_hash == initial
+    group.events.add(*events)
+    report.refresh_from_db()
+    assert report.config_hash != initial
+
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="tester"))
+    url = reverse("api:report-detail", args=[report.pk])
+    response = client.get(url)
+    etag = response["ETag"]
+    assert response.json()["config_hash"] == hex_hash(report.config_hash)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # The name is not in the config hash, but it is in the response.
+    report.name = "renamed again"
+    report.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    etag = response["ETag"]
+
+    report.blast_radius = 75
+    report.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    group_url = reverse("api:event-group-detail", args=[group.pk])
+    response = client.get(group_url)
+    assert response.json()["content_hash"] == hex_hash(group_hash(group))
+    assert client.get(group_url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_geometry_hash_follows_saves_with_update_fields():
+    (event,) = bulk_create_events([ring("a", 1, 1)])
+    group = EventGroup.objects.create(name="g")
+    group.events.add(event)
+    before = group_hash(group)
+
+    event.name = "renamed"
+    event.save(update_fields=["name"])
+    assert group_hash(group) == before
+    event.radius = 20
+    event.save(update_fields=["radius"])
+    stored = RingEvent.objects.get(pk=event.pk).geometry_hash
+    assert stored == event.geometry_hash
+    assert group_hash(group) == stored != before
@@ -0,0 +1,72 @@
+import json
+from datetime import date
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Report, ReportModifier
+from api.services.links import runs
+from api.views.link import matrix_pairs, matrix_runs
+
+DATABASES = ["default", "api_db"]
+
+
+def matrix(client, **params):
+    response = client.get(reverse("api:link-modifier-matrix"), params)
+    assert response.status_code == 200
+    return json.loads(b"".join(response.streaming_content))
+
+
+def test_runs():
+    assert runs([]) == []
+    assert runs([1, 2, 3, 7, 9, 10]) == [[1, 3], [7, 1], [9, 2]]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_matrix_streams_all_links_in_one_query(api_client):
+    flood = Report.objects.create(name="f", peril="Flood", loss_perspective="Gross")
+    wind = Report.objects.create(name="w", peril="Wind", loss_perspective="Gross")
+    Report.objects.create(name="unlinked", peril="Wind", loss_perspective="Gross")
+    modifiers = [
+        ReportModifier.objects.create(as_at_date=date(2026, month, 1)) for month in range(1, 6)
+    ]
+    for modifier in modifiers[:3] + modifiers[4:]:
+        modifier.reports.add(flood)
+    modifiers[1].reports.add(wind)
+    ids = [m.pk for m in modifiers]
+
+    with CaptureQueriesContext(connections["api_db"]) as queries:
+        body = matrix(api_client)
+    assert len(queries) == 1
+    assert body["data"] == [[flood.pk, i] for i in ids[:3] + ids[4:]] + [[wind.pk, ids[1]]]
+    assert body["summary"] == {"reports": 2, "links": 5}
+
+    body = matrix(api_client, encoding="runs")
+    assert body["data"] == [[flood.pk, [[ids[0], 3], [ids[4], 1]]], [wind.pk, [[ids[1], 1]]]]
+    assert body["summary"] == {"reports": 2, "links": 5}
+
+    body = matrix(api_client, peril="Wind")
+    assert body["data"] == [[wind.pk, ids[1]]]
+    body = matrix(api_client, as_at_from="2026-02-01", as_at_to="2026-03-31")
+    assert body["data"] == [[flood.pk, ids[1]], [flood.pk, ids[2]], [wind.pk, ids[1]]]
+    assert api_client.get(reverse("api:link-modifier-matrix"), {"encoding": "bits"}).status_code == 400
+
+    with connections["api_db"].cursor() as cursor:
+        cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT report_id, reportmodifier_id FROM _jt_report_modifiers_reports "
+            "ORDER BY report_id, reportmodifier_id"
+        )
+        plan = " ".join(str(row) for row in cursor.fetchall())
+    assert "TEMP B-TREE" not in plan
+
+
+def test_matrix_rows_count_reports_and_links():
+    pairs = [(1, 10), (1, 11), (1, 13), (2, 11)]
+    summary = {"reports": 0, "links": 0}
+    assert list(matrix_pairs(iter(pairs), summary)) == ["[1,10]", "[1,11]", "[1,13]", "[2,11]"]
+    assert summary == {"reports": 2, "links": 4}
+    summary = {"reports": 0, "links": 0}
+    assert list(matrix_runs(iter(pairs), summary)) == ["[1,[[10,2],[13,1]]]", "[2,[[11,1]]]"]
+    assert summary == {"reports": 2, "links": 4}
@@ -0,0 +1,146 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from api import tasks
+from api.models import Change, LinkTask, Report, ReportModifier
+from api.services.links import link_combinations
+
+DATABASES = ["default", "api_db"]
+
+
+def make_reports(count):
+    return Report.objects.bulk_create(
+        Report(name=f"r{i}", peril="Flood", loss_perspective="Gross") for i in range(count)
+    )
+
+
+def make_modifiers(count):
+    return ReportModifier.objects.bulk_create(ReportModifier() for _ in range(count))
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_link_combinations_in_chunks():
+    reports = make_reports(7)
+    modifiers = make_modifiers(2)
+    modifiers[0].reports.add(reports[0], reports[1])
+    seen = []
+
+    stats = link_combinations(
+        [r.id for r in reports], [m.id for m in modifiers], chunk_size=3,
+        progress=lambda stats: seen.append(dict(stats)),
+    )
+
+    assert stats == {"processed": 14, "linked": 12, "already_linked": 2}
+    # Three chunks of reports per modifier.
+    assert [s["processed"] for s in seen] == [3, 6, 7, 10, 13, 14]
+    for modifier in modifiers:
+        assert modifier.reports.count() == 7
+    # One membership change for the setup, then one per chunk.
+    assert Change.objects.filter(resource="report-modifier", action="add").count() == 7
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_multiple_links_synchronously_below_threshold(api_client):
+    reports = make_reports(3)
+    modifiers = make_modifiers(2)
+    reports[0].modifiers.add(modifiers[0])
+
+    response = api_client.post(
+        reverse("api:link-modifier-multiple"),
+        {"reports": [r.id for r in reports], "modifiers": [m.id for m in modifiers]},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response.data["meta"]["statistics"] == {
+        "total_combinations": 6,
+        "newly_linked": 5,
+        "already_linked": 1,
+    }
+    assert ReportModifier.reports.through.objects.count() == 6
+    assert not LinkTask.objects.exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_multiple_rejects_missing_ids(api_client):
+    reports = make_reports(1)
+    modifiers = make_modifiers(1)
+
+    response = api_client.post(
+        reverse("api:link-modifier-multiple"),
+        {"reports": [reports[0].id, 999], "modifiers": [modifiers[0].id]},
+        format="json",
+    )
+
+    assert response.status_code == 404
+    assert response.data["detail"] == "Not found: reports 999."
+    assert not ReportModifier.reports.through.objects.exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+@override_settings(LINK_ASYNC_THRESHOLD=10, LINK_CHUNK_SIZE=4)
+def test_multiple_above_threshold_runs_in_background(
+    api_client, monkeypatch, django_capture_on_commit_callbacks
+):
+    reports = make_reports(9)
+    modifiers = make_modifiers(3)
+    queued = []
+    monkeypatch.setattr(tasks.link_reports, "delay", queued.append)
+
+    with django_capture_on_commit_callbacks(using="api_db", execute=True):
+        response = api_client.post(
+            reverse("api:link-modifier-multiple"),
+            {"reports": [r.id for r in reports], "modifiers": [m.id for m in modifiers]},
+            format="json",
+        )
+
+    assert response.status_code == 202
+    task_id = response.data["data"]["id"]
+    assert queued == [task_id]
+    assert response["Location"].endswith(f"/api/link-modifier/tasks/{task_id}/")
+    assert response.data["data"]["status"] == "pending"
+    assert not ReportModifier.reports.through.objects.exists()
+
+    result = tasks.link_reports.apply(args=[task_id]).get()
+    assert result["linked"] == 27
+
+    url = reverse("api:link-modifier-task", kwargs={"task_id": task_id})
+    data = api_client.get(url).data["data"]
+    assert data["status"] == "success"
+    assert data["processed"] == data["total"] == 27
+    assert data["progress"] == 1.0
+    assert data["linked"] == 27
+    assert data["reports"] == 9 and data["modifiers"] == 3
+    assert data["finished"] is not None
+    assert ReportModifier.reports.through.objects.count() == 27
+
+    # A task runs once.
+    assert tasks.link_reports.apply(args=[task_id]).get()["status"] == "skipped"
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_task_not_found(api_client):
+    url = reverse("api:link-modifier-task", kwargs={"task_id": 999})
+    assert api_client.get(url).status_code == 404
+
+
+@pytest.mark.django_db(transaction=True, databases=DATABASES)
+@override_settings(LINK_ASYNC_THRESHOLD=1)
+def test_multiple_fails_when_the_task_cannot_be_queued(api_client, monkeypatch):
+    reports = make_reports(2)
+    modifiers = make_modifiers(1)
+
+    def broker_down(task_id):
+        raise ConnectionError("Connection refused")
+
+    monkeypatch.setattr(tasks.link_reports, "delay", broker_down)
+    response = api_client.post(
+        reverse("api:link-modifier-multiple"),
+        {"reports": [r.id for r in reports], "modifiers": [m.id for m in modifiers]},
+        format="json",
+    )
+    assert response.status_code == 503
+    task = LinkTask.objects.get()
+    assert task.status == LinkTask.FAILED
+    assert "Connection refused" in task.error and task.finished is not None
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+from django.db import connections
+from django.urls import reverse
+
+from api.models import Report, ReportModifier
+
+DATABASES = ["default", "api_db"]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_date_parts_are_filterable(api_client):
+    for as_at in (date(2026, 3, 31), date(2026, 7, 1), date(2026, 9, 30), date(2025, 9, 30)):
+        ReportModifier.objects.create(as_at_date=as_at)
+    undated = ReportModifier.objects.create()
+    modifier = ReportModifier.objects.get(as_at_date=date(2026, 9, 30))
+    assert (modifier.year, modifier.quarter, modifier.month, modifier.day) == (2026, 3, 9, 30)
+    assert ReportModifier.objects.get(pk=undated.pk).quarter is None
+
+    url = reverse("api:report-modifier-list")
+    rows = api_client.get(url, {"year": 2026, "quarter": 3}).json()["data"]
+    assert sorted(row["as_at_date"] for row in rows) == ["2026-07-01", "2026-09-30"]
+    assert rows[0]["quarter"] == 3
+    assert [row["as_at_date"] for row in api_client.get(url, {"month": 3}).json()["data"]] == [
+        "2026-03-31"
+    ]
+
+    with connections["api_db"].cursor() as cursor:
+        cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM report_modifiers WHERE year = 2026 AND quarter = 3"
+        )
+        assert "report_modifiers_year_quarter" in " ".join(str(row) for row in cursor.fetchall())
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_latest_modifier_per_report(api_client, django_assert_max_num_queries):
+    a, b, c = (
+        Report.objects.create(name=name, peril="Flood", loss_perspective="Gross") for name in "abc"
+    )
+    q2 = ReportModifier.objects.create(as_at_date=date(2026, 6, 30), fx_date=date(2026, 6, 30))
+    q2_fx = ReportModifier.objects.create(as_at_date=date(2026, 6, 30), fx_date=date(2026, 5, 31))
+    q3 = ReportModifier.objects.create(as_at_date=date(2026, 9, 30), fx_date=date(2026, 9, 30))
+    q2.reports.add(a, b)
+    q2_fx.reports.add(c)
+    q3.reports.add(a)
+    url = reverse("api:report-modifier-list") + "latest/"
+
+    with django_assert_max_num_queries(2, connection=connections["api_db"]):
+        response = api_client.get(url, {"as_of": "2026-09-30"})
+    latest = {row["report"]: row["modifier"]["id"] for row in response.json()["data"]}
+    assert latest == {a.pk: q3.pk, b.pk: q2.pk, c.pk: q2_fx.pk}
+
+    response = api_client.get(url, {"as_of": "2026-08-01", "reports": f"{a.pk}"})
+    assert [row["modifier"]["id"] for row in response.json()["data"]] == [q2.pk]
+    assert api_client.get(url, {"as_of": "2026-13-01"}).status_code == 400
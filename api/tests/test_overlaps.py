@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from django.urls import reverse
+
+from api.models import EventGroup, Report, RingEvent
+from api.services.events import bulk_create_events
+from api.services.geo import connected_components, haversine_km, pairs_within, unit_vectors
+from api.services.overlaps import find_overlaps
+
+DATABASES = ["default", "api_db"]
+
+
+def test_pairs_within_matches_brute_force():
+    rng = np.random.default_rng(1)
+    lat, lon = rng.uniform(-89, 89, 1500), rng.uniform(-180, 180, 1500)
+    # Dense patches at a pole and on the antimeridian.
+    lat[:100], lon[:100] = rng.uniform(88, 90, 100), rng.uniform(-180, 180, 100)
+    lat[100:200], lon[100:200] = rng.uniform(-1, 1, 100), rng.choice([-179.9, 179.9], 100)
+
+    i, j, distances = pairs_within(unit_vectors(lat, lon), 300, chunk_pairs=500)
+    all_distances = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    expected_i, expected_j = np.nonzero(np.triu(all_distances < 300, 1))
+
+    assert set(zip(i.tolist(), j.tolist())) == set(zip(expected_i.tolist(), expected_j.tolist()))
+    assert np.allclose(distances, all_distances[i, j])
+
+
+def test_connected_components():
+    labels = connected_components(6, np.array([4, 0, 1]), np.array([5, 1, 2]))
+    assert labels.tolist() == [0, 0, 0, 3, 4, 4]
+
+
+def test_find_overlaps_clusters():
+    # A chain of three rings 30 km apart, a close pair, and a lone ring.
+    step = 30 / 111.2
+    result = find_overlaps(
+        [10, 11, 12, 20, 21, 30],
+        [0, step, 2 * step, 10, 10, 40],
+        [0, 0, 0, 10, 10.01, 40],
+        radius_km=50,
+    )
+    assert result["pair_count"] == 3
+    assert result["pairs"][0]["events"] == [20, 21]
+    assert [cluster["events"] for cluster in result["clusters"]] == [[10, 11, 12], [20, 21]]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_overlaps_endpoint(api_client):
+    rings = bulk_create_events(
+        [
+            RingEvent(name=name, description="", zone="z", latitude=lat, longitude=lon, radius=10)
+            for name, lat, lon in [("a", 51.5, -0.12), ("b", 51.6, -0.12), ("c", 48.85, 2.35)]
+        ]
+    )
+    group = EventGroup.objects.create(name="g")
+    group.events.set(rings)
+    Report.objects.create(
+        name="r", peril="Flood", loss_perspective="Gross", event_group=group, no_overlap_radius=20
+    )
+    url = reverse("api:event-group-overlaps", args=[group.pk])
+
+    response = api_client.get(url)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["meta"]["radius_km"] == 20
+    assert body["meta"]["overlapping_pairs"] == 1
+    assert body["data"]["clusters"][0]["events"] == [rings[0].pk, rings[1].pk]
+
+    body = api_client.get(url, {"radius": 400}).json()
+    assert body["meta"]["overlapping_pairs"] == 3
+    assert api_client.get(url, {"radius": "x"}).status_code == 400
+    for radius in ("nan", "inf", "-1", "1001"):
+        assert api_client.get(url, {"radius": radius}).status_code == 400
+    assert api_client.get(url, {"max_pairs": 10001}).status_code == 400
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import RingEvent
+
+DATABASES = ["default", "api_db"]
+
+
+@pytest.fixture
+def events():
+    return [
+        RingEvent.objects.create(
+            name=f"e{i:02}", description="", zone="north" if i < 30 else "south",
+            latitude=1, longitude=1, radius=1,
+        )
+        for i in range(45)
+    ]
+
+
+def page(client, **params):
+    with CaptureQueriesContext(connections["api_db"]) as queries:
+        response = client.get(reverse("api:event-list"), params)
+    assert response.status_code == 200, response.data
+    sql = [q["sql"].upper() for q in queries.captured_queries]
+    return response.data, sum("COUNT(" in q for q in sql)
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_exact_is_the_default(api_client, events):
+    body, counts = page(api_client, page_size=20)
+    pagination = body["meta"]["pagination"]
+    assert pagination["total"] == 45 and pagination["pages"] == 3
+    assert "estimated" not in pagination
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_estimate_reads_counter_when_unfiltered(api_client, events):
+    body, counts = page(api_client, page_size=20, count="estimate")
+    pagination = body["meta"]["pagination"]
+    assert counts == 0
+    assert pagination["total"] == 45 and pagination["pages"] == 3
+    assert pagination["estimated"] is False
+    assert pagination["has_next"] and not pagination["has_previous"]
+    assert len(body["data"]) == 20
+    assert "count=estimate" in body["links"]["next"]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_estimate_bounds_filtered_counts(api_client, events):
+    body, counts = page(api_client, page_size=10, zone="north", count="estimate")
+    assert body["meta"]["pagination"]["total"] == 30
+    assert body["meta"]["pagination"]["estimated"] is False
+    assert counts == 1
+
+    with override_settings(PAGINATION_COUNT_LIMIT=12):
+        body, _ = page(api_client, page_size=10, zone="north", count="estimate")
+        pagination = body["meta"]["pagination"]
+        assert pagination["total"] == 12 and pagination["estimated"] is True
+        # A page past the bound raises the bound to the rows seen.
+        body, _ = page(api_client, page_size=10, page=3, zone="north", count="estimate")
+        pagination = body["meta"]["pagination"]
+        assert pagination["total"] == 30 and pagination["estimated"] is True
+        assert not pagination["has_next"]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_none_skips_counting(api_client, events):
+    body, counts = page(api_client, page_size=20, page=3, count="none")
+    pagination = body["meta"]["pagination"]
+    assert counts == 0
+    assert pagination["total"] is None and pagination["pages"] is None
+    assert not pagination["has_next"] and pagination["has_previous"]
+    assert [e["name"] for e in body["data"]] == [f"e{i}" for i in range(40, 45)]
+
+    response = api_client.get(reverse("api:event-list"), {"page": 4, "count": "none"})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_invalid_count_mode(api_client):
+    response = api_client.get(reverse("api:event-list"), {"count": "maybe"})
+    assert response.status_code == 400
@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+
+from api.models import GeoEvent, Region
+from api.services.events import bulk_create_events
+from api.services.regions import rebuild_regions
+
+DATABASES = ["default", "api_db"]
+
+
+def geo(name, *levels):
+    fields = dict(zip(("country", "area", "subarea", "subarea2"), levels))
+    return GeoEvent(name=name, description="", zone="z", **fields)
+
+
+@pytest.fixture
+def events():
+    created = bulk_create_events(
+        [
+            geo("paris", "France", "Ile-de-France", "Paris"),
+            geo("versailles", "France", "Ile-de-France", "Yvelines"),
+            geo("lyon", "France", "Auvergne-Rhone-Alpes"),
+            geo("franconia", "Germany", "Franconia"),
+            geo("nowhere"),
+        ]
+    )
+    # Saves go through the signal.
+    GeoEvent.objects.create(name="nice", description="", zone="z", country="France", area="Provence")
+    return created
+
+
+def region(*names):
+    return Region.objects.get(path="\x1f".join(names))
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_regions_follow_writes(events):
+    paris = GeoEvent.objects.get(name="paris")
+    assert paris.region == region("France", "Ile-de-France", "Paris")
+    assert region("France", "Ile-de-France").parent == region("France")
+    assert GeoEvent.objects.get(name="nowhere").region is None
+
+    paris.area, paris.subarea = "Provence", "Marseille"
+    paris.save()
+    assert paris.region.parent == region("France", "Provence")
+
+    GeoEvent.objects.filter(name="paris").update(region=None)
+    result = rebuild_regions()
+    assert result["events_updated"] == 1
+    # Ile-de-France > Paris lost its only event.
+    assert not Region.objects.filter(name="Paris").exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_region_endpoints(api_client, events):
+    france = region("France")
+
+    body = api_client.get(reverse("api:region-roots")).json()
+    assert [(r["name"], r["events"]) for r in body["data"]] == [("France", 4), ("Germany", 1)]
+
+    body = api_client.get(reverse("api:region-children", args=[france.pk])).json()
+    assert [(r["name"], r["events"]) for r in body["data"]] == [
+        ("Auvergne-Rhone-Alpes", 1),
+        ("Ile-de-France", 2),
+        ("Provence", 1),
+    ]
+
+    body = api_client.get(reverse("api:region-autocomplete"), {"q": "fra"}).json()
+    assert [r["path"] for r in body["data"]] == [["France"], ["Germany", "Franconia"]]
+    assert api_client.get(reverse("api:region-autocomplete")).status_code == 400
+
+    body = api_client.get(
+        reverse("api:region-events", args=[region("France", "Ile-de-France").pk])
+    ).json()
+    assert sorted(e["name"] for e in body["data"]) == ["paris", "versailles"]
+    assert body["meta"]["pagination"]["total"] == 2
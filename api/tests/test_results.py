@@ -0,0 +1,133 @@
+import io
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import Job, Report
+from api.services.archive import archive_old_jobs
+from api.services.results import JobResults, ingest_job_results
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+@pytest.fixture(autouse=True)
+def results_dir(settings, tmp_path):
+    settings.JOB_RESULTS_DIR = tmp_path
+
+
+def npz(**arrays):
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    buffer.seek(0)
+    return buffer
+
+
+def test_ingest_and_query():
+    # Event 2 has two locations; event 1 appears twice at location 10.
+    ingest_job_results(
+        1,
+        npz(
+            event_id=[1, 2, 2, 3, 1],
+            location_id=[10, 10, 11, 12, 10],
+            loss=[5.0, 7.0, 4.0, 1.0, 2.0],
+        ),
+        "results.npz",
+    )
+    results = JobResults(1)
+    assert results.meta["events"] == 3
+    assert results.meta["total_loss"] == 19.0
+    assert results.top(2) == [{"event_id": 2, "loss": 11.0}, {"event_id": 1, "loss": 7.0}]
+    assert results.top(5, "location", event_id=2) == [
+        {"event_id": 2, "location_id": 10, "loss": 7.0},
+        {"event_id": 2, "location_id": 11, "loss": 4.0},
+    ]
+    assert results.above(7.0) == (2, [{"event_id": 2, "loss": 11.0}, {"event_id": 1, "loss": 7.0}])
+    assert results.above(4.5, "location", limit=1) == (2, [{"event_id": 2, "location_id": 10, "loss": 7.0}])
+
+    ingest_job_results(2, io.BytesIO(b"event_id,loss\n1,7\n2,1\n4,3\n"), "results.csv")
+    comparison = results.compare(JobResults(2), k=2)
+    assert comparison["events"] == {
+        "job": 3, "other": 3, "common": 2, "only_job": 1, "only_other": 1, "changed": 3
+    }
+    assert comparison["total_loss"]["difference"] == pytest.approx(-8.0)
+    assert [change["event_id"] for change in comparison["largest_changes"]] == [2, 4]
+
+    with pytest.raises(ValueError):
+        JobResults(2).top(1, "location")
+    with pytest.raises(ValueError):
+        ingest_job_results(3, io.BytesIO(b"event_id,loss\n1.5,7\n"), "results.csv")
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_results_endpoints(api_client):
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+    job = Job.objects.create(report=report, fireant_jobid=1)
+    other = Job.objects.create(report=report, fireant_jobid=2)
+
+    def upload(job_id, text):
+        return api_client.post(
+            reverse("api:job-results", args=[job_id]),
+            {"file": SimpleUploadedFile("results.csv", text.encode())},
+            format="multipart",
+        )
+
+    assert api_client.get(reverse("api:job-results", args=[job.pk])).status_code == 404
+    assert upload(job.pk, "event_id,loss\n1,10\n2,30\n3,20\n").status_code == 201
+    assert upload(other.pk, "event_id,loss\n1,10\n2,35\n").status_code == 201
+    assert upload(job.pk, "loss\n1\n").status_code == 400
+    assert upload(999, "event_id,loss\n1,1\n").status_code == 404
+
+    response = api_client.get(reverse("api:job-results-top", args=[job.pk]), {"k": 2})
+    assert [row["event_id"] for row in response.json()["data"]] == [2, 3]
+
+    response = api_client.get(reverse("api:job-results-above", args=[job.pk]), {"threshold": 15})
+    assert response.json()["meta"]["count"] == 2
+
+    response = api_client.get(
+        reverse("api:job-results-compare", args=[job.pk]), {"other": other.pk}
+    )
+    assert response.json()["data"]["largest_changes"][0] == {
+        "event_id": 3, "job": 20.0, "other": 0.0, "difference": -20.0
+    }
+    assert api_client.get(reverse("api:job-results-above", args=[job.pk])).status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_results_endpoints_check_ids_and_bounds(api_client, settings):
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+    job = Job.objects.create(report=report, fireant_jobid=1)
+    ingest_job_results(job.pk, io.BytesIO(b"event_id,loss\n1,7\n2,1\n"), "results.csv")
+
+    assert api_client.get(reverse("api:job-results", args=["abc"])).status_code == 404
+    assert api_client.get(reverse("api:job-results", args=[job.pk])).json()["meta"]["job_id"] == job.pk
+
+    settings.JOB_RESULTS_MAX_ROWS = 10
+    top = reverse("api:job-results-top", args=[job.pk])
+    assert api_client.get(top, {"k": 10}).status_code == 200
+    assert api_client.get(top, {"k": 11}).status_code == 400
+    above = reverse("api:job-results-above", args=[job.pk])
+    assert api_client.get(above, {"threshold": 0, "limit": 11}).status_code == 400
+    compare = reverse("api:job-results-compare", args=[job.pk])
+    assert api_client.get(compare, {"other": job.pk, "k": 11}).status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_results_are_removed_with_their_job(django_capture_on_commit_callbacks):
+    report = Report.objects.create(name="r", peril="Flood", loss_perspective="Gross")
+    jobs = [Job.objects.create(report=report, fireant_jobid=i) for i in range(2)]
+    for job in jobs:
+        ingest_job_results(job.pk, io.BytesIO(b"event_id,loss\n1,7\n"), "results.csv")
+
+    with django_capture_on_commit_callbacks(execute=True, using="api_db"):
+        jobs[0].delete()
+    assert not JobResults(jobs[0].pk).exists()
+    assert JobResults(jobs[1].pk).exists()
+
+    Job.objects.filter(pk=jobs[1].pk).update(created=timezone.now() - timedelta(days=400))
+    with django_capture_on_commit_callbacks(execute=True, using="api_db"):
+        archive_old_jobs(older_than_days=180)
+    assert not JobResults(jobs[1].pk).exists()
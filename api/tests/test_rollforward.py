@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Change, Job, JobRollup, Report, ReportModifier
+from api.services.rollforward import roll_forward, shift_months
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def test_shift_months_keeps_month_ends():
+    assert shift_months(date(2026, 9, 30), 3) == date(2026, 12, 31)
+    assert shift_months(date(2026, 12, 31), 3) == date(2027, 3, 31)
+    assert shift_months(date(2026, 11, 15), 3) == date(2027, 2, 15)
+    assert shift_months(date(2026, 1, 30), 1) == date(2026, 2, 28)
+
+
+def make_quarter(count):
+    gbp = ReportModifier.objects.create(as_at_date=date(2026, 6, 30), fx_date=date(2026, 6, 30))
+    usd = ReportModifier.objects.create(as_at_date=date(2026, 6, 30), fx_date=date(2026, 5, 31))
+    old = ReportModifier.objects.create(as_at_date=date(2026, 3, 31), fx_date=date(2026, 3, 31))
+    reports = Report.objects.bulk_create(
+        Report(name=f"r{i}", peril="Flood", loss_perspective="Gross", is_valid=i % 10 != 0)
+        for i in range(count)
+    )
+    gbp.reports.add(*reports[: count // 2])
+    usd.reports.add(*reports[count // 2:])
+    old.reports.add(*reports)
+    return reports
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_roll_forward_links_valid_reports_once():
+    reports = make_quarter(1000)
+    valid = [r.pk for r in reports if r.is_valid]
+
+    with CaptureQueriesContext(connections["api_db"]) as queries:
+        result = roll_forward(date(2026, 6, 30), create_jobs=True)
+    assert len(queries) < 60
+    assert result["source_quarter"] == [date(2026, 4, 1), date(2026, 6, 30)]
+    assert [(m["as_at_date"], m["fx_date"], m["linked"]) for m in result["modifiers"]] == [
+        (date(2026, 9, 30), date(2026, 8, 31), 450),
+        (date(2026, 9, 30), date(2026, 9, 30), 450),
+    ]
+    new = ReportModifier.objects.filter(as_at_date=date(2026, 9, 30))
+    assert sorted(new.values_list("reports", flat=True)) == valid
+    assert Job.objects.filter(report_modifier__in=new, fireant_jobid=0).count() == 900
+    assert JobRollup.objects.filter(report__in=valid).count() == 900
+    assert Change.objects.filter(resource="job", action="create").count() == 900
+    assert Change.objects.filter(resource="report-modifier", action="add", object_id__in=new).count() == 2
+
+    again = roll_forward(from_date=date(2026, 5, 1), create_jobs=True)
+    assert [(m["created"], m["linked"], m["already_linked"]) for m in again["modifiers"]] == [
+        (False, 0, 450),
+        (False, 0, 450),
+    ]
+    assert again["jobs"] == 0 and new.count() == 2
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_roll_forward_endpoint_and_command(api_client):
+    reports = make_quarter(20)
+    url = reverse("api:report-modifier-list") + "roll-forward/"
+    body = {"from_date": "2026-06-30", "reports": [reports[1].pk, reports[0].pk]}
+    response = api_client.post(url, body, format="json")
+    assert response.status_code == 201
+    assert response.json()["meta"]["linked"] == 1  # reports[0] is not valid
+    # A retry rolls the same quarter again, which changes nothing.
+    response = api_client.post(url, body, format="json")
+    assert response.status_code == 200 and response.json()["meta"]["linked"] == 0
+    assert not ReportModifier.objects.filter(as_at_date=date(2026, 12, 31)).exists()
+    assert api_client.post(url, {"months": 1}, format="json").status_code == 400
+    assert api_client.post(url, {**body, "months": 0}, format="json").status_code == 400
+
+    call_command("roll_forward", "--from-date", "2026-09-01", stdout=open("/dev/null", "w"))
+    assert ReportModifier.objects.filter(as_at_date=date(2026, 12, 31)).count() == 2
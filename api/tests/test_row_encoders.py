@@ -0,0 +1,110 @@
+import pytest
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import (
+    BoxEvent, Event, EventGroup, GeoEvent, Job, Report, ReportModifier, RingEvent,
+)
+from api.services.events import bulk_create_events
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+@pytest.fixture
+def rows():
+    rings = bulk_create_events(
+        RingEvent(name=f"ring {i}", description="d", zone="north", latitude=i, longitude=0, radius=1.5)
+        for i in range(4)
+    )
+    bulk_create_events(
+        BoxEvent(name=f"box {i}", description="", zone="south", max_lat=2, min_lat=1, max_lon=2, min_lon=1)
+        for i in range(3)
+    )
+    bulk_create_events(GeoEvent(name="geo", description="", zone="east", country="UK") for _ in range(2))
+    Event.objects.create(name="base", description="", zone="west", is_valid=False)
+
+    group = EventGroup.objects.create(name="flood group")
+    group.events.add(*rings)
+    modifiers = [ReportModifier.objects.create() for _ in range(3)]
+    for i in range(6):
+        report = Report.objects.create(
+            name=f"report {i}",
+            peril="Flood" if i % 2 else "Wind",
+            loss_perspective="Gross",
+            event_group=group if i % 3 else None,
+            cron="0 0 * * *" if i % 2 else None,
+            dr=0.5 * i,
+        )
+        report.modifiers.add(*modifiers[: i % 4])
+        Job.objects.create(report=report, report_modifier=modifiers[0] if i % 2 else None, fireant_jobid=i)
+        Job.objects.create(report=report, fireant_jobid=100 + i)
+
+
+def both(client, name, params):
+    """The list response through the row encoder and through the serializer."""
+    url = reverse(f"api:{name}-list")
+    with CaptureQueriesContext(connections["api_db"]) as fast_queries:
+        fast = client.get(url, params)
+    with override_settings(FAST_LIST_ENCODERS=False):
+        with CaptureQueriesContext(connections["api_db"]) as slow_queries:
+            slow = client.get(url, params)
+    assert fast.status_code == slow.status_code == 200, fast.content
+    return fast, slow, len(fast_queries), len(slow_queries)
+
+
+@pytest.mark.parametrize(
+    "name,params",
+    [
+        ("event", {}),
+        ("event", {"page_size": 100, "ordering": "-id"}),
+        ("event", {"zone": "south"}),
+        ("event", {"search": "ring"}),
+        ("event", {"is_valid": "false", "count": "none"}),
+        ("job", {}),
+        ("job", {"page_size": 3, "page": 2, "ordering": "fireant_jobid"}),
+        ("job", {"search": "report 1", "count": "estimate"}),
+        ("report", {}),
+        ("report", {"page_size": 100, "ordering": "name"}),
+        ("report", {"peril": "Flood"}),
+        ("report", {"search": "report"}),
+    ],
+)
+@pytest.mark.django_db(databases=DATABASES)
+def test_encoded_lists_match_serializers(api_client, rows, name, params):
+    fast, slow, _, _ = both(api_client, name, params)
+    assert fast.content == slow.content
+    assert fast.json()["data"]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_encoded_events_carry_their_type(api_client, rows):
+    fast, _, fast_queries, slow_queries = both(api_client, "event", {"page_size": 100})
+    types = {e["name"]: e["event_type"] for e in fast.json()["data"]}
+    assert types == {
+        **{f"ring {i}": "ring" for i in range(4)},
+        **{f"box {i}": "box" for i in range(3)},
+        "geo": "geo",
+        "base": "base",
+    }
+    # The serializer looks the type up per event.
+    assert fast_queries < slow_queries
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_encoded_reports_link_modifiers_in_one_query(api_client, rows):
+    fast, slow, fast_queries, _ = both(api_client, "report", {"page_size": 100})
+    report = next(r for r in fast.json()["data"] if r["name"] == "report 2")
+    assert len(report["modifiers"]) == 2
+    assert report["event_group_detail"].endswith(f"/api/event-groups/{report['event_group']}/")
+    # Conditional GET state, count, page and modifier links.
+    assert fast_queries == 4
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_expanded_and_archived_lists_use_the_serializer(api_client, rows):
+    response = api_client.get(reverse("api:report-list"), {"expand": "modifiers"})
+    assert isinstance(response.json()["data"][0]["modifiers"][0], dict)
+    response = api_client.get(reverse("api:job-list"), {"include_archived": "true"})
+    assert len(response.json()["data"]) == 12
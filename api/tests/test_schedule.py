@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from api.services.schedule import CronParseError, parse_cron, simulate_schedule
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)  # a Thursday
+END = datetime(2026, 1, 8, tzinfo=timezone.utc)
+
+
+def test_parse_cron_fields():
+    spec = parse_cron("*/15 2 * * 1-5")
+    assert np.flatnonzero(spec.minutes).tolist() == [0, 15, 30, 45]
+    assert np.flatnonzero(spec.hours).tolist() == [2]
+    assert np.flatnonzero(spec.days_of_week).tolist() == [1, 2, 3, 4, 5]
+    assert spec.dow_restricted and not spec.dom_restricted
+
+
+@pytest.mark.parametrize("expression", ["", "* * * *", "61 * * * *", "x * * * *"])
+def test_parse_cron_rejects_invalid(expression):
+    with pytest.raises(CronParseError):
+        parse_cron(expression)
+
+
+def test_daily_schedule_demand():
+    simulation = simulate_schedule(
+        [(1, "0 2 * * *", 24)], START, END, durations={1: 30}
+    )
+    assert len(simulation.demand) == 7 * 24 * 60
+    assert simulation.job_runs == 7
+    assert simulation.peak == 24
+    # Each day runs 02:00-02:30.
+    assert simulation.demand.sum() == 7 * 30 * 24
+    assert simulation.demand[2 * 60 + 29] == 24
+    assert simulation.demand[2 * 60 + 30] == 0
+
+
+def test_overlapping_schedules_and_capacity():
+    simulation = simulate_schedule(
+        [(1, "0 2 * * *", 24), (2, "15 2 * * *", 16), (3, "bad cron", 8)],
+        START,
+        END,
+        durations={1: 30, 2: 30},
+        capacity=32,
+    )
+    assert simulation.skipped_reports == [3]
+    assert simulation.peak == 40
+    over = simulation.over_capacity()
+    assert len(over) == 7
+    assert over[0].start == datetime(2026, 1, 1, 2, 15, tzinfo=timezone.utc)
+    assert over[0].end == datetime(2026, 1, 1, 2, 30, tzinfo=timezone.utc)
+    assert simulation.peaks()[0].cores == 40
+
+
+def test_jobs_started_before_window_are_counted():
+    simulation = simulate_schedule(
+        [(1, "30 23 * * *", 10)], START, END, durations={1: 120}
+    )
+    # The 2025-12-31 23:30 run is still going at the window start.
+    assert simulation.demand[0] == 10
+    assert simulation.demand[90] == 0
+
+
+def test_day_of_month_or_day_of_week():
+    # Fires on the 1st and on Mondays (Jan 5th) within the first week.
+    simulation = simulate_schedule(
+        [(1, "0 0 1 * 1", 1)], START, END, durations={1: 1}
+    )
+    assert simulation.job_runs == 2
@@ -0,0 +1,88 @@
+import pytest
+from django.urls import reverse
+
+from api.models import EventGroup, GeoEvent, Report, RingEvent
+from api.services.events import bulk_create_events
+
+DATABASES = ["default", "api_db"]
+
+
+def names(response):
+    return [row["name"] for row in response.json()["data"]]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_event_search_is_ranked_and_follows_writes(api_client, settings):
+    bulk_create_events(
+        [
+            RingEvent(name="Flood ring", description="river flood flood", zone="EU",
+                      latitude=0, longitude=0, radius=1),
+            RingEvent(name="Wind ring", description="storm with some flood", zone="EU",
+                      latitude=0, longitude=0, radius=1),
+            RingEvent(name="Quake ring", description="", zone="JP", latitude=0, longitude=0, radius=1),
+        ]
+    )
+    GeoEvent.objects.create(name="Geo", description="", zone="EU", country="Côte d'Ivoire")
+    url = reverse("api:event-list")
+
+    # Prefix matching, best match first.
+    assert names(api_client.get(url, {"search": "flo"})) == ["Flood ring", "Wind ring"]
+    assert names(api_client.get(url, {"search": "flood storm"})) == ["Wind ring"]
+    assert names(api_client.get(url, {"search": "flood", "ordering": "-name"})) == [
+        "Wind ring",
+        "Flood ring",
+    ]
+    # Too many matches to rank: the view's ordering applies.
+    settings.SEARCH_RANK_MAX_MATCHES = 1
+    assert names(api_client.get(url, {"search": "flood"})) == ["Flood ring", "Wind ring"]
+    assert names(api_client.get(url, {"search": "ring"})) == ["Flood ring", "Quake ring", "Wind ring"]
+    settings.SEARCH_RANK_MAX_MATCHES = 10000
+
+    # Geo place names are indexed, without diacritics.
+    assert names(api_client.get(url, {"search": "cote"})) == ["Geo"]
+    # Substrings inside words fall back to LIKE.
+    assert names(api_client.get(url, {"search": "uak"})) == ["Quake ring"]
+
+    RingEvent.objects.filter(name="Quake ring").update(description="tsunami")
+    ring_url = reverse("api:ring-event-list")
+    assert names(api_client.get(ring_url, {"search": "tsunami"})) == ["Quake ring"]
+    RingEvent.objects.filter(name="Quake ring").delete()
+    assert names(api_client.get(url, {"search": "tsunami"})) == []
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_report_search_includes_event_group_name(api_client):
+    group = EventGroup.objects.create(name="Atlantic hurricanes")
+    Report.objects.create(name="US wind", peril="Wind", loss_perspective="Gross", event_group=group)
+    Report.objects.create(name="EU flood", peril="Flood", loss_perspective="Gross")
+    url = reverse("api:report-list")
+
+    assert names(api_client.get(url, {"search": "atlantic"})) == ["US wind"]
+    group.name = "Gulf storms"
+    group.save()
+    assert names(api_client.get(url, {"search": "gulf"})) == ["US wind"]
+    assert names(api_client.get(url, {"search": "flood"})) == ["EU flood"]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_event_search_keeps_substring_matches_within_filters(api_client):
+    bulk_create_events(
+        [
+            RingEvent(name="Flood ring", description="", zone="EU", latitude=0, longitude=0, radius=1),
+            RingEvent(name="Mooring", description="", zone="US", latitude=0, longitude=0, radius=1),
+        ]
+    )
+    GeoEvent.objects.create(name="Geo", description="", zone="AF", country="Côte d'Ivoire",
+                            area="Lagunes", subarea="Abidjan", subarea2="Plateau")
+    url = reverse("api:event-list")
+
+    # Full-text matches by rank, then substring-only matches.
+    assert names(api_client.get(url, {"search": "ring"})) == ["Flood ring", "Mooring"]
+    # Only substring matches among the filtered rows.
+    assert names(api_client.get(url, {"search": "ring", "zone": "US"})) == ["Mooring"]
+    assert names(api_client.get(url, {"search": "ring", "zone": "JP"})) == []
+    # Every place column is searched, by word and by substring.
+    assert names(api_client.get(url, {"search": "plateau"})) == ["Geo"]
+    geo_url = reverse("api:geo-event-list")
+    assert names(api_client.get(geo_url, {"search": "plat"})) == ["Geo"]
+    assert names(api_client.get(geo_url, {"search": "teau"})) == ["Geo"]
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import time
+
+import pytest
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Report
+from api.services.snapshot import read_alias, reading_snapshot, refresh_snapshot
+
+DATABASES = ["default", "api_db", "api_snapshot"]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "snapshot.sqlite"
+    with override_settings(SNAPSHOT_PATH=path, SNAPSHOT_MAX_AGE=60):
+        yield path
+
+
+def summary_queries(client, **headers):
+    with CaptureQueriesContext(connections["api_snapshot"]) as snapshot_queries:
+        with CaptureQueriesContext(connections["api_db"]) as live_queries:
+            response = client.get(reverse("api:report-summary"), headers=headers)
+    assert response.status_code == 200
+    return response, len(snapshot_queries), len(live_queries)
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_refresh_copies_live_database(snapshot_path):
+    Report.objects.create(name="a", peril="Flood", loss_perspective="Gross")
+
+    result = refresh_snapshot()
+
+    assert result["bytes"] == os.path.getsize(snapshot_path)
+    with sqlite3.connect(snapshot_path) as copy:
+        assert copy.execute("SELECT name FROM reports").fetchall() == [("a",)]
+    assert not os.path.exists(f"{snapshot_path}.partial")
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_summary_reads_fresh_snapshot(api_client, snapshot_path):
+    Report.objects.create(name="a", peril="Flood", loss_perspective="Gross")
+    refresh_snapshot()
+
+    response, snapshot_queries, live_queries = summary_queries(api_client)
+
+    assert snapshot_queries and not live_queries
+    meta = response.data["meta"]["snapshot"]
+    assert meta["source"] == "snapshot"
+    assert 0 <= meta["age_seconds"] < 60
+    assert response["X-Read-From"] == "snapshot"
+    assert read_alias() is None
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_stale_or_missing_snapshot_reads_live(api_client, snapshot_path):
+    response, snapshot_queries, live_queries = summary_queries(api_client)
+    assert live_queries and not snapshot_queries
+    assert response.data["meta"]["snapshot"] == {"source": "live"}
+
+    refresh_snapshot()
+    old = time.time() - 120
+    os.utime(snapshot_path, (old, old))
+    response, snapshot_queries, live_queries = summary_queries(api_client)
+    assert live_queries and not snapshot_queries
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_header_chooses_source(api_client, snapshot_path):
+    refresh_snapshot()
+
+    _, snapshot_queries, live_queries = summary_queries(api_client, **{"X-Read-From": "live"})
+    assert live_queries and not snapshot_queries
+
+    with CaptureQueriesContext(connections["api_snapshot"]) as queries:
+        response = api_client.get(reverse("api:report-list"), headers={"X-Read-From": "snapshot"})
+    assert response.status_code == 200
+    assert len(queries)
+    assert response.data["meta"]["snapshot"]["source"] == "snapshot"
+
+
+def test_writes_always_go_live(snapshot_path):
+    from django.db import router
+
+    with reading_snapshot():
+        assert router.db_for_write(Report) == "api_db"
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_replaced_snapshot_reopens_connection(api_client, snapshot_path):
+    refresh_snapshot()
+    first = summary_queries(api_client)[0].data["meta"]["snapshot"]["taken_at"]
+    later = time.time() + 5
+    refresh_snapshot()
+    os.utime(snapshot_path, (later, later))
+
+    second = summary_queries(api_client)[0].data["meta"]["snapshot"]["taken_at"]
+
+    assert second > first
+    assert connections["api_snapshot"].snapshot_taken_at.timestamp() == pytest.approx(later)
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_refresh_gives_up_after_timeout(snapshot_path):
+    with override_settings(SNAPSHOT_REFRESH_TIMEOUT=-1):
+        with pytest.raises(sqlite3.OperationalError):
+            refresh_snapshot()
+    assert not os.path.exists(snapshot_path)
+    assert not os.path.exists(f"{snapshot_path}.partial")
@@ -0,0 +1,68 @@
+import pytest
+from django.db import connections
+from django.urls import reverse
+
+from api.models import BoxEvent, RingEvent
+from api.services.events import bulk_create_events
+
+DATABASES = ["default", "api_db"]
+
+
+def ring(name, lat, lon, radius):
+    return RingEvent(name=name, description="", zone="z", latitude=lat, longitude=lon, radius=radius)
+
+
+def rtree_ids():
+    with connections["api_db"].cursor() as cursor:
+        cursor.execute("SELECT id FROM event_rtree ORDER BY id")
+        return [row[0] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rtree_follows_saves_and_bulk_inserts():
+    london = ring("london", 51.5, -0.12, 10)
+    london.save()
+    rings = bulk_create_events([ring("paris", 48.85, 2.35, 10), ring("nyc", 40.7, -74.0, 5)])
+    box = BoxEvent.objects.create(
+        name="box", description="", zone="z", min_lat=0, max_lat=1, min_lon=0, max_lon=1
+    )
+    assert rtree_ids() == sorted([london.pk, box.pk, *(r.pk for r in rings)])
+
+    RingEvent.objects.filter(pk=rings[1].pk).delete()
+    assert rings[1].pk not in rtree_ids()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_ring_queries(api_client):
+    bulk_create_events(
+        [ring("london", 51.5, -0.12, 10), ring("paris", 48.85, 2.35, 10), ring("nyc", 40.7, -74.0, 5)]
+    )
+    url = reverse("api:ring-event-list")
+
+    def names(params):
+        response = api_client.get(url, params)
+        assert response.status_code == 200
+        return sorted(event["name"] for event in response.json()["data"])
+
+    assert names({"bbox": "-10,45,5,55"}) == ["london", "paris"]
+    assert names({"near": "51.5,-0.12", "within_km": 1}) == ["london"]
+    # London to Paris is ~344 km; both rings have a 10 km radius.
+    assert names({"near": "51.5,-0.12", "within_km": 335}) == ["london", "paris"]
+    assert names({"near": "51.5,-0.12", "within_km": 320}) == ["london"]
+    # The ring reaches into the box even though its centre is outside.
+    assert names({"bbox": "-0.1,51.55,0.5,52"}) == ["london"]
+    assert api_client.get(url, {"bbox": "1,2"}).status_code == 400
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_box_queries(api_client):
+    BoxEvent.objects.create(name="a", description="", zone="z", min_lat=0, max_lat=1, min_lon=0, max_lon=1)
+    BoxEvent.objects.create(name="b", description="", zone="z", min_lat=10, max_lat=11, min_lon=10, max_lon=11)
+    url = reverse("api:box-event-list")
+
+    response = api_client.get(url, {"bbox": "0.5,0.5,2,2"}).json()
+    assert [event["name"] for event in response["data"]] == ["a"]
+    response = api_client.get(url, {"near": "1.5,0.5", "within_km": 60}).json()
+    assert [event["name"] for event in response["data"]] == ["a"]
+    response = api_client.get(url, {"near": "1.5,0.5", "within_km": 50}).json()
+    assert response["data"] == []
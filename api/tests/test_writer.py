@@ -0,0 +1,210 @@
+import threading
+import time
+import zoneinfo
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.test import override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import ReportModifier
+from api.services.writer import QueueFull, WriteQueue
+
+DATABASES = ["default", "api_db", "archive_db"]
+
+
+def create_modifier():
+    return ReportModifier.objects.create().pk
+
+
+def submit_all(writer, fns):
+    results = [None] * len(fns)
+
+    def run(index):
+        results[index] = writer.submit(fns[index])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(fns))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def wait_for(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def blocked(writer):
+    """Occupy the writer thread until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def wait():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=writer.submit, args=(wait,))
+    thread.start()
+    started.wait(5)
+    return release, thread
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_concurrent_writes_commit_together():
+    writer = WriteQueue()
+    release, first = blocked(writer)
+    waiting = threading.Thread(target=submit_all, args=(writer, [create_modifier] * 10))
+    waiting.start()
+    wait_for(lambda: writer._queue.qsize() == 10)
+    release.set()
+    first.join(5)
+    waiting.join(5)
+
+    assert ReportModifier.objects.count() == 10
+    # The blocking write, then the ten that queued behind it.
+    assert writer.stats == {"writes": 11, "batches": 2, "rejected": 0, "retried": 0}
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_full_queue_rejects_with_retry_after():
+    writer = WriteQueue(max_depth=1)
+    release, first = blocked(writer)
+    second = threading.Thread(target=writer.submit, args=(create_modifier,))
+    second.start()
+    wait_for(lambda: writer._queue.qsize() == 1)
+
+    with pytest.raises(QueueFull) as excinfo:
+        writer.submit(create_modifier)
+    assert excinfo.value.retry_after >= 1
+
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert writer.stats["rejected"] == 1
+    assert ReportModifier.objects.count() == 1
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_rolled_back_write_does_not_affect_batch():
+    writer = WriteQueue()
+
+    def failing():
+        create_modifier()
+        raise ValueError("boom")
+
+    assert writer.submit(create_modifier, rollback_if=lambda pk: False)
+    assert writer.submit(create_modifier, rollback_if=lambda pk: True)
+    with pytest.raises(ValueError):
+        writer.submit(failing)
+    assert ReportModifier.objects.count() == 1
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_failed_commit_retries_writes_alone():
+    writer = WriteQueue()
+    modifier = ReportModifier.objects.create()
+
+    def dangling_link():
+        # Foreign keys are checked at commit, which fails the whole batch.
+        ReportModifier.reports.through.objects.create(report_id=999999, reportmodifier_id=modifier.pk)
+
+    outcomes = {}
+
+    def submit(name, fn):
+        try:
+            outcomes[name] = writer.submit(fn)
+        except Exception as e:
+            outcomes[name] = e
+
+    release, first = blocked(writer)
+    threads = [
+        threading.Thread(target=submit, args=(name, fn))
+        for name, fn in (("a", create_modifier), ("bad", dangling_link), ("b", create_modifier))
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: writer._queue.qsize() == 3)
+    release.set()
+    first.join(5)
+    for thread in threads:
+        thread.join(5)
+
+    assert isinstance(outcomes["bad"], IntegrityError)
+    assert ReportModifier.objects.filter(pk__in=[outcomes["a"], outcomes["b"]]).count() == 2
+    assert not ReportModifier.reports.through.objects.exists()
+    assert writer.stats["retried"] == 3
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_writes_run_in_the_callers_context_and_roll_back_everywhere():
+    writer = WriteQueue(using=["api_db", "default"])
+
+    def write():
+        User.objects.create(username="rolled back")
+        create_modifier()
+        return timezone.get_current_timezone_name()
+
+    with timezone.override(zoneinfo.ZoneInfo("Asia/Tokyo")):
+        assert writer.submit(write, rollback_if=lambda result: True) == "Asia/Tokyo"
+    assert not User.objects.exists() and not ReportModifier.objects.exists()
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_middleware_queues_api_writes(monkeypatch):
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="tester"))
+    threads = []
+    submit = WriteQueue.submit
+
+    def recording_submit(writer, fn, rollback_if=None):
+        return submit(writer, lambda: threads.append(threading.current_thread().name) or fn(), rollback_if)
+
+    monkeypatch.setattr(WriteQueue, "submit", recording_submit)
+    url = reverse("api:report-modifier-list")
+    with override_settings(WRITE_QUEUE_ENABLED=True):
+        assert client.post(url, {"as_at_date": "2024-03-31"}, format="json").status_code == 201
+        assert client.get(url).status_code == 200
+
+    assert threads == ["api-writer"]
+    assert ReportModifier.objects.count() == 1
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_middleware_answers_429_when_full(monkeypatch):
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="tester"))
+
+    def full(writer, fn, rollback_if=None):
+        raise QueueFull(3)
+
+    monkeypatch.setattr(WriteQueue, "submit", full)
+    with override_settings(WRITE_QUEUE_ENABLED=True):
+        response = client.post(reverse("api:report-modifier-list"), {}, format="json")
+
+    assert response.status_code == 429
+    assert response["Retry-After"] == "3"
+    assert response.json()["status_code"] == 429
+    assert not ReportModifier.objects.exists()
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_middleware_leaves_long_actions_out_of_the_queue(monkeypatch):
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="tester"))
+    queued = []
+    submit = WriteQueue.submit
+    monkeypatch.setattr(
+        WriteQueue, "submit", lambda writer, fn, rollback_if=None: queued.append(fn) or submit(writer, fn, rollback_if)
+    )
+    with override_settings(WRITE_QUEUE_ENABLED=True):
+        response = client.post(
+            reverse("api:link-modifier-multiple"), {"reports": [], "modifiers": []}, format="json"
+        )
+    assert response.status_code == 400
+    assert queued == []
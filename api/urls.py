@@ -19,7 +19,10 @@ from api.views import (
     RingEventViewSet,
     BoxEventViewSet,
     GeoEventViewSet,
+    RegionViewSet,
     LinkModifierViewSet,
+    JobAnalyticsViewSet,
+    ChangeViewSet,
     api_root,
 )
 
@@ -33,7 +36,10 @@ router.register(r"event-groups", EventGroupViewSet, basename="event-group")
 router.register(r"ring-events", RingEventViewSet, basename="ring-event")
 router.register(r"box-events", BoxEventViewSet, basename="box-event")
 router.register(r"geo-events", GeoEventViewSet, basename="geo-event")
+router.register(r"regions", RegionViewSet, basename="region")
 router.register(r"link-modifier", LinkModifierViewSet, basename="link-modifier")
+router.register(r"job-analytics", JobAnalyticsViewSet, basename="job-analytics")
+router.register(r"changes", ChangeViewSet, basename="change")
 app_name = "api"  # Ensure namespace is defined
 
 urlpatterns = [
@@ -1,6 +1,8 @@
 from .core import *
 from .report import *
 from .link import *
+from .analytics import *
+from .changes import *
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
@@ -47,8 +49,17 @@ def api_root(request, format=None):
                 'box_events': request.build_absolute_uri(reverse('api:box-event-list')),
                 'geo_events': request.build_absolute_uri(reverse('api:geo-event-list')),
                 'event_groups': request.build_absolute_uri(reverse('api:event-group-list')),
+                'regions': request.build_absolute_uri(reverse('api:region-list')),
                 'description': 'Manage different types of geographical events'
             },
+            'analytics': {
+                'jobs': request.build_absolute_uri(reverse('api:job-analytics-list')),
+                'description': 'Job throughput and duration statistics'
+            },
+            'changes': {
+                'list': request.build_absolute_uri(reverse('api:change-list')),
+                'description': 'Ordered change feed for incremental sync'
+            },
             'relationships': {
                 'link_single': f"{request.build_absolute_uri().rstrip('/')}link-modifier/single/",
                 'link_multiple': f"{request.build_absolute_uri().rstrip('/')}link-modifier/multiple/",
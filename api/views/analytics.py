@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from rest_framework.viewsets import ViewSet
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from api.services.analytics import BUCKET_SIZES, GROUP_FIELDS, job_analytics
+from .core import SnapshotReadMixin
+
+
+class JobAnalyticsViewSet(SnapshotReadMixin, ViewSet):
+    """
+    Job throughput and duration statistics served from precomputed rollups.
+
+    Rollups are maintained on every job write and summed in SQL, so
+    responses do not depend on the size of the job history. A request
+    covers ``JOB_ANALYTICS_DEFAULT_DAYS`` up to today unless it gives
+    ``start``/``end``, and at most ``JOB_ANALYTICS_MAX_DAYS``. Rollups are
+    read from the snapshot database when it is fresh enough.
+    """
+
+    snapshot_actions = ("list",)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="group_by", type=str, description="Comma separated: report, peril, priority (default report)"),
+            OpenApiParameter(name="bucket", type=str, enum=list(BUCKET_SIZES), description="Time bucket (default day)"),
+            OpenApiParameter(name="start", type=str, description="First day (YYYY-MM-DD; default JOB_ANALYTICS_DEFAULT_DAYS before end)"),
+            OpenApiParameter(name="end", type=str, description="Last day (YYYY-MM-DD; default today), at most JOB_ANALYTICS_MAX_DAYS after start"),
+            OpenApiParameter(name="report", type=str, description="Comma separated report ids"),
+            OpenApiParameter(name="peril", type=str, description="Comma separated perils"),
+            OpenApiParameter(name="priority", type=str, description="Comma separated priorities"),
+            OpenApiParameter(name="percentiles", type=str, description="Comma separated duration percentiles (default 50,90,99)"),
+        ],
+        operation_id="job_analytics",
+    )
+    def list(self, request):
+        """Job counts and duration percentiles per time bucket and group."""
+        params = request.query_params
+
+        group_by = [g for g in params.get("group_by", "report").split(",") if g]
+        if not set(group_by) <= set(GROUP_FIELDS):
+            raise ValidationError({"group_by": f"Choose from {', '.join(GROUP_FIELDS)}."})
+        bucket = params.get("bucket", "day")
+        if bucket not in BUCKET_SIZES:
+            raise ValidationError({"bucket": f"Choose from {', '.join(BUCKET_SIZES)}."})
+
+        dates = {}
+        for name in ("start", "end"):
+            if params.get(name):
+                dates[name] = parse_date(params[name])
+                if dates[name] is None:
+                    raise ValidationError({name: "Expected YYYY-MM-DD."})
+        end = dates.get("end") or timezone.now().date()
+        start = dates.get("start") or end - timedelta(days=settings.JOB_ANALYTICS_DEFAULT_DAYS - 1)
+        if start > end:
+            raise ValidationError({"start": "Must not be after end."})
+        if (end - start).days >= settings.JOB_ANALYTICS_MAX_DAYS:
+            raise ValidationError(
+                {"start": f"At most {settings.JOB_ANALYTICS_MAX_DAYS} days per request."}
+            )
+
+        filters = {}
+        for name in GROUP_FIELDS:
+            if params.get(name):
+                values = [v for v in params[name].split(",") if v]
+                if name == "report":
+                    try:
+                        values = [int(v) for v in values]
+                    except ValueError:
+                        raise ValidationError({"report": "Expected report ids."})
+                filters[name] = values
+
+        try:
+            percentiles = [float(q) for q in params.get("percentiles", "50,90,99").split(",")]
+        except ValueError:
+            raise ValidationError({"percentiles": "Expected numbers."})
+        if not all(0 <= q <= 100 for q in percentiles):
+            raise ValidationError({"percentiles": "Percentiles must be between 0 and 100."})
+
+        data = job_analytics(
+            group_by=group_by,
+            bucket=bucket,
+            start=start,
+            end=end,
+            filters=filters,
+            percentiles=percentiles,
+        )
+        return Response({
+            'meta': {
+                'endpoint': 'job_analytics',
+                'generated_at': timezone.now().isoformat(),
+                'group_by': group_by,
+                'bucket': bucket,
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'count': len(data),
+            },
+            'data': data,
+        })
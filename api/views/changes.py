@@ -0,0 +1,65 @@
+from rest_framework.viewsets import ViewSet
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from api.serializers.change import ChangeSerializer
+from api.services.changes import RESOURCES, changes_since, feed_bounds, wait_for_changes
+
+
+class ChangeViewSet(ViewSet):
+    """
+    Ordered feed of changes to reports, modifiers, events, event groups and
+    jobs, for mirrors that sync incrementally.
+
+    Start from ``meta.latest`` of any response (after a full listing), then
+    request ``?since=<meta.next>`` until ``meta.has_more`` is false. With
+    ``wait=<seconds>`` an empty response is held until a change arrives, for
+    at most ``CHANGE_FEED_MAX_WAIT`` seconds; that is 0 unless configured,
+    as each waiting request holds a worker. ``meta.resync`` is true when
+    changes after ``since`` have been pruned and the mirror must list
+    everything again.
+    """
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="since", type=int, description="Last seq applied (default 0)"),
+            OpenApiParameter(name="limit", type=int, description="Changes per page (default 500, max 5000)"),
+            OpenApiParameter(name="resources", type=str, description="Comma separated: " + ", ".join(sorted(set(RESOURCES.values())))),
+            OpenApiParameter(name="wait", type=float, description=f"Seconds to wait for a change (max {settings.CHANGE_FEED_MAX_WAIT}; 0 disables waiting)"),
+        ],
+        operation_id="changes",
+    )
+    def list(self, request):
+        """Changes after ``since``, oldest first."""
+        params = request.query_params
+        try:
+            since = int(params.get("since", 0))
+            limit = int(params.get("limit", 500))
+            wait = float(params.get("wait", 0))
+        except ValueError:
+            raise ValidationError({"detail": "since and limit must be integers and wait a number."})
+        if since < 0 or not 1 <= limit <= 5000:
+            raise ValidationError({"detail": "since must not be negative and limit must be within 1-5000."})
+        resources = [r for r in params.get("resources", "").split(",") if r]
+        if not set(resources) <= set(RESOURCES.values()):
+            raise ValidationError({"resources": f"Choose from {', '.join(sorted(set(RESOURCES.values())))}."})
+
+        changes, has_more = changes_since(since, limit, resources)
+        if not changes and wait > 0 and settings.CHANGE_FEED_MAX_WAIT > 0:
+            if wait_for_changes(since, min(wait, settings.CHANGE_FEED_MAX_WAIT), resources):
+                changes, has_more = changes_since(since, limit, resources)
+
+        pruned, latest = feed_bounds()
+        return Response({
+            'meta': {
+                'endpoint': 'changes',
+                'since': since,
+                'next': changes[-1].seq if changes else since,
+                'latest': latest,
+                'count': len(changes),
+                'has_more': has_more,
+                'resync': since < pruned,
+            },
+            'data': ChangeSerializer(changes, many=True).data,
+        })
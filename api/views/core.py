@@ -1,41 +1,179 @@
+import hashlib
+import math
+from datetime import date, datetime
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
-from api.models.report import ReportModifier
-from api.models.job import Job
-from api.models.event import Event, EventGroup, RingEvent, BoxEvent, GeoEvent
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
+from django.db.models import F, Max, ProtectedError, Q, QuerySet, RestrictedError, Window
+from django.db.models.functions import RowNumber
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from api.models.report import Report, ReportModifier
+from api.models.job import Job, ArchivedJob
+from api.services.archive import MergedQuerySets
+from api.services import bulk
+from api.exceptions import Conflict
+from api.filters import (
+    FullTextSearchFilter,
+    ReportModifierFilter,
+    SearchRankOrderingFilter,
+    SpatialFilter,
+)
+from api.services.overlaps import default_radius, event_group_overlaps
+from api.services.results import LEVELS, JobResults, ingest_job_results
+from api.services import rollforward, snapshot
+from api.services.breakout import report_caps
+from api.services.counters import TABLES, counter, table_rows
+from api.models.event import Event, EventGroup, RingEvent, BoxEvent, GeoEvent, Region
+from api.services.regions import SEPARATOR, subtree_filter
+from api.serializers.expand import expand_lookups, parse_expand
+from django.db.models import Count
 from api.serializers import (
     ReportModifierSerializer,
+    RollForwardSerializer,
     JobSerializer,
     EventSerializer,
     EventGroupSerializer,
     RingEventSerializer,
     BoxEventSerializer,
     GeoEventSerializer,
+    RegionSerializer,
+    EVENT_ROWS,
+    JOB_ROWS,
 )
 
 
+class CountedPage:
+    """The page of a list paginated without an exact count (see ``StandardResultsPagination``)."""
+
+    def __init__(self, object_list, number, has_next):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
 class StandardResultsPagination(PageNumberPagination):
+    """
+    Page number pagination with the total in ``meta.pagination``.
+
+    ``?count=`` chooses how the total is found:
+
+    - ``exact`` (default): ``COUNT(*)`` of the filtered list.
+    - ``estimate``: the trigger-kept row count of the table (see
+      ``api.services.counters``) for unfiltered lists, otherwise a count
+      that stops after ``PAGINATION_COUNT_LIMIT`` rows. Totals at that
+      limit are lower bounds, flagged ``"estimated": true``.
+    - ``none``: no count; ``total`` and ``pages`` are null and ``has_next``
+      comes from fetching one row more than the page.
+    """
+
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+    count_query_param = "count"
+    count_modes = ("exact", "estimate", "none")
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, "exact")
+        if mode not in self.count_modes:
+            raise ValidationError({self.count_query_param: f"Choose from {', '.join(self.count_modes)}."})
+        return mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == "exact" or not isinstance(queryset, QuerySet):
+            # Lists that are not querysets (merged job lists) are always counted.
+            self.count_mode = "exact"
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        try:
+            number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise NotFound("Invalid page.")
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset : offset + page_size + 1])
+        if not rows and number > 1:
+            raise NotFound("Invalid page.")
+        self.page = CountedPage(rows[:page_size], number, len(rows) > page_size)
+        self.page_size = page_size
+        self.total, self.estimated = None, False
+        if self.count_mode == "estimate":
+            seen = offset + len(rows)
+            self.total, self.estimated = self.estimate_count(queryset)
+            if self.total < seen:
+                # Rows were written since; what was read is the better bound.
+                self.total = seen
+        return list(self.page)
+
+    def estimate_count(self, queryset):
+        """``(total, estimated)`` of ``queryset``, without counting more than the limit."""
+        query = queryset.query
+        if (
+            not query.where
+            and not query.distinct
+            and query.group_by is None
+            and queryset.model._meta.db_table in TABLES
+        ):
+            return table_rows(queryset.model), False
+        limit = settings.PAGINATION_COUNT_LIMIT
+        count = queryset.order_by()[:limit].count()
+        return count, count >= limit
 
     def get_paginated_response(self, data):
+        if self.count_mode == "exact":
+            total, pages = self.page.paginator.count, self.page.paginator.num_pages
+        else:
+            total = self.total
+            pages = None if total is None else max(1, math.ceil(total / self.page_size))
+        pagination = {
+            "page": self.page.number,
+            "pages": pages,
+            "per_page": self.page_size,
+            "total": total,
+            "has_next": self.page.has_next(),
+            "has_previous": self.page.has_previous(),
+        }
+        if self.count_mode != "exact":
+            pagination["count"] = self.count_mode
+            pagination["estimated"] = self.estimated
         return Response(
             {
-                "meta": {
-                    "pagination": {
-                        "page": self.page.number,
-                        "pages": self.page.paginator.num_pages,
-                        "per_page": self.page_size,
-                        "total": self.page.paginator.count,
-                        "has_next": self.page.has_next(),
-                        "has_previous": self.page.has_previous(),
-                    }
-                },
+                "meta": {"pagination": pagination},
                 "links": {
                     "next": self.get_next_link(),
                     "previous": self.get_previous_link(),
@@ -45,11 +183,422 @@ class StandardResultsPagination(PageNumberPagination):
         )
 
 
-class BaseViewSetMixin:
+class ConditionalGetMixin:
+    """
+    ``ETag`` and ``Last-Modified`` on list and detail responses.
+
+    Both come from one query that serializes nothing: the row's
+    ``last_modified_field`` (plus any ``etag_fields``) for a detail, the
+    count and latest ``last_modified_field`` of the filtered queryset for a
+    list. A matching ``If-None-Match`` or ``If-Modified-Since`` then gets a
+    304 without running the page query. Viewsets of rows that never change
+    once created set ``last_modified_field = None``; their lists are
+    validated by count and largest id, as ids are not reused.
+    """
+
+    last_modified_field = "updated"
+    etag_fields = ()
+
+    def use_validators(self):
+        # The list state query counts the filtered rows, which ?count=
+        # estimate and none are there to avoid.
+        return self.request.query_params.get("count", "exact") == "exact"
+
+    def validators(self, state, last_modified):
+        """``(etag, last_modified)`` for a response of this request in ``state``."""
+        key = (
+            type(self).__name__,
+            self.request.accepted_renderer.format,
+            self.request.get_full_path(),
+            state,
+        )
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+        if not isinstance(last_modified, datetime):
+            last_modified = None
+        return f'W/"{digest}"', last_modified
+
+    def conditional_response(self, request, validators, respond):
+        """``respond()``, or a 304 if ``validators`` match the request's."""
+        etag, last_modified = validators
+        not_modified = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if not_modified is not None:
+            return not_modified
+        response = respond()
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+    def list_state(self, queryset):
+        """``(count, latest)`` of a filtered queryset."""
+        field = self.last_modified_field or "pk"
+        state = queryset.order_by().aggregate(count=Count("pk"), latest=Max(field))
+        return state["count"], state["latest"]
+
+    def list_validators(self):
+        state = self.list_state(self.filter_queryset(self.get_queryset()))
+        return self.validators(state, state[1])
+
+    def detail_state(self):
+        """The validating column values of the requested row, or None if it does not exist."""
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        fields = [self.last_modified_field or "pk", *self.etag_fields]
+        return (
+            self.get_queryset()
+            .model._default_manager.filter(**{self.lookup_field: self.kwargs[lookup]})
+            .values_list(*fields)
+            .first()
+        )
+
+    def detail_validators(self):
+        state = self.detail_state()
+        return None if state is None else self.validators(state, state[0])
+
+    def list(self, request, *args, **kwargs):
+        respond = super().list
+        if not self.use_validators():
+            return respond(request, *args, **kwargs)
+        return self.conditional_response(
+            request, self.list_validators(), lambda: respond(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        respond = super().retrieve
+        validators = self.detail_validators() if self.use_validators() else None
+        if validators is None:
+            return respond(request, *args, **kwargs)
+        return self.conditional_response(
+            request, validators, lambda: respond(request, *args, **kwargs)
+        )
+
+
+class BatchGetMixin:
+    """
+    Several rows by id in one request: ``?ids=3,1,2`` on the list endpoint,
+    or ``POST batch-get/`` with ``{"ids": [3, 1, 2]}`` for sets too long
+    for a URL.
+
+    The rows come from one ``IN`` query on the viewset's queryset, so its
+    ``select_related``/``prefetch_related`` apply, and are returned in the
+    requested order (repeated ids once). ``meta.missing`` lists the ids that
+    do not exist. Filters, search and pagination do not apply.
+    """
+
+    ids_param = "ids"
+
+    def parse_ids(self, values):
+        """Distinct integer ids from ``values``, in order."""
+        try:
+            ids = list(dict.fromkeys(int(value) for value in values))
+        except (TypeError, ValueError):
+            raise ValidationError({self.ids_param: "Expected integer ids."})
+        if len(ids) > settings.BATCH_GET_MAX_IDS:
+            raise ValidationError(
+                {self.ids_param: f"At most {settings.BATCH_GET_MAX_IDS} ids per request."}
+            )
+        return ids
+
+    def requested_ids(self):
+        """The ids of ``?ids=``, or None if it is not given."""
+        value = self.request.query_params.get(self.ids_param)
+        if value is None:
+            return None
+        return self.parse_ids(v for v in value.split(",") if v.strip())
+
+    def batch_queryset(self, ids):
+        return self.get_queryset().filter(**{f"{self.lookup_field}__in": ids})
+
+    def batch_objects(self, ids):
+        """The rows of ``ids`` that exist, by id."""
+        return {getattr(obj, self.lookup_field): obj for obj in self.batch_queryset(ids)}
+
+    def batch_validators(self, ids):
+        state = self.list_state(self.batch_queryset(ids))
+        return self.validators(state, state[1])
+
+    def batch_response(self, ids):
+        found = self.batch_objects(ids)
+        objects = [found[i] for i in ids if i in found]
+        serializer = self.get_serializer(objects, many=True)
+        return Response(
+            {
+                "meta": {
+                    "requested": len(ids),
+                    "count": len(objects),
+                    "missing": [i for i in ids if i not in found],
+                },
+                "data": serializer.data,
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="ids",
+                type=str,
+                description="Comma separated ids; returns those rows in this order, unpaginated",
+            )
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        ids = self.requested_ids()
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        if not self.use_validators():
+            return self.batch_response(ids)
+        return self.conditional_response(
+            request, self.batch_validators(ids), lambda: self.batch_response(ids)
+        )
+
+    @extend_schema(
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {"ids": {"type": "array", "items": {"type": "integer"}}},
+                "required": ["ids"],
+            }
+        },
+    )
+    @action(detail=False, methods=["post"], url_path="batch-get")
+    def batch_get(self, request, *args, **kwargs):
+        """The rows with the given ids, in that order, and the ids that do not exist."""
+        ids = request.data.get(self.ids_param) if hasattr(request.data, "get") else None
+        if not isinstance(ids, list):
+            raise ValidationError({self.ids_param: "Expected a list of ids."})
+        return self.batch_response(self.parse_ids(ids))
+
+
+class ExpandMixin:
+    """
+    ``?expand=event_group.events,modifiers`` inlines the related resources
+    that the viewset's serializer lists in ``expandable``, nested paths
+    included, and adds the ``select_related``/``prefetch_related`` lookups
+    they need to the queryset, so a page costs one query per expanded
+    relation rather than one per row.
+
+    Expanded responses skip conditional GET, as the ETag and
+    ``Last-Modified`` of a row do not follow changes to its relations.
+    """
+
+    expand_param = "expand"
+
+    def expand_tree(self):
+        if not hasattr(self, "_expand_tree"):
+            request = getattr(self, "request", None)
+            value = request.query_params.get(self.expand_param) if request else None
+            self._expand_tree = (
+                parse_expand(value, self.get_serializer_class()) if value else {}
+            )
+        return self._expand_tree
+
+    def use_validators(self):
+        return not self.expand_tree() and super().use_validators()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tree = self.expand_tree()
+        if not tree:
+            return queryset
+        select, prefetch = expand_lookups(self.get_serializer_class(), tree)
+        if select:
+            queryset = queryset.select_related(*select)
+        # Planned lookups go first: a Prefetch with its own queryset may not
+        # follow a plain lookup of the same relation, the other way round is fine.
+        existing = queryset._prefetch_related_lookups
+        return queryset.prefetch_related(None).prefetch_related(*prefetch, *existing)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.expand_tree():
+            context["expand"] = self.expand_tree()
+        return context
+
+
+class BulkWriteMixin:
+    """
+    ``POST bulk-update/`` and ``POST bulk-delete/`` for the rows selected by
+    ``ids`` and/or ``filter`` (the list endpoint's ``filterset_fields``).
+    ``bulk-update/`` also takes a ``patch`` of ``bulk_update_fields``,
+    validated once by the serializer's field validators, as row-level
+    validation cannot apply to a set. See ``api.services.bulk``.
+    """
+
+    bulk_update_fields = ()
+
+    def bulk_queryset(self, request):
+        data = request.data if hasattr(request.data, "get") else {}
+        queryset = self.get_queryset()
+        ids, filters = data.get("ids"), data.get("filter")
+        if ids is None and not filters:
+            raise ValidationError({"detail": "Pass ids and/or a non-empty filter."})
+        if ids is not None:
+            if not isinstance(ids, list):
+                raise ValidationError({"ids": "Expected a list of ids."})
+            queryset = queryset.filter(pk__in=self.parse_ids(ids))
+        if filters:
+            if not isinstance(filters, dict):
+                raise ValidationError({"filter": "Expected an object."})
+            filterset = DjangoFilterBackend().get_filterset_class(self, queryset)(
+                data=filters, queryset=queryset, request=request
+            )
+            # The filterset ignores unknown names, which would widen a delete.
+            unknown = set(filters) - set(filterset.filters)
+            if unknown:
+                raise ValidationError(
+                    {"filter": f"Unknown filters {sorted(unknown)}; expected {sorted(filterset.filters)}."}
+                )
+            if not filterset.is_valid():
+                raise ValidationError({"filter": filterset.errors})
+            queryset = filterset.qs
+        return queryset
+
+    def bulk_values(self, patch):
+        if not isinstance(patch, dict) or not patch:
+            raise ValidationError({"patch": "Expected a non-empty object of field values."})
+        serializer = self.get_serializer()
+        values, errors = {}, {}
+        for name, value in patch.items():
+            field = serializer.fields.get(name)
+            if name not in self.bulk_update_fields or field is None or field.read_only:
+                errors[name] = [f"Expected one of {', '.join(self.bulk_update_fields)}."]
+                continue
+            try:
+                value = field.run_validation(value)
+                validate = getattr(serializer, f"validate_{name}", None)
+                values[field.source] = validate(value) if validate else value
+            except ValidationError as e:
+                errors[name] = e.detail
+        if errors:
+            raise ValidationError({"patch": errors})
+        return values
+
+    def _bulk_response(self, action_name, result):
+        return Response({"meta": {"action": action_name}, "data": result})
+
+    @extend_schema(
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "ids": {"type": "array", "items": {"type": "integer"}},
+                    "filter": {"type": "object"},
+                    "patch": {"type": "object"},
+                },
+                "required": ["patch"],
+            }
+        },
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-update")
+    def bulk_update(self, request, *args, **kwargs):
+        """Apply ``patch`` to the selected rows with one UPDATE; returns the counts."""
+        values = self.bulk_values(request.data.get("patch") if hasattr(request.data, "get") else None)
+        return self._bulk_response(
+            "bulk-update", bulk.bulk_update(self.bulk_queryset(request), values)
+        )
+
+    @extend_schema(
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "ids": {"type": "array", "items": {"type": "integer"}},
+                    "filter": {"type": "object"},
+                },
+            }
+        },
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-delete")
+    def bulk_delete(self, request, *args, **kwargs):
+        """Delete the selected rows; 409 if a restricted or protected relation prevents it."""
+        queryset = self.bulk_queryset(request)
+        try:
+            result = bulk.bulk_delete(queryset)
+        except (ProtectedError, RestrictedError) as e:
+            blocking = sorted({f"{obj._meta.label} {obj.pk}" for obj in e.args[1]})
+            raise Conflict(f"{e.args[0]} Blocked by: {', '.join(blocking[:20])}.")
+        return self._bulk_response("bulk-delete", result)
+
+
+class SnapshotReadMixin:
+    """
+    Reads of ``snapshot_actions``, and of any GET sent with
+    ``X-Read-From: snapshot``, go to the read-only snapshot of api_db (see
+    ``api.services.snapshot``) while it is fresh enough, so full-table
+    counts do not compete with writers. ``X-Read-From: live`` reads the
+    live database regardless. ``meta.snapshot`` of the response says which
+    was read and how old the snapshot is.
+    """
+
+    snapshot_actions = ()
+
+    def use_snapshot(self, request):
+        source = request.headers.get("X-Read-From", "").lower()
+        if request.method not in ("GET", "HEAD") or source == "live":
+            return False
+        action = getattr(self, "action_map", {}).get(request.method.lower())
+        return source == "snapshot" or action in self.snapshot_actions
+
+    def dispatch(self, request, *args, **kwargs):
+        self.reads_snapshot = self.use_snapshot(request)
+        if not self.reads_snapshot:
+            return super().dispatch(request, *args, **kwargs)
+        with snapshot.reading_snapshot():
+            return super().dispatch(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "reads_snapshot", False):
+            meta = getattr(response, "data", None)
+            meta = meta.get("meta") if isinstance(meta, dict) else None
+            if isinstance(meta, dict):
+                meta["snapshot"] = snapshot.snapshot_meta()
+            response["X-Read-From"] = snapshot.snapshot_meta()["source"]
+        return response
+
+
+class RowListMixin:
+    """
+    Lists through the viewset's ``row_encoder`` (see
+    ``api.serializers.rows``): the page is fetched as ``values_list`` rows
+    and encoded without model or serializer instances, into the JSON the
+    serializer would give. Lists the encoder cannot reproduce (expanded,
+    with a format suffix, or a serializer other than the encoder's) and
+    all lists with ``FAST_LIST_ENCODERS`` off use the serializer.
+    """
+
+    row_encoder = None
+
+    def use_row_encoder(self):
+        return (
+            settings.FAST_LIST_ENCODERS
+            and self.row_encoder is not None
+            and not self.format_kwarg
+            and not self.expand_tree()
+            and self.get_serializer_class() is self.row_encoder.serializer_class
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_row_encoder():
+            return super().list(request, *args, **kwargs)
+        rows = self.row_encoder.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.row_encoder.encode(page, request))
+        return Response(self.row_encoder.encode(rows, request))
+
+
+class BaseViewSetMixin(
+    SnapshotReadMixin, BatchGetMixin, ExpandMixin, ConditionalGetMixin, RowListMixin
+):
     """Base mixin that provides common functionality for all viewsets"""
 
     pagination_class = StandardResultsPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, SearchRankOrderingFilter]
 
     @action(detail=False, methods=["get"])
     def metadata(self, request):
@@ -94,7 +643,8 @@ class ReportModifierViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     http_method_names = ["get", "post"]
 
     # Enhanced filtering and search
-    filterset_fields = ["as_at_date", "fx_date"]
+    filterset_fields = ["as_at_date", "fx_date", "year", "quarter", "month", "day"]
+    filterset_class = ReportModifierFilter
     search_fields = ["as_at_date"]
     ordering_fields = ["as_at_date", "fx_date", "id"]
     ordering = ["-as_at_date"]
@@ -112,15 +662,99 @@ class ReportModifierViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
 
         return Response(
             {
-                "meta": {"modifier_id": modifier.id, "reports_count": reports.count()},
+                "meta": {
+                    "modifier_id": modifier.id,
+                    "reports_count": counter("modifier_reports", modifier.id),
+                },
                 "data": serializer.data,
             }
         )
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("as_of", str, description="YYYY-MM-DD (default today)"),
+            OpenApiParameter("reports", str, description="Comma separated report ids (default all)"),
+        ]
+    )
+    @action(detail=False, methods=["get"])
+    def latest(self, request):
+        """
+        The modifier with the latest ``as_at_date`` on or before ``as_of`` of
+        each report, from one query over the modifier date index.
+        """
+        as_of = request.query_params.get("as_of")
+        try:
+            as_of = date.fromisoformat(as_of) if as_of else timezone.localdate()
+        except ValueError:
+            raise ValidationError({"as_of": "Expected a date, YYYY-MM-DD."})
+        links = ReportModifier.reports.through.objects.filter(
+            reportmodifier__as_at_date__lte=as_of
+        )
+        if request.query_params.get("reports"):
+            links = links.filter(
+                report_id__in=self.parse_ids(request.query_params["reports"].split(","))
+            )
+        links = (
+            links.annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=F("report_id"),
+                    order_by=[
+                        F("reportmodifier__as_at_date").desc(),
+                        F("reportmodifier__fx_date").desc(nulls_last=True),
+                        F("reportmodifier_id").desc(),
+                    ],
+                )
+            )
+            .filter(rank=1)
+            .select_related("reportmodifier")
+            .order_by("report_id")
+        )
+        page = self.paginate_queryset(links)
+        data = [
+            {"report": link.report_id, "modifier": ReportModifierSerializer(link.reportmodifier).data}
+            for link in page
+        ]
+        return self.get_paginated_response(data)
+
+    @extend_schema(request=RollForwardSerializer)
+    @action(detail=False, methods=["post"], url_path="roll-forward")
+    def roll_forward(self, request):
+        """
+        Copy a quarter's modifiers ``months`` ahead and link each copy to the
+        valid reports linked to its original, in one transaction; optionally
+        create a pending job per new link.
+        """
+        serializer = RollForwardSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        result = rollforward.roll_forward(
+            from_date=options["from_date"],
+            months=options["months"],
+            report_ids=options.get("reports"),
+            create_jobs=options["create_jobs"],
+        )
+        return Response(
+            {
+                "meta": {
+                    "source_quarter": result["source_quarter"],
+                    "linked": result["linked"],
+                    "jobs": result["jobs"],
+                },
+                "data": result["modifiers"],
+            },
+            status=(
+                status.HTTP_201_CREATED
+                if any(modifier["created"] for modifier in result["modifiers"])
+                else status.HTTP_200_OK
+            ),
+        )
+
 
 class JobViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = Job.objects.select_related("report", "report_modifier")
     serializer_class = JobSerializer
+    row_encoder = JOB_ROWS
     http_method_names = ["get", "post", "patch"]
 
     filterset_fields = ["report", "report_modifier", "fireant_jobid"]
@@ -128,14 +762,291 @@ class JobViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     ordering_fields = ["created", "updated", "fireant_jobid"]
     ordering = ["-created"]
 
+    def _include_archived(self):
+        value = self.request.query_params.get("include_archived", "")
+        return value.lower() in ("1", "true", "yes")
+
+    def _filter_archived_queryset(self):
+        """Apply the list filters to the archive, which cannot join to reports."""
+        queryset = DjangoFilterBackend().filter_queryset(
+            self.request, ArchivedJob.objects.all(), self
+        )
+        for term in SearchFilter().get_search_terms(self.request):
+            report_ids = Report.objects.filter(name__icontains=term).values_list(
+                "id", flat=True
+            )
+            queryset = queryset.filter(
+                Q(fireant_jobid__icontains=term) | Q(report__in=list(report_ids))
+            )
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="include_archived",
+                type=bool,
+                description="Also list jobs moved to the archive database",
+            )
+        ]
+    )
+    def list_validators(self):
+        if not self._include_archived():
+            return super().list_validators()
+        live = self.list_state(self.filter_queryset(self.get_queryset()))
+        archived = self.list_state(self._filter_archived_queryset())
+        latest = max((state[1] for state in (live, archived) if state[1]), default=None)
+        return self.validators((live, archived), latest)
+
+    def batch_objects(self, ids):
+        found = super().batch_objects(ids)
+        if self._include_archived():
+            found.update(ArchivedJob.objects.in_bulk([i for i in ids if i not in found]))
+        return found
+
+    def batch_validators(self, ids):
+        if not self._include_archived():
+            return super().batch_validators(ids)
+        live = self.list_state(self.batch_queryset(ids))
+        archived = self.list_state(ArchivedJob.objects.filter(pk__in=ids))
+        latest = max((state[1] for state in (live, archived) if state[1]), default=None)
+        return self.validators((live, archived), latest)
+
+    def list(self, request, *args, **kwargs):
+        if not self._include_archived() or self.requested_ids() is not None:
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            request, self.list_validators(), lambda: self._list_with_archive(request)
+        )
+
+    def _list_with_archive(self, request):
+        live = self.filter_queryset(self.get_queryset())
+        ordering = OrderingFilter().get_ordering(request, live, self) or []
+        ordering = [*ordering, "-id" if ordering[:1] and ordering[0][0] == "-" else "id"]
+        merged = MergedQuerySets([live, self._filter_archived_queryset()], ordering)
+        if "after" in request.query_params:
+            return self._list_after(request, merged)
+
+        page = self.paginate_queryset(merged)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def _list_after(self, request, merged):
+        """
+        The page following the job ``?after=<id>`` (live or archived): a
+        keyset page, costing the same however deep it is, where page
+        numbers read every row before the page. Follow ``links.next``.
+        """
+        try:
+            after = int(request.query_params["after"])
+        except ValueError:
+            raise ValidationError({"after": "Expected a job id."})
+        row = Job.objects.filter(pk=after).first() or ArchivedJob.objects.filter(pk=after).first()
+        if row is None:
+            raise NotFound(f"Not found: job {after}.")
+        page_size = self.paginator.get_page_size(request)
+        rows = merged.after(row, page_size + 1)
+        page, has_next = rows[:page_size], len(rows) > page_size
+        serializer = self.get_serializer(page, many=True)
+        next_link = None
+        if has_next:
+            next_link = replace_query_param(request.build_absolute_uri(), "after", page[-1].id)
+        return Response(
+            {
+                "meta": {"pagination": {"after": after, "per_page": page_size, "has_next": has_next}},
+                "links": {"next": next_link, "previous": None},
+                "data": serializer.data,
+            }
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not self._include_archived():
+                raise
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        instance = ArchivedJob.objects.filter(pk=lookup).first()
+        if instance is None:
+            raise Http404
+        return self.conditional_response(
+            request,
+            self.validators(("archived", instance.updated), instance.updated),
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def _job_id(self, pk):
+        """The id of a live or archived job."""
+        try:
+            job_id = int(pk)
+        except ValueError:
+            raise Http404
+        if not (
+            Job.objects.filter(pk=job_id).exists()
+            or ArchivedJob.objects.filter(pk=job_id).exists()
+        ):
+            raise Http404
+        return job_id
+
+    def _results(self, pk):
+        results = JobResults(self._job_id(pk))
+        if not results.exists():
+            raise NotFound(f"No results stored for job {results.job_id}.")
+        return results
+
+    def _int_param(self, name, default, minimum=0, maximum=None):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except ValueError:
+            raise ValidationError({name: "Expected an integer."})
+        if value < minimum:
+            raise ValidationError({name: f"Must be at least {minimum}."})
+        if maximum is not None and value > maximum:
+            raise ValidationError({name: f"Must be at most {maximum}."})
+        return value
+
+    def _level(self):
+        level = self.request.query_params.get("level", "event")
+        if level not in LEVELS:
+            raise ValidationError({"level": f"Expected one of {', '.join(LEVELS)}."})
+        return level
+
+    @extend_schema(
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }
+        },
+    )
+    @action(
+        detail=True,
+        methods=["get", "post"],
+        url_path="results",
+        parser_classes=[MultiPartParser],
+    )
+    def results(self, request, pk=None):
+        """
+        GET: summary of the job's stored loss results. POST: store results
+        from a CSV or NPZ file with event_id, loss and optional location_id
+        columns, replacing previous ones. Location rows are trimmed to the
+        report's breakout caps when it has is_location_breakout set.
+        """
+        if request.method == "GET":
+            results = self._results(pk)
+            return Response({"meta": {"job_id": results.job_id}, "data": results.meta})
+
+        job_id = self._job_id(pk)
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "A CSV or NPZ file is required."})
+        report_id = (
+            Job.objects.filter(pk=job_id).values_list("report", flat=True).first()
+            or ArchivedJob.objects.filter(pk=job_id).values_list("report", flat=True).first()
+        )
+        caps = report_caps(Report.objects.filter(pk=report_id).first())
+        try:
+            summary = ingest_job_results(job_id, upload, upload.name, caps=caps)
+        except ValueError as e:
+            raise ValidationError({"file": str(e)})
+        return Response(
+            {"meta": {"job_id": job_id}, "data": summary}, status=status.HTTP_201_CREATED
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("k", int, description="Number of rows (default 100, at most JOB_RESULTS_MAX_ROWS)"),
+            OpenApiParameter("level", str, enum=LEVELS),
+            OpenApiParameter("event_id", int, description="Location level: only this event"),
+        ]
+    )
+    @action(detail=True, methods=["get"], url_path="results/top")
+    def results_top(self, request, pk=None):
+        """The largest event or location losses of the job."""
+        results = self._results(pk)
+        k = self._int_param("k", 100, maximum=settings.JOB_RESULTS_MAX_ROWS)
+        level = self._level()
+        event_id = request.query_params.get("event_id")
+        if event_id is not None:
+            event_id = self._int_param("event_id", None)
+        try:
+            rows = results.top(k, level, event_id)
+        except ValueError as e:
+            raise ValidationError({"level": str(e)})
+        return Response(
+            {"meta": {"job_id": results.job_id, "level": level, "k": k}, "data": rows}
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("threshold", float, required=True),
+            OpenApiParameter("level", str, enum=LEVELS),
+            OpenApiParameter("limit", int, description="Rows to return (default 1000, at most JOB_RESULTS_MAX_ROWS)"),
+        ]
+    )
+    @action(detail=True, methods=["get"], url_path="results/above")
+    def results_above(self, request, pk=None):
+        """Losses of at least ``threshold``, largest first, and how many there are."""
+        results = self._results(pk)
+        try:
+            threshold = float(request.query_params["threshold"])
+        except (KeyError, ValueError):
+            raise ValidationError({"threshold": "A number is required."})
+        limit = self._int_param("limit", 1000, maximum=settings.JOB_RESULTS_MAX_ROWS)
+        level = self._level()
+        try:
+            count, rows = results.above(threshold, level, limit)
+        except ValueError as e:
+            raise ValidationError({"level": str(e)})
+        return Response(
+            {
+                "meta": {
+                    "job_id": results.job_id,
+                    "level": level,
+                    "threshold": threshold,
+                    "count": count,
+                    "returned": len(rows),
+                },
+                "data": rows,
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("other", int, required=True, description="Job to compare with"),
+            OpenApiParameter("k", int, description="Largest changes to list (default 100, at most JOB_RESULTS_MAX_ROWS)"),
+        ]
+    )
+    @action(detail=True, methods=["get"], url_path="results/compare")
+    def results_compare(self, request, pk=None):
+        """Event loss differences between this job and ``other`` (other minus this)."""
+        results = self._results(pk)
+        if "other" not in request.query_params:
+            raise ValidationError({"other": "A job id is required."})
+        other = self._results(self._int_param("other", None))
+        k = self._int_param("k", 100, maximum=settings.JOB_RESULTS_MAX_ROWS)
+        return Response(
+            {
+                "meta": {"job_id": results.job_id, "other_job_id": other.job_id, "k": k},
+                "data": results.compare(other, k),
+            }
+        )
+
 
-class EventViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class EventViewSet(BaseViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
-    http_method_names = ["get"]
+    row_encoder = EVENT_ROWS
+    # POST for batch-get/ only; events are created through their typed endpoints.
+    http_method_names = ["get", "post"]
 
     filterset_fields = ["is_valid", "zone"]
-    search_fields = ["name", "description", "zone"]
+    # The columns of events_fts; place is the geo event's region names.
+    search_fields = [
+        "name", "description", "zone",
+        "geoevent__country", "geoevent__area", "geoevent__subarea", "geoevent__subarea2",
+    ]
+    search_fts_table = "events_fts"
     ordering_fields = ["name", "zone", "id"]
     ordering = ["name"]
 
@@ -150,7 +1061,7 @@ class EventViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
 
         return Response(
             {
-                "meta": {"event_id": event.id, "groups_count": groups.count()},
+                "meta": {"event_id": event.id, "groups_count": counter("event_groups", event.id)},
                 "data": serializer.data,
             }
         )
@@ -160,6 +1071,7 @@ class EventGroupViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = EventGroup.objects.prefetch_related("events")
     serializer_class = EventGroupSerializer
     http_method_names = ["get", "post", "patch", "delete"]
+    etag_fields = ["content_hash"]
 
     search_fields = ["name"]
     ordering_fields = ["name", "created", "updated"]
@@ -180,41 +1092,216 @@ class EventGroupViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
             {
                 "meta": {
                     "event_group_id": event_group.id,
-                    "reports_count": reports.count(),
+                    "reports_count": counter("group_reports", event_group.id),
                 },
                 "data": serializer.data,
             }
         )
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("radius", float, description="Overlap distance in km (at most OVERLAP_MAX_RADIUS_KM)"),
+            OpenApiParameter("max_pairs", int, description="Pairs to list (default 1000, at most OVERLAP_MAX_PAIRS)"),
+        ]
+    )
+    @action(detail=True, methods=["get"])
+    def overlaps(self, request, pk=None):
+        """
+        Ring events of this group whose centres are closer than ``radius`` km,
+        and the clusters they form. ``radius`` defaults to the largest
+        ``no_overlap_radius`` of the reports using the group.
+        """
+        event_group = self.get_object()
+        try:
+            radius = request.query_params.get("radius")
+            radius = float(radius) if radius is not None else default_radius(event_group)
+            max_pairs = int(request.query_params.get("max_pairs", 1000))
+        except ValueError:
+            raise ValidationError({"detail": "radius must be a number and max_pairs an integer."})
+        if radius is None:
+            raise ValidationError(
+                {"radius": "No report uses this group; pass radius explicitly."}
+            )
+        if not math.isfinite(radius) or radius < 0 or max_pairs < 0:
+            raise ValidationError({"detail": "radius and max_pairs must be finite and not negative."})
+        # Pairs grow with the square of the radius; both bound the work.
+        if radius > settings.OVERLAP_MAX_RADIUS_KM:
+            raise ValidationError({"radius": f"At most {settings.OVERLAP_MAX_RADIUS_KM} km."})
+        if max_pairs > settings.OVERLAP_MAX_PAIRS:
+            raise ValidationError({"max_pairs": f"At most {settings.OVERLAP_MAX_PAIRS}."})
+
+        result = event_group_overlaps(event_group, radius, max_pairs)
+        return Response(
+            {
+                "meta": {
+                    "event_group_id": event_group.id,
+                    "radius_km": radius,
+                    "rings": result["rings"],
+                    "overlapping_pairs": result["pair_count"],
+                    "clusters": len(result["clusters"]),
+                },
+                "data": {
+                    "clusters": result["clusters"],
+                    "pairs": result["pairs"],
+                },
+            }
+        )
+
+
+# Geometry is left out: it feeds geometry hashes, regions and the R*Tree.
+EVENT_BULK_UPDATE_FIELDS = ("name", "description", "is_valid")
+
 
-class RingEventViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class RingEventViewSet(BulkWriteMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = RingEvent.objects.all()
     serializer_class = RingEventSerializer
     http_method_names = ["get", "post", "patch", "delete"]
+    # ?bbox=min_lon,min_lat,max_lon,max_lat and ?near=lat,lon&within_km=
+    filter_backends = BaseViewSetMixin.filter_backends + [SpatialFilter]
 
     filterset_fields = ["is_valid", "zone"]
     search_fields = ["name", "description", "zone"]
+    search_fts_table = "events_fts"
+    bulk_update_fields = EVENT_BULK_UPDATE_FIELDS
     ordering_fields = ["name", "latitude", "longitude", "radius"]
     ordering = ["name"]
 
 
-class BoxEventViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class BoxEventViewSet(BulkWriteMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = BoxEvent.objects.all()
     serializer_class = BoxEventSerializer
     http_method_names = ["get", "post", "patch", "delete"]
+    # ?bbox=min_lon,min_lat,max_lon,max_lat and ?near=lat,lon&within_km=
+    filter_backends = BaseViewSetMixin.filter_backends + [SpatialFilter]
 
     filterset_fields = ["is_valid", "zone"]
     search_fields = ["name", "description", "zone"]
+    search_fts_table = "events_fts"
+    bulk_update_fields = EVENT_BULK_UPDATE_FIELDS
     ordering_fields = ["name", "max_lat", "min_lat", "max_lon", "min_lon"]
     ordering = ["name"]
 
 
-class GeoEventViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class GeoEventViewSet(BulkWriteMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = GeoEvent.objects.all()
     serializer_class = GeoEventSerializer
     http_method_names = ["get", "post", "patch", "delete"]
 
-    filterset_fields = ["is_valid", "country", "area", "subarea"]
-    search_fields = ["name", "description", "country", "area", "subarea"]
+    filterset_fields = ["is_valid", "country", "area", "subarea", "region"]
+    search_fields = ["name", "description", "zone", "country", "area", "subarea", "subarea2"]
+    search_fts_table = "events_fts"
+    bulk_update_fields = EVENT_BULK_UPDATE_FIELDS
     ordering_fields = ["name", "country", "area"]
     ordering = ["country", "name"]
+
+
+class RegionViewSet(BaseViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    The country > area > subarea > subarea2 hierarchy of geo events, kept in
+    sync as geo events are written. Subtree queries use one range scan of
+    the region path index.
+    """
+
+    queryset = Region.objects.all()
+    serializer_class = RegionSerializer
+    # Regions are created and deleted, never changed.
+    last_modified_field = None
+
+    filterset_fields = ["level", "parent"]
+    search_fields = ["name"]
+    ordering_fields = ["name", "level", "path"]
+    ordering = ["path"]
+
+    def _with_event_counts(self, regions, events):
+        """Serialize same-level ``regions`` with the number of ``events`` under each."""
+        regions = list(regions)
+        if not regions:
+            return []
+        level = regions[0].level
+        counts = {}
+        for path, count in (
+            events.values_list("region__path").annotate(count=Count("pk")).order_by()
+        ):
+            # Roll deeper regions up to the listed level.
+            ancestor = SEPARATOR.join(path.split(SEPARATOR)[:level])
+            counts[ancestor] = counts.get(ancestor, 0) + count
+        return [
+            {**RegionSerializer(region).data, "events": counts.get(region.path, 0)}
+            for region in regions
+        ]
+
+    @action(detail=False, methods=["get"])
+    def roots(self, request):
+        """Countries with the number of geo events in each."""
+        regions = Region.objects.filter(level=1).order_by("name")
+        return Response(
+            {
+                "meta": {"count": len(regions)},
+                "data": self._with_event_counts(
+                    regions, GeoEvent.objects.filter(region__isnull=False)
+                ),
+            }
+        )
+
+    @action(detail=True, methods=["get"])
+    def children(self, request, pk=None):
+        """The sub-regions of a region, with the number of geo events under each."""
+        region = self.get_object()
+        children = region.children.order_by("name")
+        return Response(
+            {
+                "meta": {"region": RegionSerializer(region).data, "count": len(children)},
+                "data": self._with_event_counts(
+                    children,
+                    GeoEvent.objects.filter(**subtree_filter(region.path, "region__path")),
+                ),
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("q", str, required=True, description="Name prefix"),
+            OpenApiParameter("level", int, description="1=country, 2=area, 3=subarea, 4=subarea2"),
+            OpenApiParameter("parent", int),
+            OpenApiParameter("limit", int, description="Maximum results (default 10, max 50)"),
+        ]
+    )
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """Regions whose name starts with ``q`` (case-insensitive)."""
+        prefix = request.query_params.get("q", "").strip().lower()
+        if not prefix:
+            raise ValidationError({"q": "A name prefix is required."})
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), 50)
+            level = request.query_params.get("level")
+            parent = request.query_params.get("parent")
+            filters = {}
+            if level:
+                filters["level"] = int(level)
+            if parent:
+                filters["parent"] = int(parent)
+        except ValueError:
+            raise ValidationError({"detail": "limit, level and parent must be integers."})
+
+        regions = Region.objects.filter(
+            name_key__gte=prefix, name_key__lt=prefix + "\U0010ffff", **filters
+        ).order_by("level", "name_key")[: max(limit, 0)]
+        return Response(
+            {
+                "meta": {"q": prefix, "count": len(regions)},
+                "data": RegionSerializer(regions, many=True).data,
+            }
+        )
+
+    @action(detail=True, methods=["get"])
+    def events(self, request, pk=None):
+        """All geo events in the region or any of its sub-regions."""
+        region = self.get_object()
+        events = GeoEvent.objects.filter(
+            **subtree_filter(region.path, "region__path")
+        ).order_by("region__path", "name")
+        page = self.paginate_queryset(events)
+        return self.get_paginated_response(
+            GeoEventSerializer(page, many=True, context={"request": request}).data
+        )
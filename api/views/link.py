@@ -1,35 +1,71 @@
+import json
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework.viewsets import ViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
+from rest_framework.reverse import reverse
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db import transaction
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from django.db import router, transaction
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from api.serializers import (
     LinkMultipleReportsToModifiersIn,
     LinkMultipleReportsToModifiersOut,
     LinkReportToModifierSerializerIn,
     LinkReportToModifierSerializerOut,
+    LinkTaskSerializer,
 )
 from api.models import (
+    LinkTask,
     Report,
     ReportModifier,
 )
+from api.exceptions import ServiceUnavailable
+from api.services.counters import counter, table_rows
+from api.services.links import encode_runs, link_combinations, link_pairs, missing_ids
+from api.tasks import link_reports
+from .core import SnapshotReadMixin
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
 
+logger = logging.getLogger(__name__)
+
+
+def matrix_pairs(pairs, summary):
+    """Ordered ``(report_id, modifier_id)`` pairs as JSON rows, counted into ``summary``."""
+    last_report = None
+    for report_id, modifier_id in pairs:
+        summary["links"] += 1
+        summary["reports"] += report_id != last_report
+        last_report = report_id
+        yield f"[{report_id},{modifier_id}]"
+
+
+def matrix_runs(pairs, summary):
+    """Ordered pairs as one JSON row of modifier id runs per report, counted into ``summary``."""
+    for report_id, runs in encode_runs(pairs):
+        summary["links"] += sum(length for _, length in runs)
+        summary["reports"] += 1
+        yield f"[{report_id},{json.dumps(runs, separators=(',', ':'))}]"
 
-class LinkModifierViewSet(ViewSet):
+
+class LinkModifierViewSet(SnapshotReadMixin, ViewSet):
     """
     ViewSet for managing relationships between Reports and ReportModifiers.
 
     This provides operations to link/unlink reports and modifiers in various ways.
     """
 
+    snapshot_actions = ("summary",)
+
     @extend_schema(
         request=LinkReportToModifierSerializerIn,
         responses={
@@ -99,34 +135,80 @@ class LinkModifierViewSet(ViewSet):
         request=LinkMultipleReportsToModifiersIn,
         responses={
             200: LinkMultipleReportsToModifiersOut,
+            202: LinkTaskSerializer,
             400: OpenApiResponse(description="Invalid input"),
             404: OpenApiResponse(description="Report or modifier not found"),
+            503: OpenApiResponse(description="The background task could not be queued"),
         },
         operation_id="link_multiple_reports_modifiers",
     )
     @action(detail=False, methods=["post"], url_path="multiple")
     def multiple(self, request):
-        """Link multiple reports to multiple modifiers (creates all combinations)."""
+        """
+        Link multiple reports to multiple modifiers (creates all combinations).
+
+        Above ``LINK_ASYNC_THRESHOLD`` combinations the links are made in the
+        background and the response (202) links to the task's progress. If
+        the task cannot be queued, it is marked failed and the response is a
+        503.
+        """
         serializer = LinkMultipleReportsToModifiersIn(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        reports = serializer.validated_data["reports"]
-        modifiers = serializer.validated_data["modifiers"]
+        reports = list(dict.fromkeys(serializer.validated_data["reports"]))
+        modifiers = list(dict.fromkeys(serializer.validated_data["modifiers"]))
+        missing = missing_ids(reports, modifiers)
+        if missing:
+            raise NotFound(
+                "Not found: "
+                + "; ".join(f"{name} {', '.join(map(str, ids))}" for name, ids in missing.items())
+                + "."
+            )
+        total = len(reports) * len(modifiers)
 
-        linked_count = 0
-        already_linked_count = 0
+        if total > settings.LINK_ASYNC_THRESHOLD:
+            link_task = LinkTask.objects.create(reports=reports, modifiers=modifiers, total=total)
+            failures = []
 
-        with transaction.atomic():
-            for r in reports:
-                for m in modifiers:
-                    this_report = get_object_or_404(Report, id=r)
-                    this_modifier = get_object_or_404(ReportModifier, id=m)
+            def enqueue():
+                try:
+                    link_reports.delay(link_task.pk)
+                except Exception as e:
+                    # E.g. the broker is down; the task would stay pending forever.
+                    logger.error(f"Could not queue link task {link_task.pk}: {e}")
+                    LinkTask.objects.filter(pk=link_task.pk).update(
+                        status=LinkTask.FAILED,
+                        error=f"Could not queue the task: {e}",
+                        finished=timezone.now(),
+                    )
+                    failures.append(e)
+
+            # Runs at once outside a transaction; inside one, a failure is
+            # reported by the task's status instead.
+            transaction.on_commit(enqueue, using=router.db_for_write(LinkTask))
+            if failures:
+                raise ServiceUnavailable(
+                    f"Could not queue link task {link_task.pk}; try again later."
+                )
+            url = reverse("api:link-modifier-task", kwargs={"task_id": link_task.pk}, request=request)
+            return Response(
+                {
+                    "meta": {
+                        "status": "accepted",
+                        "message": f"Linking {len(reports)} reports with {len(modifiers)} modifiers in the background",
+                        "timestamp": timezone.now().isoformat(),
+                        "links": {"task": url},
+                    },
+                    "data": LinkTaskSerializer(link_task).data,
+                },
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Location": url},
+            )
 
-                    if this_report.modifiers.filter(id=m).exists():
-                        already_linked_count += 1
-                    else:
-                        this_report.modifiers.add(this_modifier)
-                        linked_count += 1
+        with transaction.atomic(using=router.db_for_write(ReportModifier)):
+            stats = link_combinations(reports, modifiers, settings.LINK_CHUNK_SIZE)
+        linked_count = stats["linked"]
+        already_linked_count = stats["already_linked"]
 
         return Response(
             {
@@ -135,7 +217,7 @@ class LinkModifierViewSet(ViewSet):
                     "message": f"Processed {len(reports)} reports with {len(modifiers)} modifiers",
                     "timestamp": timezone.now().isoformat(),
                     "statistics": {
-                        "total_combinations": len(reports) * len(modifiers),
+                        "total_combinations": total,
                         "newly_linked": linked_count,
                         "already_linked": already_linked_count,
                     },
@@ -151,17 +233,80 @@ class LinkModifierViewSet(ViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @extend_schema(responses={200: LinkTaskSerializer, 404: OpenApiResponse(description="Task not found")})
+    @action(detail=False, methods=["get"], url_path=r"tasks/(?P<task_id>\d+)")
+    def task(self, request, task_id=None):
+        """Progress and, once finished, statistics of a background link task."""
+        link_task = get_object_or_404(LinkTask, pk=task_id)
+        return Response(
+            {
+                "meta": {
+                    "endpoint": "link_task",
+                    "timestamp": timezone.now().isoformat(),
+                },
+                "data": LinkTaskSerializer(link_task).data,
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("encoding", str, enum=["pairs", "runs"]),
+            OpenApiParameter("peril", str, description="Comma separated perils"),
+            OpenApiParameter("as_at_from", str, description="Modifiers with as_at_date on or after, YYYY-MM-DD"),
+            OpenApiParameter("as_at_to", str, description="Modifiers with as_at_date on or before, YYYY-MM-DD"),
+        ],
+        responses={200: OpenApiResponse(description="Streamed JSON")},
+    )
+    @action(detail=False, methods=["get"])
+    def matrix(self, request):
+        """
+        Every report-modifier link, streamed from one query, as
+        ``[report_id, modifier_id]`` pairs or, with ``encoding=runs``, as
+        ``[report_id, [[first_modifier_id, count], ...]]`` per report.
+        Totals follow the data in ``summary``.
+        """
+        params = request.query_params
+        encoding = params.get("encoding", "pairs")
+        if encoding not in ("pairs", "runs"):
+            raise ValidationError({"encoding": "Expected pairs or runs."})
+        filters = {"perils": [p for p in params.get("peril", "").split(",") if p]}
+        for name in ("as_at_from", "as_at_to"):
+            try:
+                filters[name] = date.fromisoformat(params[name]) if params.get(name) else None
+            except ValueError:
+                raise ValidationError({name: "Expected a date, YYYY-MM-DD."})
+        meta = {
+            "endpoint": "link_matrix",
+            "encoding": encoding,
+            "filters": {key: value for key, value in filters.items() if value},
+            "timestamp": timezone.now().isoformat(),
+        }
+
+        summary = {"reports": 0, "links": 0}
+        encode = matrix_runs if encoding == "runs" else matrix_pairs
+        rows = encode(link_pairs(**filters), summary)
+
+        def stream():
+            parts = ['{"meta": %s, "data": [' % json.dumps(meta, default=str)]
+            separator = "\n"
+            for row in rows:
+                parts.append(separator + row)
+                separator = ",\n"
+                if len(parts) >= 1000:
+                    yield "".join(parts)
+                    parts = []
+            parts.append('\n], "summary": %s}\n' % json.dumps(summary))
+            yield "".join(parts)
+
+        return StreamingHttpResponse(stream(), content_type="application/json")
+
     @action(detail=False, methods=["get"])
     def summary(self, request):
         """Get summary statistics about report-modifier relationships."""
-        total_reports = Report.objects.count()
-        total_modifiers = ReportModifier.objects.count()
-        reports_with_modifiers = (
-            Report.objects.filter(modifiers__isnull=False).distinct().count()
-        )
-        modifiers_with_reports = (
-            ReportModifier.objects.filter(reports__isnull=False).distinct().count()
-        )
+        total_reports = table_rows(Report)
+        total_modifiers = table_rows(ReportModifier)
+        reports_with_modifiers = counter("linked_reports")
+        modifiers_with_reports = counter("linked_modifiers")
 
         return Response(
             {
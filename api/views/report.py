@@ -5,6 +5,7 @@ from api.serializers import (
     ReportWithModifierSerializer,
     ReportWithModifiersListSerializer,
     EventGroupSerializer,
+    REPORT_ROWS,
 )
 from api.models import Report, ReportModifier
 from rest_framework import viewsets, status
@@ -19,27 +20,47 @@ from drf_spectacular.utils import (
     OpenApiResponse,
     OpenApiExample,
 )
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from django.utils import timezone
-from .core import BaseViewSetMixin
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
+from api.services.counters import counter, counter_values, table_rows
+from api.services.schedule import simulate_report_schedules
+from api.services.dynamic_rings import (
+    create_ring_event_group,
+    read_location_losses,
+    report_dynamic_rings,
+)
+from rest_framework.parsers import MultiPartParser
+from .core import BaseViewSetMixin, BulkWriteMixin
 
 
-class ReportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class ReportViewSet(BulkWriteMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = Report.objects.select_related("event_group").prefetch_related(
         "modifiers", "jobs"
     )
     serializer_class = ReportSerializer
+    row_encoder = REPORT_ROWS
     http_method_names = ["get", "post", "patch", "put", "delete"]
+    etag_fields = ['config_hash']
+    snapshot_actions = ('summary',)
     
     # Enhanced filtering and search
     filterset_fields = ['peril', 'is_valid', 'event_group', 'priority', 'loss_perspective']
     search_fields = ['name', 'peril', 'event_group__name']
+    search_fts_table = 'reports_fts'
+    # Everything but the name, timestamps, hash and modifier links.
+    bulk_update_fields = (
+        'peril', 'dr', 'event_group', 'cron', 'cob', 'loss_perspective',
+        'is_apply_calibration', 'is_apply_inflation', 'is_tag_outwards_ptns',
+        'is_location_breakout', 'is_ignore_missing_lat_lon',
+        'location_breakout_max_events', 'location_breakout_max_locations',
+        'priority', 'ncores', 'gross_node_id', 'net_node_id', 'rollup_context_id',
+        'dynamic_ring_loss_threshold', 'blast_radius', 'no_overlap_radius', 'is_valid',
+    )
     ordering_fields = ['name', 'peril', 'created', 'updated', 'priority']
     ordering = ['-created']
 
-    def get_queryset(self):
-        return self.queryset
-
     @extend_schema(
         request=ReportSerializer,
         responses={
@@ -154,7 +175,7 @@ class ReportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         return Response({
             'meta': {
                 'report_id': report.id,
-                'modifiers_count': modifiers.count(),
+                'modifiers_count': counter('report_modifiers', report.id),
                 'links': {
                     'report': f"{request.build_absolute_uri('/').rstrip('/')}/api/reports/{report.id}/",
                 }
@@ -210,7 +231,7 @@ class ReportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         return Response({
             'meta': {
                 'report_id': report.id,
-                'jobs_count': jobs.count(),
+                'jobs_count': counter('report_jobs', report.id),
                 'links': {
                     'report': f"{request.build_absolute_uri('/').rstrip('/')}/api/reports/{report.id}/",
                 }
@@ -221,11 +242,16 @@ class ReportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def summary(self, request):
         """Get summary statistics about reports."""
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        total_reports = queryset.count()
-        valid_reports = queryset.filter(is_valid=True).count()
-        perils = queryset.values_list('peril', flat=True).distinct()
+        if set(request.query_params) - {'format'}:
+            queryset = self.filter_queryset(self.get_queryset())
+            total_reports = queryset.count()
+            valid_reports = queryset.filter(is_valid=True).count()
+            perils = list(queryset.values_list('peril', flat=True).distinct())
+        else:
+            # Unfiltered: the counters kept by triggers, no table scans.
+            total_reports = table_rows(Report)
+            valid_reports = counter('valid_reports')
+            perils = sorted(counter_values('peril_reports'))
         
         return Response({
             'meta': {
@@ -236,7 +262,138 @@ class ReportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
                 'total_reports': total_reports,
                 'valid_reports': valid_reports,
                 'invalid_reports': total_reports - valid_reports,
-                'unique_perils': list(perils),
+                'unique_perils': perils,
                 'perils_count': len(perils)
             }
         })
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="start", type=str, description="Window start (ISO datetime, default now)"),
+            OpenApiParameter(name="days", type=int, description="Window length in days (default 91)"),
+            OpenApiParameter(name="capacity", type=int, description="Cluster capacity in cores"),
+            OpenApiParameter(name="bucket", type=int, description="Timeline bucket size in minutes (default 60)"),
+            OpenApiParameter(name="timeline", type=bool, description="Include the bucketed demand timeline"),
+        ],
+        operation_id="reports_schedule_simulation",
+    )
+    @action(detail=False, methods=["get"], url_path="schedule-simulation")
+    def schedule_simulation(self, request):
+        """Simulate the core demand of the (filtered) scheduled reports over a window."""
+        params = request.query_params
+        start = timezone.now()
+        if params.get("start"):
+            start = parse_datetime(params["start"])
+            if start is None:
+                raise ValidationError({"start": "Invalid ISO datetime."})
+        try:
+            days = int(params.get("days", 91))
+            bucket = int(params.get("bucket", 60))
+            capacity = int(params["capacity"]) if params.get("capacity") else None
+        except ValueError:
+            raise ValidationError("days, bucket and capacity must be integers.")
+        if days < 1 or bucket < 1:
+            raise ValidationError("days and bucket must be positive.")
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if "is_valid" not in params:
+            queryset = queryset.filter(is_valid=True)
+        try:
+            simulation = simulate_report_schedules(
+                queryset, start, start + timedelta(days=days), capacity=capacity
+            )
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+        include_timeline = params.get("timeline", "").lower() in ("1", "true", "yes")
+        return Response({
+            'meta': {
+                'endpoint': 'reports_schedule_simulation',
+                'generated_at': timezone.now().isoformat()
+            },
+            'data': simulation.to_dict(
+                include_timeline=include_timeline, bucket_minutes=bucket
+            )
+        })
+
+    @extend_schema(
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary"},
+                    "threshold": {"type": "number"},
+                    "blast_radius": {"type": "number"},
+                    "no_overlap_radius": {"type": "number"},
+                    "grid_km": {"type": "number"},
+                    "name": {"type": "string"},
+                    "assign": {"type": "boolean"},
+                    "dry_run": {"type": "boolean"},
+                },
+                "required": ["file"],
+            }
+        },
+        responses={
+            200: OpenApiResponse(description="Dry run: the rings that would be created"),
+            201: OpenApiResponse(description="Event group created"),
+            400: OpenApiResponse(description="Invalid file or parameters"),
+        },
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="dynamic-rings",
+        parser_classes=[MultiPartParser],
+    )
+    def dynamic_rings(self, request, pk=None):
+        """
+        Generate dynamic rings from a location loss table (CSV or NPZ with
+        latitude, longitude and loss columns) using the report's
+        dynamic_ring_loss_threshold, blast_radius and no_overlap_radius, and
+        store them in a new event group. ``assign`` makes the report use it.
+        """
+        report = self.get_object()
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "A CSV or NPZ file is required."})
+        overrides = {}
+        for name in ("threshold", "blast_radius", "no_overlap_radius", "grid_km"):
+            if request.data.get(name) not in (None, ""):
+                try:
+                    overrides[name] = float(request.data[name])
+                except ValueError:
+                    raise ValidationError({name: "Expected a number."})
+        flags = {
+            name: str(request.data.get(name, "")).lower() in ("1", "true", "yes")
+            for name in ("assign", "dry_run")
+        }
+
+        try:
+            rings = report_dynamic_rings(
+                report, *read_location_losses(upload, upload.name), **overrides
+            )
+        except ValueError as e:
+            raise ValidationError({"detail": str(e)})
+
+        result = rings.to_dict()
+        meta = {
+            'report_id': report.id,
+            'locations': result['locations'],
+            'cells': result['cells'],
+            'candidates': result['candidates'],
+            'rings': len(result['rings']),
+            'generated_at': timezone.now().isoformat(),
+        }
+        if flags["dry_run"]:
+            return Response({'meta': meta, 'data': result['rings']})
+
+        group = create_ring_event_group(
+            report, rings, name=request.data.get("name") or None, assign=flags["assign"]
+        )
+        return Response(
+            {
+                'meta': {**meta, 'assigned': flags["assign"]},
+                'data': EventGroupSerializer(group, context={'request': request}).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
@@ -2,15 +2,30 @@ class ApiDatabaseRouter:
     """
     A router to direct database operations for the 'api' app to the 'api' database,
     while other apps (like auth, sessions) use the 'default' database.
+
+    Archive models of the 'api' app (see ARCHIVE_MODELS) live in the 'archive_db'
+    database instead, keeping the live tables in 'api_db' small.
+
+    Views that read from the snapshot of 'api_db' (see api.services.snapshot)
+    have their reads of the other 'api' models sent to 'api_snapshot'.
     """
 
+    ARCHIVE_MODELS = {"archivedjob"}
+
+    def _is_archive(self, app_label, model_name):
+        return app_label == "api" and model_name in self.ARCHIVE_MODELS
+
     def db_for_read(self, model, **hints):
         """
         Direct read operations for 'api' app models to the 'api' database.
         All other apps use the 'default' database.
         """
+        if self._is_archive(model._meta.app_label, model._meta.model_name):
+            return "archive_db"
         if model._meta.app_label == "api":
-            return "api_db"
+            from api.services.snapshot import read_alias
+
+            return read_alias() or "api_db"
         elif model._meta.app_label == "reference":
             return "reference_db"
         return "default"
@@ -20,6 +35,8 @@ class ApiDatabaseRouter:
         Direct write operations for 'api' app models to the 'api' database.
         All other apps use the 'default' database.
         """
+        if self._is_archive(model._meta.app_label, model._meta.model_name):
+            return "archive_db"
         if model._meta.app_label == "api":
             return "api_db"
 
@@ -32,7 +49,7 @@ class ApiDatabaseRouter:
         Allow relationships only between models in the same database.
         Prevents cross-database relationships unless explicitly allowed.
         """
-        db_list = ("default", "api_db", "reference_db")
+        db_list = ("default", "api_db", "reference_db", "archive_db")
         if obj1._state.db in db_list and obj2._state.db in db_list:
             return obj1._state.db == obj2._state.db
         return None
@@ -41,7 +58,12 @@ class ApiDatabaseRouter:
         """
         Ensure 'api' app models are only migrated to the 'api' database.
         Other apps (like auth, sessions) are migrated to the 'default' database.
+        The read-only 'api_snapshot' is a copy of 'api_db' and is never migrated.
         """
+        if db == "api_snapshot":
+            return False
+        if self._is_archive(app_label, model_name):
+            return db == "archive_db"
         if app_label == "api":
             return db == "api_db"
         elif app_label == "reference":
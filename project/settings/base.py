@@ -40,6 +40,18 @@ DATABASES = {
         "NAME": BASE_DIR
         / f"{env.str("DB_PATH_REFEREBCE", default="db/reference.sqlite")}",
     },
+    # Read-only copy of api_db for heavy reads, refreshed by
+    # api.tasks.refresh_snapshot (see api.services.snapshot)
+    "api_snapshot": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{BASE_DIR / env.str("DB_PATH_SNAPSHOT", default="db/reporting_snapshot.sqlite")}?mode=ro",
+        "TEST": {"MIRROR": "api_db"},
+    },
+    # Cold storage for jobs moved out of api_db by api.tasks.archive_jobs
+    "archive_db": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / f"{env.str("DB_PATH_ARCHIVE", default="db/archive.sqlite")}",
+    },
 }
 
 DATABASE_ROUTERS = ["project.routers.ApiDatabaseRouter"]
@@ -129,6 +141,8 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     # custom exposure management code to bubble exceptions
     "api.middleware.CustomDjangoExceptionMiddleware",
+    # group commit of API writes, unused unless WRITE_QUEUE_ENABLED
+    "api.middleware.SingleWriterMiddleware",
 ]
 
 # CORS settings
@@ -266,6 +280,27 @@ CELERY_BEAT_SCHEDULE = {
             'expires': 3600,  # Task expires after 1 hour if not executed
         }
     },
+    'archive-jobs-daily': {
+        'task': 'api.tasks.archive_jobs',
+        'schedule': crontab(hour=3, minute=0),
+        'options': {
+            'expires': 3600,
+        }
+    },
+    'prune-change-feed-daily': {
+        'task': 'api.tasks.prune_change_feed',
+        'schedule': crontab(hour=3, minute=30),
+        'options': {
+            'expires': 3600,
+        }
+    },
+    'refresh-snapshot': {
+        'task': 'api.tasks.refresh_snapshot',
+        'schedule': 300.0,
+        'options': {
+            'expires': 240,
+        }
+    },
     'test-celery-every-5-minutes': {
         'task': 'project.tasks.test_task',
         'schedule': 300.0,  # Every 5 minutes (for testing)
@@ -279,3 +314,85 @@ CELERY_BEAT_SCHEDULE = {
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_TASK_ACKS_LATE = True
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 50
+
+# Capacity planning (api.services.schedule)
+SCHEDULE_SIMULATION_DEFAULT_JOB_MINUTES = 60  # used when a report has no finished jobs
+SCHEDULE_SIMULATION_HISTORY_DAYS = 90  # job history used to estimate durations
+
+# Job analytics (GET /api/job-analytics/): days covered without ?start=, and
+# the longest range one request may cover.
+JOB_ANALYTICS_DEFAULT_DAYS = 90
+JOB_ANALYTICS_MAX_DAYS = 731
+
+# Job archival (api.tasks.archive_jobs)
+JOB_ARCHIVE_AFTER_DAYS = env.int("JOB_ARCHIVE_AFTER_DAYS", default=180)
+JOB_ARCHIVE_BATCH_SIZE = 5000
+
+# Ring overlap checks (api.services.overlaps)
+# Reject new jobs whose report's event group has rings closer than the
+# report's no_overlap_radius.
+JOB_LAUNCH_CHECK_OVERLAPS = env.bool("JOB_LAUNCH_CHECK_OVERLAPS", default=False)
+# Largest radius and pair listing GET /api/event-groups/{id}/overlaps/ accepts.
+OVERLAP_MAX_RADIUS_KM = env.float("OVERLAP_MAX_RADIUS_KM", default=1000)
+OVERLAP_MAX_PAIRS = env.int("OVERLAP_MAX_PAIRS", default=10000)
+
+# Job loss results (api.services.results), one directory of .npy arrays per job
+JOB_RESULTS_DIR = BASE_DIR / env.str("JOB_RESULTS_DIR", default="db/results")
+# Most rows one results query (top, above, compare) returns.
+JOB_RESULTS_MAX_ROWS = 10000
+
+# Full-text search (api.filters.FullTextSearchFilter). Searches matching more
+# rows than this are not ranked; bm25 scores every match, which would make
+# very common words cost hundreds of milliseconds at a million events.
+SEARCH_RANK_MAX_MATCHES = env.int("SEARCH_RANK_MAX_MATCHES", default=10000)
+
+# Change feed (api.services.changes, GET /api/changes/)
+CHANGE_FEED_RETENTION_DAYS = env.int("CHANGE_FEED_RETENTION_DAYS", default=30)
+# Seconds a ?wait= long-poll may hold a request. Each waiting request
+# occupies a worker (a whole process under gunicorn's sync workers), so this
+# stays 0 (no waiting) unless the server runs threaded or async workers.
+CHANGE_FEED_MAX_WAIT = env.float("CHANGE_FEED_MAX_WAIT", default=0)
+CHANGE_FEED_POLL_INTERVAL = 0.5
+
+# Batch GET (?ids= and POST batch-get/ on every resource); SQLite allows
+# 32766 parameters per query.
+BATCH_GET_MAX_IDS = 5000
+
+# List pagination with ?count=estimate counts filtered lists up to this many
+# rows; larger totals are reported as lower bounds (api.views.core).
+PAGINATION_COUNT_LIMIT = env.int("PAGINATION_COUNT_LIMIT", default=10000)
+
+# Event, job and report lists encode values() rows directly rather than
+# through their serializers (api.serializers.rows); same JSON, less CPU.
+FAST_LIST_ENCODERS = env.bool("FAST_LIST_ENCODERS", default=True)
+
+# Linking reports to modifiers (POST /api/link-modifier/multiple/). Above
+# LINK_ASYNC_THRESHOLD combinations the links are made by the
+# api.tasks.link_reports task, LINK_CHUNK_SIZE reports per transaction, and
+# the request returns the URL of its progress.
+LINK_ASYNC_THRESHOLD = env.int("LINK_ASYNC_THRESHOLD", default=50000)
+LINK_CHUNK_SIZE = 5000
+
+# Single-writer queue (api.middleware.SingleWriterMiddleware). When enabled,
+# POST/PUT/PATCH/DELETE requests to /api/ run on one writer thread, which
+# commits up to WRITE_QUEUE_MAX_BATCH waiting requests in one transaction
+# on WRITE_QUEUE_DATABASES. Requests beyond WRITE_QUEUE_MAX_DEPTH waiting
+# get 429 with Retry-After. Paths matching WRITE_QUEUE_EXCLUDE spend long
+# outside the database (file parsing, up to LINK_ASYNC_THRESHOLD links) and
+# bypass the queue.
+WRITE_QUEUE_ENABLED = env.bool("WRITE_QUEUE_ENABLED", default=False)
+WRITE_QUEUE_MAX_DEPTH = env.int("WRITE_QUEUE_MAX_DEPTH", default=256)
+WRITE_QUEUE_MAX_BATCH = 64
+WRITE_QUEUE_DATABASES = ["api_db", "default", "archive_db"]
+WRITE_QUEUE_EXCLUDE = [
+    r"^/api/jobs/[^/]+/results",
+    r"^/api/reports/[^/]+/dynamic-rings",
+    r"^/api/link-modifier/multiple",
+]
+
+# Read-only snapshot of api_db (api.services.snapshot), the "api_snapshot"
+# database. Summary and analytics views read from it while it is younger
+# than SNAPSHOT_MAX_AGE seconds, and from api_db otherwise.
+SNAPSHOT_PATH = BASE_DIR / env.str("DB_PATH_SNAPSHOT", default="db/reporting_snapshot.sqlite")
+SNAPSHOT_MAX_AGE = env.int("SNAPSHOT_MAX_AGE", default=900)
+SNAPSHOT_REFRESH_TIMEOUT = 120  # seconds a refresh may take before it is abandoned
@@ -46,6 +46,7 @@ def backup_all_databases() -> bool:
     databases = {
         "app": "db/app.sqlite",
         "reporting": "db/reporting.sqlite",
+        "archive": "db/archive.sqlite",
     }
     
     all_successful = True
@@ -0,0 +1,106 @@
+"""
+Benchmark the streaming location-breakout trimmer at the default caps.
+
+Streams a synthetic breakout of --rows rows (drawn from --events events and
+--locations locations, heavy-tailed losses) through trim_breakout in chunks,
+twice as the trimmer requires, and reports throughput and peak memory. The
+rows are generated per chunk, so memory use is the trimmer's own.
+--csv-rows additionally times a CSV to CSV trim of a smaller file.
+
+    python scripts/bench_breakout.py --rows 50000000
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_chunks(rows, events, locations, chunk_rows, seed=0):
+    def chunks():
+        for index, start in enumerate(range(0, rows, chunk_rows)):
+            size = min(chunk_rows, rows - start)
+            rng = np.random.default_rng((seed, index))
+            # Zipf-like event and location popularity.
+            event_ids = (events * rng.random(size) ** 2).astype(np.int64)
+            location_ids = (locations * rng.random(size) ** 1.5).astype(np.int64)
+            yield event_ids, location_ids, rng.lognormal(6, 2, size)
+
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--locations", type=int, default=5_000_000)
+    parser.add_argument("--max-events", type=int, default=500_000)
+    parser.add_argument("--max-locations", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--csv-rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    from api.services.breakout import CsvSink, csv_chunks, trim_breakout
+
+    kept = 0
+
+    def count(event_ids, location_ids, losses):
+        nonlocal kept
+        kept += len(losses)
+
+    start = time.perf_counter()
+    stats = trim_breakout(
+        synthetic_chunks(args.rows, args.events, args.locations, args.chunk_rows),
+        count,
+        args.max_events,
+        args.max_locations,
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{stats['rows']:,} rows ({stats['events']:,} events, {stats['locations']:,} locations) "
+        f"-> {stats['rows_kept']:,} rows, {stats['events_kept']:,} events, "
+        f"{stats['locations_kept']:,} locations, {stats['loss_kept'] / stats['loss']:.1%} of loss"
+    )
+    print(
+        f"  {elapsed:.1f}s ({stats['rows'] / elapsed / 1e6:.2f}M rows/s over two passes), "
+        f"peak RSS {peak_rss_mb():.0f} MB"
+    )
+
+    if args.csv_rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = Path(tmp_dir) / "breakout.csv"
+            with open(source, "w") as f:
+                sink = CsvSink(f)
+                for chunk in synthetic_chunks(
+                    args.csv_rows, args.events, args.locations, args.chunk_rows, seed=1
+                )():
+                    sink(*chunk)
+            start = time.perf_counter()
+            with open(Path(tmp_dir) / "trimmed.csv", "w") as out:
+                stats = trim_breakout(
+                    csv_chunks(source, args.chunk_rows),
+                    CsvSink(out),
+                    args.max_events,
+                    args.max_locations,
+                )
+            elapsed = time.perf_counter() - start
+            print(
+                f"CSV {os.path.getsize(source) / 1e6:.0f} MB, {stats['rows']:,} rows -> "
+                f"{stats['rows_kept']:,} rows in {elapsed:.1f}s, peak RSS {peak_rss_mb():.0f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark the event, job and report list encoders against their serializers.
+
+Creates a throwaway reporting database with --rows ring events, reports
+(each linked to two modifiers) and jobs, and times one page of
+--page-size rows of each list: encoding only (RowEncoder against the
+serializer on the same page, from the rows each fetches) and the whole
+GET, with FAST_LIST_ENCODERS on and off.
+
+    python scripts/bench_lists.py --rows 20000 --page-size 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def setup_django(tmp_dir):
+    os.environ["DB_PATH_APP"] = str(Path(tmp_dir) / "app.sqlite")
+    os.environ["DB_PATH_REPORTING"] = str(Path(tmp_dir) / "reporting.sqlite")
+    os.environ["DB_PATH_ARCHIVE"] = str(Path(tmp_dir) / "archive.sqlite")
+    # DEBUG would record every query in memory and in the dev log.
+    os.environ["DEBUG"] = "False"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings.dev")
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    for database in ("default", "api_db", "archive_db"):
+        call_command("migrate", database=database, verbosity=0)
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(tmp_dir)
+        from django.conf import settings
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory, override_settings
+        from rest_framework.request import Request
+        from rest_framework.test import APIClient
+
+        from api.models import Event, Job, Report, ReportModifier, RingEvent
+        from api.serializers import (
+            EVENT_ROWS, JOB_ROWS, REPORT_ROWS, EventSerializer, JobSerializer, ReportSerializer,
+        )
+        from api.services.events import bulk_create_events
+
+        start = time.perf_counter()
+        bulk_create_events(
+            RingEvent(name=f"event {i}", description="", zone="EU", latitude=0, longitude=0, radius=10)
+            for i in range(args.rows)
+        )
+        Report.objects.bulk_create(
+            Report(name=f"report {i}", peril="Flood", loss_perspective="Gross") for i in range(args.rows)
+        )
+        modifiers = ReportModifier.objects.bulk_create(ReportModifier() for _ in range(2))
+        report_ids = list(Report.objects.values_list("id", flat=True))
+        Link = ReportModifier.reports.through
+        Link.objects.bulk_create(
+            Link(report_id=report_id, reportmodifier_id=modifier.pk)
+            for report_id in report_ids
+            for modifier in modifiers
+        )
+        Job.objects.bulk_create(
+            Job(report_id=report_id, report_modifier=modifiers[0], fireant_jobid=i)
+            for i, report_id in enumerate(report_ids)
+        )
+        print(f"Inserted {args.rows} events, reports and jobs in {time.perf_counter() - start:.1f} s\n")
+
+        # Requests go through the test client, whose host is "testserver".
+        settings.ALLOWED_HOSTS = ["testserver"]
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="bench"))
+        http_request = Request(RequestFactory().get("/api/", SERVER_NAME="testserver"))
+
+        for name, encoder, serializer_class, queryset in (
+            ("event", EVENT_ROWS, EventSerializer, Event.objects.all()),
+            ("job", JOB_ROWS, JobSerializer, Job.objects.select_related("report", "report_modifier")),
+            ("report", REPORT_ROWS, ReportSerializer, Report.objects.select_related("event_group").prefetch_related("modifiers", "jobs")),
+        ):
+            instances = list(queryset[: args.page_size])
+            rows = list(encoder.rows(queryset)[: args.page_size])
+            t_serializer = timed(
+                lambda: serializer_class(instances, many=True, context={"request": http_request}).data,
+                args.repeat,
+            )
+            t_encoder = timed(lambda: encoder.encode(rows, http_request), args.repeat)
+            print(f"{name:<8} encode {args.page_size} rows: serializer {t_serializer * 1000:8.2f} ms, "
+                  f"encoder {t_encoder * 1000:7.2f} ms, {t_serializer / t_encoder:5.1f} x")
+
+            url = f"/api/{name}s/"
+            params = {"page_size": args.page_size}
+            with override_settings(FAST_LIST_ENCODERS=False):
+                t_slow = timed(lambda: client.get(url, params), args.repeat)
+            t_fast = timed(lambda: client.get(url, params), args.repeat)
+            print(f"{name:<8} GET page:             serializer {t_slow * 1000:8.2f} ms, "
+                  f"encoder {t_fast * 1000:7.2f} ms, {t_slow / t_fast:5.1f} x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark ?search= through the events_fts index against LIKE lookups.
+
+Creates a throwaway reporting database with N ring events with random
+names and descriptions and times a first page (50 rows plus the total
+count, as the list endpoints return) of a rare, a prefix, a common and a
+two-word search, through FullTextSearchFilter and through SearchFilter's LIKE.
+FullTextSearchFilter keeps every LIKE match, so it scans as LIKE does; the
+difference is what the full-text matches and their ranking cost on top.
+
+    python scripts/bench_search.py --events 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+WORDS = [
+    "flood", "storm", "surge", "quake", "fire", "hail", "wind", "river", "coastal",
+    "tropical", "cyclone", "winter", "tornado", "landslide", "tsunami", "drought",
+]
+
+
+def setup_django(tmp_dir):
+    os.environ["DB_PATH_APP"] = str(Path(tmp_dir) / "app.sqlite")
+    os.environ["DB_PATH_REPORTING"] = str(Path(tmp_dir) / "reporting.sqlite")
+    os.environ["DB_PATH_ARCHIVE"] = str(Path(tmp_dir) / "archive.sqlite")
+    # DEBUG would record every query in memory and in the dev log.
+    os.environ["DEBUG"] = "False"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings.dev")
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", database="api_db", verbosity=0)
+
+
+def timed(label, func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:10.2f} ms  ({result} rows)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(tmp_dir)
+        from django.test import RequestFactory
+        from rest_framework.filters import SearchFilter
+        from rest_framework.request import Request
+
+        from api.filters import FullTextSearchFilter, SearchRankOrderingFilter
+        from api.models import RingEvent
+        from api.services.events import bulk_create_events
+        from api.views.core import RingEventViewSet
+
+        random.seed(42)
+        start = time.perf_counter()
+        for offset in range(0, args.events, 100_000):
+            bulk_create_events(
+                RingEvent(
+                    name=f"{random.choice(WORDS)} event {i}",
+                    description=" ".join(random.choices(WORDS, k=4)) + f" ref{i:07d}",
+                    zone=random.choice(("EU", "US", "JP", "AU")),
+                    latitude=0,
+                    longitude=0,
+                    radius=10,
+                )
+                for i in range(offset, min(offset + 100_000, args.events))
+            )
+        print(f"Inserted {args.events} ring events in {time.perf_counter() - start:.1f} s\n")
+
+        factory = RequestFactory()
+        view = RingEventViewSet()
+
+        def first_page(backend, search):
+            request = Request(factory.get("/", {"search": search}))
+
+            def run():
+                queryset = backend.filter_queryset(request, RingEvent.objects.all(), view)
+                queryset = SearchRankOrderingFilter().filter_queryset(request, queryset, view)
+                list(queryset[:50])
+                return queryset.count()
+
+            return run
+
+        for label, search in (
+            ("rare", f"ref{args.events // 2:07d}"),
+            ("prefix, ranked", f"ref{args.events // 2000:04d}"),
+            ("common", "tsunami"),
+            ("two words", "coastal drought"),
+        ):
+            t_fts = timed(f"{label}, FTS5", first_page(FullTextSearchFilter(), search), args.repeat)
+            t_like = timed(f"{label}, LIKE", first_page(SearchFilter(), search), args.repeat)
+            print(f"{'speedup':<40} {t_like / t_fts:10.1f} x\n")
+
+
+if __name__ == "__main__":
+    main()
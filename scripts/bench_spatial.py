@@ -0,0 +1,111 @@
+"""
+Benchmark the event_rtree spatial index against a full table scan.
+
+Creates a throwaway reporting database with N random ring events and times
+bbox/near queries through the SpatialFilter (R*Tree + exact check) against
+the same exact predicate evaluated over every row.
+
+    python scripts/bench_spatial.py --events 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def setup_django(tmp_dir):
+    os.environ["DB_PATH_APP"] = str(Path(tmp_dir) / "app.sqlite")
+    os.environ["DB_PATH_REPORTING"] = str(Path(tmp_dir) / "reporting.sqlite")
+    os.environ["DB_PATH_ARCHIVE"] = str(Path(tmp_dir) / "archive.sqlite")
+    # DEBUG would record every query in memory and in the dev log.
+    os.environ["DEBUG"] = "False"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings.dev")
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", database="api_db", verbosity=0)
+
+
+def timed(label, func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:10.2f} ms  ({result} rows)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(tmp_dir)
+        from django.db.models import F
+        from django.test import RequestFactory
+        from rest_framework.request import Request
+
+        from api.filters import SpatialFilter
+        from api.models import RingEvent
+        from api.services.events import bulk_create_events
+        from api.services.geo import haversine_expression
+
+        random.seed(42)
+        start = time.perf_counter()
+        for offset in range(0, args.events, 100_000):
+            bulk_create_events(
+                RingEvent(
+                    name=f"ring {i}",
+                    description="",
+                    zone="bench",
+                    latitude=random.uniform(-60, 70),
+                    longitude=random.uniform(-180, 180),
+                    radius=random.uniform(5, 100),
+                )
+                for i in range(offset, min(offset + 100_000, args.events))
+            )
+        print(f"Inserted {args.events} ring events in {time.perf_counter() - start:.1f} s\n")
+
+        factory = RequestFactory()
+        spatial = SpatialFilter()
+
+        def indexed(params):
+            request = Request(factory.get("/", params))
+            return lambda: spatial.filter_queryset(request, RingEvent.objects.all(), None).count()
+
+        lat, lon, km = 51.5, -0.12, 50
+        full_near = lambda: (  # noqa: E731
+            RingEvent.objects.alias(d=haversine_expression(lat, lon, F("latitude"), F("longitude")))
+            .filter(d__lte=F("radius") + km)
+            .count()
+        )
+        full_bbox = lambda: (  # noqa: E731
+            RingEvent.objects.filter(
+                latitude__gte=45, latitude__lte=55, longitude__gte=-10, longitude__lte=5
+            ).count()
+        )
+
+        near = {"near": f"{lat},{lon}", "within_km": km}
+        t_index = timed("near, R*Tree + exact check", indexed(near), args.repeat)
+        t_scan = timed("near, full scan", full_near, args.repeat)
+        print(f"{'speedup':<40} {t_scan / t_index:10.1f} x\n")
+
+        bbox = {"bbox": "-10,45,5,55"}
+        t_index = timed("bbox, R*Tree + exact check", indexed(bbox), args.repeat)
+        t_scan = timed("bbox, full scan (centres only)", full_bbox, args.repeat)
+        print(f"{'speedup':<40} {t_scan / t_index:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()